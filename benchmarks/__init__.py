@@ -0,0 +1 @@
+"""Microbenchmarks for the PlantSense integration."""
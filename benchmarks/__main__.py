@@ -0,0 +1,61 @@
+"""Run PlantSense benchmarks: `python3 -m benchmarks [--output FILE] [name ...]`."""
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+BENCHMARKS = ["compact", "decoder", "ingress", "memory"]
+
+_MANIFEST = Path(__file__).parents[1] / "custom_components/plant_sense/manifest.json"
+
+
+def main() -> None:
+    """Run the selected (or all) benchmarks and report their results."""
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks")
+    parser.add_argument("names", nargs="*", metavar="name", help=str(BENCHMARKS))
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks {sorted(unknown)}")
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        rows = importlib.import_module(f"benchmarks.{name}").run()
+        results[name] = rows
+        _print_table(name, rows)
+
+    if args.output is not None:
+        report = {
+            "version": json.loads(_MANIFEST.read_text())["version"],
+            "python": platform.python_version(),
+            "created": datetime.now(UTC).isoformat(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def _print_table(name: str, rows: list[dict]) -> None:
+    columns = list(rows[0])
+    widths = [
+        max(len(column), *(len(_format(row[column])) for row in rows))
+        for column in columns
+    ]
+    sys.stdout.write(f"\n{name}\n")
+    sys.stdout.write(
+        "  ".join(c.rjust(w) for c, w in zip(columns, widths, strict=True)) + "\n"
+    )
+    for row in rows:
+        cells = (_format(row[c]).rjust(w) for c, w in zip(columns, widths, strict=True))
+        sys.stdout.write("  ".join(cells) + "\n")
+
+
+def _format(value: object) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+if __name__ == "__main__":
+    main()
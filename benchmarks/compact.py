@@ -0,0 +1,79 @@
+"""Compare compact binary data frames with hex-wrapped JSON."""
+
+import json
+import random
+import timeit
+
+from custom_components.plant_sense.compact import decode_frame, encode_data
+from custom_components.plant_sense.decoder import decode_payload
+
+ROUND_TRIPS = 10_000
+
+_GATEWAY = {"rssi": -87, "snr": 9.25, "pferror": -1632, "packetSize": 180}
+_OPTIONAL = ("fw", "moi", "moiRaw", "hum", "tempc", "bat", "batPct")
+
+
+def _reading(rng: random.Random) -> dict:
+    reading = {
+        "id": f"{rng.getrandbits(48):012x}",
+        "model": "PlantSense",
+        "msg": "data",
+        "v": rng.randint(0, 65535),
+        "test": rng.random() < 0.1,  # noqa: PLR2004
+        "fw": f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 99)}",
+        "moi": rng.randint(0, 100),
+        "moiRaw": rng.randint(0, 4095),
+        "hum": round(rng.uniform(0, 100), 1),
+        "tempc": round(rng.uniform(-40, 60), 1),
+        "bat": round(rng.uniform(2.8, 4.2), 3),
+        "batPct": rng.randint(0, 100),
+    }
+    # Sensors that failed to measure.
+    for field in rng.sample(_OPTIONAL, rng.randint(0, 2)):
+        del reading[field]
+    return reading
+
+
+def check_round_trips() -> None:
+    """Raise if a random reading does not decode to what was encoded."""
+    rng = random.Random(ROUND_TRIPS)  # noqa: S311
+    for _ in range(ROUND_TRIPS):
+        reading = _reading(rng)
+        decoded = decode_frame(encode_data(reading))
+        if decoded != reading:
+            msg = f"{reading} decoded to {decoded}"
+            raise ValueError(msg)
+
+
+def _gateway_payload(frame: bytes) -> bytes:
+    # The gateway writes its JSON without whitespace.
+    return json.dumps({**_GATEWAY, "hex": frame.hex()}, separators=(",", ":")).encode()
+
+
+def _ns_per_call(payload: bytes) -> float:
+    number = 20_000
+    best = min(timeit.repeat(lambda: decode_payload(payload), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def run() -> list[dict]:
+    """Measure the LoRa payload size and decode time of both formats."""
+    check_round_trips()
+    reading = _reading(random.Random(0))  # noqa: S311
+    frames = {
+        "json": json.dumps(reading, separators=(",", ":")).encode(),
+        "compact": encode_data(reading),
+    }
+    decode_ns = {
+        name: _ns_per_call(_gateway_payload(frame)) for name, frame in frames.items()
+    }
+    return [
+        {
+            "format": name,
+            "lora_bytes": len(frame),
+            "size": len(frame) / len(frames["json"]),
+            "decode_ns": round(decode_ns[name]),
+            "speedup": decode_ns["json"] / decode_ns[name],
+        }
+        for name, frame in frames.items()
+    ]
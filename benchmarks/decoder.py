@@ -0,0 +1,121 @@
+"""Compare the payload decoder with the previous parse-everything path."""
+
+import binascii
+import json
+import timeit
+from collections.abc import Callable
+
+from homeassistant.util.json import JsonObjectType, json_loads_object
+
+from custom_components.plant_sense.decoder import decode_payload, is_candidate
+
+_INNER = {
+    "id": "a1b2c3d4e5f6",
+    "model": "PlantSense",
+    "name": "Monstera",
+    "msg": "data",
+    "v": 3,
+    "fw": "1.2.0",
+    "test": False,
+    "moi": 45,
+    "moiRaw": 2104,
+    "hum": 55.2,
+    "tempc": 21.3,
+    "bat": 3.91,
+    "batPct": 80,
+}
+_GATEWAY = {"rssi": -87, "snr": 9.25, "pferror": -1632, "packetSize": 180}
+_HEX_FIELD = b'"hex":"'
+
+
+def _compact(document: dict) -> bytes:
+    # The gateway writes its JSON without whitespace.
+    return json.dumps(document, separators=(",", ":")).encode()
+
+
+PAYLOADS: dict[str, bytes] = {
+    "plain": _compact({**_GATEWAY, **_INNER}),
+    "hex": _compact({**_GATEWAY, "hex": _compact(_INNER).hex()}),
+    "foreign": _compact({**_GATEWAY, "message": "T=21.5;H=40;ID=weather-7;BAT=ok"}),
+    "foreign_hex": _compact(
+        {**_GATEWAY, "hex": b'{"id":"x1","model":"Other","t":12}'.hex()}
+    ),
+    "malformed": b'{"rssi":-87,"snr":9.25,"hex":"7b226964',
+}
+
+
+def legacy_decode(payload: bytes) -> JsonObjectType | None:
+    """Decode the way MqttManager did before the decoder module existed."""
+    try:
+        json_message = json_loads_object(payload.decode())
+    except ValueError:
+        return None
+
+    if "hex" in json_message:
+        hex_data = json_message.get("hex")
+        if isinstance(hex_data, str):
+            try:
+                json_data = json_loads_object(bytes.fromhex(hex_data))
+            except ValueError:
+                return None
+            json_message.update(json_data)
+
+    if json_message.get("model") == "PlantSense" and "id" in json_message:
+        return json_message
+    return None
+
+
+def hex_span_decode(payload: bytes) -> JsonObjectType | None:
+    """
+    Decode the `hex` field from its span in the raw payload instead of its str.
+
+    The alternative to `bytes.fromhex` on the parsed string that was weighed
+    for the decoder: it saves no time, since parsing the gateway's JSON, which
+    creates the string anyway, dominates either way.
+    """
+    if not is_candidate(payload):
+        return None
+    try:
+        json_message = json_loads_object(payload)
+    except ValueError:
+        return None
+
+    start = payload.find(_HEX_FIELD)
+    if isinstance(json_message.pop("hex", None), str) and start >= 0:
+        start += len(_HEX_FIELD)
+        end = payload.find(b'"', start)
+        try:
+            json_message.update(
+                json_loads_object(binascii.unhexlify(memoryview(payload)[start:end]))
+            )
+        except (ValueError, binascii.Error):
+            return None
+
+    if json_message.get("model") == "PlantSense" and "id" in json_message:
+        return json_message
+    return None
+
+
+def _ns_per_call(func: Callable[[bytes], object], payload: bytes) -> float:
+    number = 20_000
+    best = min(timeit.repeat(lambda: func(payload), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def run() -> list[dict]:
+    """Measure ns/message for both decoders and every payload kind."""
+    rows = []
+    for kind, payload in PAYLOADS.items():
+        legacy = _ns_per_call(legacy_decode, payload)
+        current = _ns_per_call(decode_payload, payload)
+        hex_span = _ns_per_call(hex_span_decode, payload)
+        rows.append(
+            {
+                "payload": kind,
+                "legacy_ns": round(legacy),
+                "decoder_ns": round(current),
+                "hex_span_ns": round(hex_span),
+                "speedup": legacy / current,
+            }
+        )
+    return rows
@@ -0,0 +1,260 @@
+"""
+Measure MQTT ingress throughput for synthetic fleets of PlantSense devices.
+
+Messages are fed straight into `MqttManager._async_mqtt_callback` of a
+HomeAssistant instance that runs offline in a temporary config directory.
+The sensor platform creates the real entities, whose `async_write_ha_state`
+is replaced by a probe that records when the state would have been written.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import homeassistant.helpers.device_registry as dr
+from homeassistant.components.mqtt.models import ReceiveMessage
+from homeassistant.core import HomeAssistant
+
+from custom_components.plant_sense import CONFIG_SCHEMA, sensor
+from custom_components.plant_sense.const import (
+    CONF_DEVICE_SERIAL,
+    DOMAIN,
+    DOMAIN_CONFIG,
+)
+from custom_components.plant_sense.coordinator import (
+    PlantSenseComponent,
+    PlantSenseCoordinator,
+)
+from custom_components.plant_sense.data import PlantSenseData
+from custom_components.plant_sense.downlink import DownlinkScheduler
+from custom_components.plant_sense.firmware import FirmwareReleaseFetcher
+from custom_components.plant_sense.gateway import Gateway
+from custom_components.plant_sense.helpers import build_unique_id
+from custom_components.plant_sense.mqtt_manager import MqttManager
+from custom_components.plant_sense.sync_state import SyncStateStore
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.helpers.entity import Entity
+
+FLEET_SIZES = (10, 100, 1000)
+MESSAGES_PER_DEVICE = 5
+KINDS = ("plain", "hex", "duplicate", "foreign", "malformed")
+
+_TOPIC = "devices/OMG_BENCH/LORAtoMQTT"
+_CONFIG_VERSION = 3
+
+
+@dataclass
+class _BenchEntry:
+    """The parts of a ConfigEntry the coordinator and platforms use."""
+
+    entry_id: str
+    unique_id: str
+    title: str
+    data: dict[str, Any]
+    options: dict[str, Any] = field(default_factory=dict)
+    runtime_data: PlantSenseData | None = None
+
+
+class _WriteProbe:
+    """Stands in for async_write_ha_state and records every call."""
+
+    def __init__(self) -> None:
+        self.writes = 0
+        self.last_write = 0
+
+    def write(self) -> None:
+        self.writes += 1
+        self.last_write = time.perf_counter_ns()
+
+
+def _reading(rng: random.Random, serial: str) -> dict[str, Any]:
+    return {
+        "id": serial,
+        "model": "PlantSense",
+        "name": f"Plant {serial[-4:]}",
+        "msg": "data",
+        "v": _CONFIG_VERSION,
+        "fw": "1.2.0",
+        "test": False,
+        "moi": rng.randint(0, 100),
+        "moiRaw": rng.randint(1200, 3200),
+        "hum": round(rng.uniform(30, 80), 1),
+        "tempc": round(rng.uniform(12, 30), 1),
+        "bat": round(rng.uniform(3.3, 4.2), 2),
+        "batPct": rng.randint(0, 100),
+    }
+
+
+def _gateway_fields(rng: random.Random) -> dict[str, Any]:
+    return {"rssi": rng.randint(-120, -40), "snr": round(rng.uniform(-10, 12), 2)}
+
+
+def _payloads(rng: random.Random, kind: str, serial: str) -> list[bytes]:
+    if kind != "duplicate":
+        return [_payload(rng, kind, serial)]
+    # The same frame heard by a second gateway.
+    reading = _reading(rng, serial)
+    return [
+        json.dumps({**_gateway_fields(rng), **reading}).encode(),
+        json.dumps({**_gateway_fields(rng), **reading}).encode(),
+    ]
+
+
+def _payload(rng: random.Random, kind: str, serial: str) -> bytes:
+    gateway = _gateway_fields(rng)
+    if kind == "plain":
+        return json.dumps({**gateway, **_reading(rng, serial)}).encode()
+    if kind == "hex":
+        inner = json.dumps(_reading(rng, serial), separators=(",", ":"))
+        return json.dumps({**gateway, "hex": inner.encode().hex()}).encode()
+    if kind == "foreign":
+        foreign = {"id": f"wx-{rng.randint(0, 99)}", "model": "WS", "t": 21.5}
+        return json.dumps(
+            {**gateway, "hex": json.dumps(foreign).encode().hex()}
+        ).encode()
+    return _payload(rng, "hex", serial)[:-20]
+
+
+def _message(payload: bytes) -> ReceiveMessage:
+    return ReceiveMessage(
+        topic=_TOPIC,
+        payload=payload,
+        qos=0,
+        retain=False,
+        subscribed_topic=f"{_TOPIC}/#",
+        timestamp=time.monotonic(),
+    )
+
+
+async def _async_setup_fleet(
+    hass: HomeAssistant, size: int
+) -> tuple[MqttManager, Gateway, list[str], _WriteProbe]:
+    gateway = Gateway(
+        name="bench",
+        uplink_topic=f"{_TOPIC}/#",
+        downlink=DownlinkScheduler(hass, "devices/OMG_BENCH/commands/MQTTtoLORA"),
+    )
+    manager = MqttManager(hass, [gateway])
+    sync_state = SyncStateStore(hass)
+    probe = _WriteProbe()
+    # Never started, so it does not check for releases during the run.
+    firmware = FirmwareReleaseFetcher(hass)
+    serials = [f"{index:012x}" for index in range(size)]
+
+    for serial in serials:
+        entry = _BenchEntry(
+            entry_id=serial,
+            unique_id=build_unique_id(serial),
+            title=f"PlantSense {serial}",
+            data={
+                CONF_DEVICE_SERIAL: serial,
+            },
+        )
+        sync_state.get(serial).config_version = _CONFIG_VERSION
+        coordinator = PlantSenseCoordinator(hass, entry, sync_state)
+        entry.runtime_data = PlantSenseData(coordinator=coordinator, firmware=firmware)
+        manager.register_coordinator(coordinator)
+
+        entities: list[Entity] = []
+        await sensor.async_setup_entry(hass, entry, entities.extend)
+        for entity in entities:
+            if isinstance(entity, PlantSenseComponent):
+                entity.hass = hass
+                entity.async_write_ha_state = probe.write
+                coordinator.register_component(entity)
+
+    return manager, gateway, serials, probe
+
+
+def _messages(
+    rng: random.Random, kind: str, serials: list[str]
+) -> list[ReceiveMessage]:
+    return [
+        _message(payload)
+        for _ in range(MESSAGES_PER_DEVICE)
+        for serial in serials
+        for payload in _payloads(rng, kind, serial)
+    ]
+
+
+async def _async_measure(
+    manager: MqttManager,
+    gateway: Gateway,
+    messages: list[ReceiveMessage],
+    allocation_messages: list[ReceiveMessage],
+    probe: _WriteProbe,
+) -> dict[str, Any]:
+    callback: Callable[..., Any] = manager._async_mqtt_callback  # noqa: SLF001
+    latencies = []
+    writes_before = probe.writes
+    started = time.perf_counter_ns()
+    for message in messages:
+        received = time.perf_counter_ns()
+        await callback(gateway, message)
+        if probe.last_write >= received:
+            latencies.append(probe.last_write - received)
+    elapsed = time.perf_counter_ns() - started
+    writes = probe.writes - writes_before
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for message in allocation_messages:
+        await callback(gateway, message)
+    retained_blocks = sys.getallocatedblocks() - blocks_before
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    return {
+        "messages": len(messages),
+        "msgs_per_sec": len(messages) / (elapsed / 1e9),
+        "p50_write_us": quantiles[49] / 1000 if quantiles else None,
+        "p99_write_us": quantiles[98] / 1000 if quantiles else None,
+        "writes_per_msg": writes / len(messages),
+        "retained_blocks_per_msg": retained_blocks / len(allocation_messages),
+        "traced_peak_kib": peak / 1024,
+    }
+
+
+async def _async_run() -> list[dict]:
+    rows = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            await dr.async_load(hass)
+            hass.data[DOMAIN] = {DOMAIN_CONFIG: CONFIG_SCHEMA({DOMAIN: {}})[DOMAIN]}
+            for size in FLEET_SIZES:
+                manager, gateway, serials, probe = await _async_setup_fleet(hass, size)
+                rng = random.Random(size)  # noqa: S311
+                for kind in KINDS:
+                    # Fresh messages for the allocation pass, so that it is not
+                    # measuring the duplicate suppression of the first one.
+                    result = await _async_measure(
+                        manager,
+                        gateway,
+                        _messages(rng, kind, serials),
+                        _messages(rng, kind, serials),
+                        probe,
+                    )
+                    rows.append({"devices": size, "payload": kind, **result})
+        finally:
+            # Tears down the executor and timers before the directory goes.
+            await hass.async_stop(force=True)
+    return rows
+
+
+def run() -> list[dict]:
+    """Measure throughput, write latency and allocations per fleet and payload."""
+    return asyncio.run(_async_run())
@@ -0,0 +1,84 @@
+"""Compare the memory of the last readings kept as JSON dicts and DataReadings."""
+
+import gc
+import json
+import random
+import tracemalloc
+from collections.abc import Callable
+
+from custom_components.plant_sense.decoder import decode_payload
+from custom_components.plant_sense.messages import decode_message
+
+DEVICES = 1000
+
+
+def _reading(rng: random.Random, serial: str) -> dict:
+    return {
+        "id": serial,
+        "model": "PlantSense",
+        "name": f"Plant {serial[-4:]}",
+        "msg": "data",
+        "v": 3,
+        "fw": "1.2.0",
+        "test": False,
+        "moi": rng.randint(0, 100),
+        "moiRaw": rng.randint(1200, 3200),
+        "hum": round(rng.uniform(30, 80), 1),
+        "tempc": round(rng.uniform(12, 30), 1),
+        "bat": round(rng.uniform(3.3, 4.2), 2),
+        "batPct": rng.randint(0, 100),
+    }
+
+
+def _payloads(kind: str) -> list[bytes]:
+    rng = random.Random(DEVICES)  # noqa: S311
+    payloads = []
+    for index in range(DEVICES):
+        gateway = {
+            "rssi": rng.randint(-120, -40),
+            "snr": round(rng.uniform(-10, 12), 2),
+        }
+        reading = _reading(rng, f"{index:012x}")
+        if kind == "hex":
+            inner = json.dumps(reading, separators=(",", ":")).encode().hex()
+            payloads.append(json.dumps({**gateway, "hex": inner}).encode())
+        else:
+            payloads.append(json.dumps({**gateway, **reading}).encode())
+    return payloads
+
+
+def _retained_bytes(decode: Callable[[bytes], object], payloads: list[bytes]) -> int:
+    """Return the bytes still allocated for the decoded messages of all devices."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [decode(payload) for payload in payloads]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list itself is the same for both.
+    return after - before - kept.__sizeof__()
+
+
+def _typed(payload: bytes) -> object:
+    json_message = decode_payload(payload)
+    return decode_message(json_message) if json_message is not None else None
+
+
+def run() -> list[dict]:
+    """Measure the bytes per device of the last reading for every payload kind."""
+    rows = []
+    for kind in ("plain", "hex"):
+        payloads = _payloads(kind)
+        as_json = _retained_bytes(decode_payload, payloads)
+        typed = _retained_bytes(_typed, payloads)
+        rows.append(
+            {
+                "devices": DEVICES,
+                "payload": kind,
+                "json_bytes_per_device": as_json / DEVICES,
+                "typed_bytes_per_device": typed / DEVICES,
+                "saving": 1 - typed / as_json,
+            }
+        )
+    return rows
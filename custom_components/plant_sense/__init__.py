@@ -3,17 +3,68 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
+from functools import partial
+from time import perf_counter_ns
 from typing import TYPE_CHECKING
 
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
 from homeassistant.components import mqtt
-from homeassistant.const import Platform
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_NAME, Platform
+from homeassistant.core import callback
 
-from .const import DOMAIN, DOMAIN_MQTT_MANAGER
+from .bulk_config import BulkConfigPushes
+from .const import (
+    CONF_CANARY_PERCENT,
+    CONF_DEVICE_SERIAL,
+    CONF_DOWNLINK_TOPIC,
+    CONF_FRAME_SPACING,
+    CONF_GATEWAYS,
+    CONF_MAX_CONCURRENT,
+    CONF_METRICS,
+    CONF_MQTT_ROOT,
+    CONF_OTA_ROLLOUT,
+    CONF_RAW_DIAGNOSTIC_SENSORS,
+    CONF_UPDATE_TIMEOUT,
+    CONF_UPLINK_TOPIC,
+    DEFAULT_GATEWAY_NAME,
+    DEFAULT_MQTT_ROOT,
+    DOMAIN,
+    DOMAIN_BULK_CONFIG,
+    DOMAIN_CONFIG,
+    DOMAIN_FIRMWARE_FETCHER,
+    DOMAIN_LAST_STATE,
+    DOMAIN_METRICS,
+    DOMAIN_MQTT_MANAGER,
+    DOMAIN_OTA_ROLLOUT,
+    DOMAIN_SETUP_TIMINGS,
+    DOMAIN_SHARED_SETUP,
+    DOMAIN_STALENESS,
+    DOMAIN_SYNC_STATE,
+    DOWNLINK_FRAME_SPACING_SECONDS,
+    OTA_CANARY_PERCENT,
+    OTA_MAX_CONCURRENT,
+    OTA_UPDATE_TIMEOUT_MINUTES,
+)
+from .firmware import FirmwareReleaseFetcher
+from .gateway import Gateway
+from .last_state import LastStateStore
+from .metrics import PipelineMetrics, SetupTimings
 from .mqtt_manager import MqttManager
+from .rollout import OtaRollout
+from .services import async_setup_services
+from .staleness import DeadlineWheel
+from .sync_state import SyncStateStore
+from .websocket_api import async_setup_websocket_api
 
 if TYPE_CHECKING:
+    import asyncio
+
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
 from .coordinator import PlantSenseCoordinator
 from .data import PlantSenseData
@@ -22,33 +73,203 @@ PLATFORMS: list[Platform] = [Platform.BUTTON, Platform.SENSOR, Platform.UPDATE]
 
 _LOGGER = logging.getLogger(__name__)
 
+GATEWAY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional(CONF_MQTT_ROOT, default=DEFAULT_MQTT_ROOT): cv.string,
+        vol.Optional(CONF_UPLINK_TOPIC): mqtt.valid_subscribe_topic,
+        vol.Optional(CONF_DOWNLINK_TOPIC): mqtt.valid_publish_topic,
+        vol.Optional(
+            CONF_FRAME_SPACING, default=DOWNLINK_FRAME_SPACING_SECONDS
+        ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up PlantSense from a config entry."""
+OTA_ROLLOUT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_CANARY_PERCENT, default=OTA_CANARY_PERCENT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(CONF_MAX_CONCURRENT, default=OTA_MAX_CONCURRENT): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(
+            CONF_UPDATE_TIMEOUT,
+            default=timedelta(minutes=OTA_UPDATE_TIMEOUT_MINUTES),
+        ): cv.positive_time_period,
+    }
+)
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(
+                    CONF_GATEWAYS, default=[{CONF_NAME: DEFAULT_GATEWAY_NAME}]
+                ): vol.All(cv.ensure_list, [GATEWAY_SCHEMA]),
+                vol.Optional(CONF_METRICS, default=False): cv.boolean,
+                vol.Optional(CONF_RAW_DIAGNOSTIC_SENSORS, default=True): cv.boolean,
+                vol.Optional(CONF_OTA_ROLLOUT, default={}): OTA_ROLLOUT_SCHEMA,
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Store the integration-wide YAML configuration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data[DOMAIN_CONFIG] = (
+        config[DOMAIN] if DOMAIN in config else CONFIG_SCHEMA({DOMAIN: {}})[DOMAIN]
+    )
+    domain_data[DOMAIN_METRICS] = (
+        PipelineMetrics() if domain_data[DOMAIN_CONFIG][CONF_METRICS] else None
+    )
+    sync_state = SyncStateStore(hass)
+    await sync_state.async_load()
+    domain_data[DOMAIN_SYNC_STATE] = sync_state
+    domain_data[DOMAIN_BULK_CONFIG] = BulkConfigPushes(hass, sync_state)
+    last_state = LastStateStore(hass)
+    await last_state.async_load()
+    domain_data[DOMAIN_LAST_STATE] = last_state
+    domain_data[DOMAIN_SETUP_TIMINGS] = SetupTimings()
+    domain_data[DOMAIN_STALENESS] = DeadlineWheel(hass)
+    domain_data[DOMAIN_OTA_ROLLOUT] = OtaRollout(
+        domain_data[DOMAIN_STALENESS], domain_data[DOMAIN_CONFIG][CONF_OTA_ROLLOUT]
+    )
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
+
+async def _async_setup_shared(hass: HomeAssistant) -> bool:
+    """Connect to MQTT and start the helpers all entries share."""
+    domain_data = hass.data[DOMAIN]
+    started = perf_counter_ns()
     # Make sure MQTT integration is enabled and the client is available.
     if not await mqtt.async_wait_for_mqtt_client(hass):
         _LOGGER.error("MQTT integration is not available")
         return False
 
-    domain_data = hass.data.setdefault(DOMAIN, {})
-    if DOMAIN_MQTT_MANAGER not in domain_data:
-        mqtt_manager: MqttManager = MqttManager(hass)
-        domain_data[DOMAIN_MQTT_MANAGER] = mqtt_manager
-    else:
-        mqtt_manager = domain_data[DOMAIN_MQTT_MANAGER]
-
-    if not mqtt_manager.is_connected():
+    gateways = [
+        Gateway.from_config(hass, gateway_config, domain_data[DOMAIN_METRICS])
+        for gateway_config in domain_data[DOMAIN_CONFIG][CONF_GATEWAYS]
+    ]
+    mqtt_manager = MqttManager(hass, gateways, domain_data[DOMAIN_METRICS])
+    try:
         await mqtt_manager.connect()
+    except Exception:
+        # Stops the downlink queues and subscriptions started so far.
+        mqtt_manager.disconnect()
+        raise
+    domain_data[DOMAIN_MQTT_MANAGER] = mqtt_manager
+
+    firmware_fetcher = FirmwareReleaseFetcher(hass)
+    await firmware_fetcher.async_start()
+    domain_data[DOMAIN_FIRMWARE_FETCHER] = firmware_fetcher
 
-    coordinator = PlantSenseCoordinator(hass, entry)
-    entry.runtime_data = PlantSenseData(coordinator=coordinator)
+    domain_data[DOMAIN_SETUP_TIMINGS].record_shared(started)
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up PlantSense from a config entry."""
+    started = perf_counter_ns()
+    domain_data = hass.data[DOMAIN]
+    # Entries are set up concurrently; the first one starts the shared setup
+    # and all of them wait for the same task.
+    shared_setup = domain_data.get(DOMAIN_SHARED_SETUP)
+    if shared_setup is None:
+        shared_setup = domain_data[DOMAIN_SHARED_SETUP] = hass.async_create_task(
+            _async_setup_shared(hass), f"{DOMAIN} shared setup"
+        )
+    try:
+        shared_ready = await shared_setup
+    except Exception:
+        _forget_shared_setup(hass, shared_setup)
+        raise
+    if not shared_ready:
+        _forget_shared_setup(hass, shared_setup)
+        return False
+
+    mqtt_manager: MqttManager = domain_data[DOMAIN_MQTT_MANAGER]
+    firmware_fetcher: FirmwareReleaseFetcher = domain_data[DOMAIN_FIRMWARE_FETCHER]
+    sync_state: SyncStateStore = domain_data[DOMAIN_SYNC_STATE]
+    sync_state.async_migrate_entry(entry)
+    staleness: DeadlineWheel = domain_data[DOMAIN_STALENESS]
+    rollout: OtaRollout = domain_data[DOMAIN_OTA_ROLLOUT]
+    coordinator = PlantSenseCoordinator(
+        hass,
+        entry,
+        sync_state,
+        domain_data[DOMAIN_METRICS],
+        staleness,
+        rollout,
+        domain_data[DOMAIN_LAST_STATE],
+    )
+    entry.runtime_data = PlantSenseData(
+        coordinator=coordinator, firmware=firmware_fetcher
+    )
+    entry.async_on_unload(mqtt_manager.register_coordinator(coordinator))
+    entry.async_on_unload(firmware_fetcher.register_coordinator(coordinator))
+    entry.async_on_unload(rollout.register_coordinator(coordinator))
+    entry.async_on_unload(coordinator.statistics.flush)
+    entry.async_on_unload(partial(staleness.cancel, coordinator.device_serial))
+    entry.async_on_unload(entry.add_update_listener(coordinator.async_entry_updated))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    domain_data[DOMAIN_SETUP_TIMINGS].record_entry(entry.entry_id, started)
     return True
 
 
+@callback
+def _forget_shared_setup(hass: HomeAssistant, shared_setup: asyncio.Task[bool]) -> None:
+    """Let the next entry, or the retry of this one, try the shared setup again."""
+    domain_data = hass.data[DOMAIN]
+    # Concurrent entries all see the failure; a new attempt is left alone.
+    if domain_data.get(DOMAIN_SHARED_SETUP) is shared_setup:
+        del domain_data[DOMAIN_SHARED_SETUP]
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading entry %s", entry.entry_id)
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unloaded and not any(
+        other.entry_id != entry.entry_id
+        and other.state in (ConfigEntryState.LOADED, ConfigEntryState.SETUP_IN_PROGRESS)
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        _async_unload_shared(hass)
+    return unloaded
+
+
+@callback
+def _async_unload_shared(hass: HomeAssistant) -> None:
+    """Stop the helpers of the shared setup once the last entry is unloaded."""
+    domain_data = hass.data[DOMAIN]
+    # The next entry set up starts them again.
+    domain_data.pop(DOMAIN_SHARED_SETUP, None)
+    mqtt_manager: MqttManager | None = domain_data.pop(DOMAIN_MQTT_MANAGER, None)
+    if mqtt_manager is not None:
+        mqtt_manager.disconnect()
+    firmware_fetcher: FirmwareReleaseFetcher | None = domain_data.pop(
+        DOMAIN_FIRMWARE_FETCHER, None
+    )
+    if firmware_fetcher is not None:
+        firmware_fetcher.async_stop()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the sync and last state of a removed device."""
+    domain_data = hass.data.get(DOMAIN, {})
+    if CONF_DEVICE_SERIAL not in entry.data:
+        return
+    sync_state: SyncStateStore | None = domain_data.get(DOMAIN_SYNC_STATE)
+    if sync_state is not None:
+        sync_state.async_remove(entry.data[CONF_DEVICE_SERIAL])
+    last_state: LastStateStore | None = domain_data.get(DOMAIN_LAST_STATE)
+    if last_state is not None:
+        last_state.async_remove(entry.data[CONF_DEVICE_SERIAL])
@@ -0,0 +1,137 @@
+"""Config pushes to many PlantSense devices at once."""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import BULK_CONFIG_PUSHES_KEPT
+from .sync_state import PushOutcome
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from datetime import datetime
+
+    from .coordinator import PlantSenseCoordinator
+    from .sync_state import SyncStateStore
+
+_LOGGER = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUSES = (STATUS_PENDING, STATUS_SENT, *(outcome.value for outcome in PushOutcome))
+
+
+@dataclass(slots=True)
+class BulkConfigPush:
+    """The devices a partial config was pushed to."""
+
+    push_id: int
+    created: datetime
+    # Every device whose options changed.
+    serials: tuple[str, ...]
+    unchanged: int
+
+    def progress(self, sync_state: SyncStateStore) -> dict[str, Any]:
+        """Return the status of every device and how many are in each."""
+        devices = {serial: _status(sync_state, serial) for serial in self.serials}
+        counts = Counter(devices.values())
+        return {
+            "push_id": self.push_id,
+            "created": self.created.isoformat(),
+            "unchanged": self.unchanged,
+            **{status: counts[status] for status in STATUSES},
+            "devices": devices,
+        }
+
+
+def _status(sync_state: SyncStateStore, serial: str) -> str:
+    state = sync_state.get(serial)
+    if state.config_pending:
+        return STATUS_SENT if state.config_sent else STATUS_PENDING
+    # Only missing if the device was removed and added again meanwhile.
+    return (state.push_outcome or PushOutcome.CANCELLED).value
+
+
+class BulkConfigPushes:
+    """
+    Applies partial configs to many devices and tracks the recent pushes.
+
+    The options of all devices are updated and their pushes marked pending in
+    one pass, which Home Assistant and the sync state store each save with a
+    single delayed write. Nothing is transmitted right away: every
+    coordinator queues its `set_config` when its device next uplinks and
+    listens, so the downlinks are spread over the devices' own schedules.
+    """
+
+    _pushes: OrderedDict[int, BulkConfigPush]
+
+    def __init__(self, hass: HomeAssistant, sync_state: SyncStateStore) -> None:
+        """Initialize BulkConfigPushes."""
+        self._hass = hass
+        self._sync_state = sync_state
+        self._pushes = OrderedDict()
+        self._next_id = 1
+
+    @callback
+    def async_push(
+        self,
+        coordinators: Iterable[PlantSenseCoordinator],
+        options: Mapping[str, Any],
+    ) -> BulkConfigPush:
+        """Update the options of the devices and mark their config pending."""
+        serials = []
+        unchanged = 0
+        for coordinator in coordinators:
+            entry = coordinator.entry
+            new_options = {**entry.options, **options}
+            if new_options == entry.options:
+                unchanged += 1
+                continue
+            serials.append(coordinator.device_serial)
+            self._hass.config_entries.async_update_entry(entry, options=new_options)
+        # Before the entries' update listeners run, so they see the push.
+        self._sync_state.async_mark_pending(*serials)
+
+        push = BulkConfigPush(
+            push_id=self._next_id,
+            created=dt_util.utcnow(),
+            serials=tuple(serials),
+            unchanged=unchanged,
+        )
+        self._next_id += 1
+        self._pushes[push.push_id] = push
+        while len(self._pushes) > BULK_CONFIG_PUSHES_KEPT:
+            self._pushes.popitem(last=False)
+        _LOGGER.info(
+            "Pushing %s to %d devices (%d unchanged).",
+            sorted(options),
+            len(serials),
+            unchanged,
+        )
+        return push
+
+    @callback
+    def progress(self, push_id: int | None = None) -> dict[str, Any] | None:
+        """Return the progress of a push, by default the latest one."""
+        if push_id is None:
+            push = next(reversed(self._pushes.values()), None)
+        else:
+            push = self._pushes.get(push_id)
+        return push.progress(self._sync_state) if push is not None else None
+
+    @property
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                key: value
+                for key, value in push.progress(self._sync_state).items()
+                if key != "devices"
+            }
+            for push in self._pushes.values()
+        ]
@@ -6,11 +6,12 @@ from typing import TYPE_CHECKING
 from homeassistant.components.button import ENTITY_ID_FORMAT, ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo, async_generate_entity_id
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .coordinator import PlantSenseCoordinator
+from .coordinator import ConfigValue, PlantSenseComponent, PlantSenseCoordinator
+from .helpers import build_entity_id
 
 if TYPE_CHECKING:
     from .data import PlantSenseData
@@ -19,7 +20,7 @@ _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(
-    hass: HomeAssistant,
+    _hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
@@ -27,32 +28,32 @@ async def async_setup_entry(
     data: PlantSenseData = config_entry.runtime_data
     async_add_entities(
         [
-            CancelConfigPushButton(hass=hass, coordinator=data.coordinator),
-            FetchDeviceConfigButton(hass=hass, coordinator=data.coordinator),
+            CancelConfigPushButton(coordinator=data.coordinator),
+            FetchDeviceConfigButton(coordinator=data.coordinator),
         ]
     )
 
 
-class CancelConfigPushButton(ButtonEntity):
+class CancelConfigPushButton(ButtonEntity, PlantSenseComponent):
     """Button to cancel a pending config push and revert to confirmed device values."""
 
     _coordinator: PlantSenseCoordinator
 
-    def __init__(self, hass: HomeAssistant, coordinator: PlantSenseCoordinator) -> None:
+    _attr_has_entity_name = True
+    config_values = frozenset({ConfigValue.PENDING})
+    _attr_name = "Cancel Config Push"
+
+    def __init__(self, coordinator: PlantSenseCoordinator) -> None:
         """Initialize the button."""
         self._coordinator = coordinator
         self._attr_should_poll = False
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_unique_id = f"{coordinator.device_id}_cancel_config_push"
         self._attr_icon = "mdi:cancel"
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_cancel_config_push", hass=hass
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_cancel_config_push"
         )
 
-    @property
-    def name(self) -> str:
-        return f"{self._coordinator.device_name} Cancel Config Push"
-
     @property
     def available(self) -> bool:
         return self._coordinator.config_pending
@@ -64,37 +65,40 @@ class CancelConfigPushButton(ButtonEntity):
     async def async_press(self) -> None:
         await self._coordinator.async_abort_config_push()
 
-    async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            self._coordinator.entry.add_update_listener(self._handle_entry_update)
-        )
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """Uplinks do not change the config state."""
 
-    async def _handle_entry_update(
-        self, _hass: HomeAssistant, _entry: ConfigEntry
-    ) -> None:
+    @callback
+    def handle_config_update(self) -> None:
         self.async_write_ha_state()
 
+    async def async_added_to_hass(self) -> None:
+        self._coordinator.register_component(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._coordinator.remove_component(self)
 
-class FetchDeviceConfigButton(ButtonEntity):
+
+class FetchDeviceConfigButton(ButtonEntity, PlantSenseComponent):
     """Button to reset HA config to current device values on next contact."""
 
     _coordinator: PlantSenseCoordinator
 
-    def __init__(self, hass: HomeAssistant, coordinator: PlantSenseCoordinator) -> None:
+    _attr_has_entity_name = True
+    _attr_name = "Fetch Device Config"
+
+    def __init__(self, coordinator: PlantSenseCoordinator) -> None:
         """Initialize the button."""
         self._coordinator = coordinator
         self._attr_should_poll = False
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_unique_id = f"{coordinator.device_id}_fetch_device_config"
         self._attr_icon = "mdi:download-circle-outline"
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_fetch_device_config", hass=hass
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_fetch_device_config"
         )
 
-    @property
-    def name(self) -> str:
-        return f"{self._coordinator.device_name} Fetch Device Config"
-
     @property
     def device_info(self) -> DeviceInfo:
         return self._coordinator.device_info
@@ -102,12 +106,12 @@ class FetchDeviceConfigButton(ButtonEntity):
     async def async_press(self) -> None:
         await self._coordinator.async_schedule_fetch_device_config()
 
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """Ignore uplinks; the button has no state that follows the device."""
+
     async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            self._coordinator.entry.add_update_listener(self._handle_entry_update)
-        )
+        self._coordinator.register_component(self)
 
-    async def _handle_entry_update(
-        self, _hass: HomeAssistant, _entry: ConfigEntry
-    ) -> None:
-        self.async_write_ha_state()
+    async def async_will_remove_from_hass(self) -> None:
+        self._coordinator.remove_component(self)
@@ -0,0 +1,77 @@
+"""Moisture calibration applied in Home Assistant instead of on the device."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .const import OPTIONS_LOCAL_CALIBRATION, OPTIONS_MOI_DRY, OPTIONS_MOI_WET
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+if TYPE_CHECKING:
+    from array import array
+    from collections.abc import Mapping
+
+    from .messages import DataReading
+
+
+@dataclass(frozen=True, slots=True)
+class MoistureCalibration:
+    """
+    Derives the moisture percentage from the raw reading like the device does.
+
+    The raw value falls as the soil gets wetter; `dry` is 0% and `wet` 100%,
+    in between it is interpolated linearly and rounded to a whole percent.
+    """
+
+    dry: int
+    wet: int
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> MoistureCalibration | None:
+        """Return the calibration of the options, if it is enabled and valid."""
+        if not options.get(OPTIONS_LOCAL_CALIBRATION, False):
+            return None
+        dry = options.get(OPTIONS_MOI_DRY)
+        wet = options.get(OPTIONS_MOI_WET)
+        if not isinstance(dry, int) or not isinstance(wet, int) or dry == wet:
+            return None
+        return cls(dry=dry, wet=wet)
+
+    def percent(self, raw: float) -> float:
+        """Return the moisture percentage of a raw reading."""
+        if math.isnan(raw):
+            return math.nan
+        percent = (self.dry - raw) * 100 / (self.dry - self.wet)
+        return round(min(max(percent, 0), 100))
+
+    def apply(self, reading: DataReading) -> None:
+        """Replace the device's moisture percentage of a reading."""
+        if reading.moisture_raw is not None:
+            reading.moisture = self.percent(reading.moisture_raw)
+
+    def apply_column(self, raw: array, moisture: array) -> None:
+        """
+        Recompute a column of moisture percentages from raw readings in place.
+
+        Both are float arrays of the same length; NumPy computes them in one
+        pass over the arrays' buffers if it is installed.
+        """
+        if np is None:
+            for index, value in enumerate(raw):
+                moisture[index] = self.percent(value)
+            return
+
+        # Same operations in the same order and precision as `percent`, so
+        # both round a value on the edge between two percentages alike.
+        raw_values = np.frombuffer(raw, dtype=np.float32).astype(np.float64)
+        np.rint(
+            np.clip((self.dry - raw_values) * 100 / (self.dry - self.wet), 0, 100),
+            out=np.frombuffer(moisture, dtype=np.float32),
+            casting="same_kind",
+        )
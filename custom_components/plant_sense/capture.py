@@ -0,0 +1,228 @@
+"""Capture of raw uplink traffic and reading it back for replays."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import gzip
+import json
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import CAPTURE_FLUSH_INTERVAL_SECONDS
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+    from homeassistant.components.mqtt.models import ReceivePayloadType
+
+_LOGGER = logging.getLogger(__name__)
+
+_FILE_PATTERN = "uplinks-*.jsonl.gz"
+
+
+def capture_files(directory: Path) -> list[Path]:
+    """Return the capture files in the directory, oldest first; use in the executor."""
+    return sorted(directory.glob(_FILE_PATTERN))
+
+
+@dataclass(frozen=True, slots=True)
+class CapturedUplink:
+    """A raw uplink payload and when and through which gateway it arrived."""
+
+    received: float
+    gateway: str
+    payload: bytes
+
+
+class UplinkCapture:
+    """
+    Appends raw uplinks to gzip compressed JSONL files in a directory.
+
+    Recording an uplink only appends a line to a buffer; the executor writes
+    the buffer every few seconds. A new file is started once the current one
+    reaches the size limit and the oldest files beyond the file limit are
+    deleted. Payloads are kept as received, before any decoding.
+    """
+
+    _buffer: list[str]
+    _file: BinaryIO | None
+    _gzip: gzip.GzipFile | None
+    _unsubscribe_flush: CALLBACK_TYPE | None
+
+    def __init__(
+        self, hass: HomeAssistant, directory: Path, max_bytes: int, max_files: int
+    ) -> None:
+        """Initialize UplinkCapture."""
+        self._hass = hass
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._max_files = max_files
+        self._buffer = []
+        self._lock = asyncio.Lock()
+        self._file = None
+        self._gzip = None
+        self._path: Path | None = None
+        self._unsubscribe_flush = None
+        self.captured = 0
+
+    @callback
+    def start(self) -> None:
+        """Start writing recorded uplinks."""
+        self._unsubscribe_flush = async_track_time_interval(
+            self._hass,
+            self._async_flush,
+            timedelta(seconds=CAPTURE_FLUSH_INTERVAL_SECONDS),
+        )
+
+    async def async_stop(self) -> None:
+        """Write the remaining uplinks and close the file."""
+        if self._unsubscribe_flush is not None:
+            self._unsubscribe_flush()
+            self._unsubscribe_flush = None
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            await self._hass.async_add_executor_job(self._write_and_close, lines)
+
+    @callback
+    def record(self, gateway: str, payload: ReceivePayloadType) -> None:
+        """Buffer an uplink received through the gateway just now."""
+        record: dict[str, Any] = {"t": time.time(), "gw": gateway}
+        if isinstance(payload, str):
+            record["p"] = payload
+        else:
+            try:
+                record["p"] = payload.decode()
+            except UnicodeDecodeError:
+                record["b64"] = base64.b64encode(payload).decode()
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        self.captured += 1
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "file": self._path.name if self._path is not None else None,
+            "captured": self.captured,
+            "buffered": len(self._buffer),
+        }
+
+    async def _async_flush(self, _now: datetime | None = None) -> None:
+        # A slow disk must not pile up writes; the buffer waits for the next one.
+        if not self._buffer or self._lock.locked():
+            return
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            await self._hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        if not lines:
+            return
+        if self._file is None or self._gzip is None:
+            self._file, self._gzip = self._open()
+        self._gzip.write("".join(f"{line}\n" for line in lines).encode())
+        # Keeps the file readable up to here while it is still being written.
+        self._gzip.flush()
+        if self._file.tell() >= self._max_bytes:
+            self._close()
+
+    def _write_and_close(self, lines: list[str]) -> None:
+        self._write(lines)
+        self._close()
+
+    def _open(self) -> tuple[BinaryIO, gzip.GzipFile]:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._path = (
+            self._directory / f"uplinks-{dt_util.utcnow():%Y%m%dT%H%M%S}.jsonl.gz"
+        )
+        _LOGGER.debug("Capturing uplinks to %s.", self._path)
+        # Rotating twice within a second appends another gzip member.
+        file = self._path.open("ab")
+
+        for old_file in capture_files(self._directory)[: -self._max_files]:
+            _LOGGER.debug("Deleting old capture %s.", old_file)
+            old_file.unlink(missing_ok=True)
+        return file, gzip.GzipFile(fileobj=file, mode="wb")
+
+    def _close(self) -> None:
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CaptureReader:
+    """
+    Reads the uplinks of a capture file in batches; use in the executor.
+
+    A file that turns out to be corrupt, or no capture at all, ends like a
+    complete one after the uplinks read up to the damage.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize CaptureReader; raises OSError if it cannot be opened."""
+        self._path = path
+        self._file = gzip.open(path, "rt", encoding="utf-8")  # noqa: SIM115
+        self._ended = False
+        self.read_uplinks = 0
+        self.skipped = 0
+
+    def read(self, count: int) -> list[CapturedUplink]:
+        """Return the next uplinks, at most `count`, or none at the end."""
+        uplinks: list[CapturedUplink] = []
+        if self._ended:
+            return uplinks
+        try:
+            for line in self._file:
+                uplink = self._parse(line)
+                if uplink is None:
+                    self.skipped += 1
+                    continue
+                uplinks.append(uplink)
+                if len(uplinks) >= count:
+                    break
+        except EOFError:
+            # The capture is still being written to.
+            _LOGGER.debug("%s ends in an unfinished block.", self._path.name)
+        except (OSError, zlib.error, UnicodeDecodeError) as err:
+            self._ended = True
+            _LOGGER.warning(
+                "Stopped reading %s after %d uplinks, it is damaged: %s",
+                self._path.name,
+                self.read_uplinks + len(uplinks),
+                err,
+            )
+        self.read_uplinks += len(uplinks)
+        return uplinks
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+    @staticmethod
+    def _parse(line: str) -> CapturedUplink | None:
+        try:
+            record = json.loads(line)
+            payload = (
+                record["p"].encode()
+                if "p" in record
+                else base64.b64decode(record["b64"], validate=True)
+            )
+            return CapturedUplink(
+                received=float(record["t"]),
+                gateway=str(record["gw"]),
+                payload=payload,
+            )
+        except (ValueError, KeyError, TypeError, AttributeError, binascii.Error):
+            return None
@@ -0,0 +1,191 @@
+"""Compact binary frames exchanged with devices in the gateway's `hex` field."""
+
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from homeassistant.util.json import JsonObjectType
+
+# First byte of a frame; JSON documents start with `{` instead. Later versions
+# of the layout get the next values of the range.
+FORMAT_V1 = 0xB1
+COMPACT_FORMATS = range(0xB0, 0xC0)
+SUPPORTED_FORMATS = (FORMAT_V1,)
+
+_FLAG_TEST = 0x01
+# Presence bits of the optional fields, following the test flag.
+_OPTIONAL_FIELDS = ("fw", "moi", "moiRaw", "hum", "tempc", "bat", "batPct")
+_ALL_PRESENT = sum(1 << bit for bit in range(1, len(_OPTIONAL_FIELDS) + 1))
+
+# Format, serial (6 bytes), flags, config version, firmware major, minor and
+# patch, moisture %, raw moisture, humidity (0.1 %), temperature (0.1 °C),
+# battery (mV), battery %. All little endian; fields the device did not
+# measure have their presence bit cleared and are zero.
+_DATA_V1 = struct.Struct("<B6sBHBBBBHHhHB")
+_SERIAL_SIZE = 6
+# Major, minor and patch.
+_FIRMWARE_PARTS = 3
+
+_MODEL = "PlantSense"
+
+# First byte of a compact downlink.
+DOWNLINK_FORMAT_V1 = 0xC1
+_CMD_SET_CONFIG = 0x01
+# Tag of every set_config field; the JSON keys are the long form.
+_CONFIG_TAGS = {
+    "name": 0x01,
+    "test": 0x02,
+    "moiDry": 0x03,
+    "moiWet": 0x04,
+    "ssid": 0x05,
+    "wifiPwd": 0x06,
+}
+# Format, serial (6 bytes), fragment index (high nibble) and count (low).
+_DOWNLINK_HEADER = struct.Struct("<B6sB")
+_MAX_FRAGMENTS = 0x0F
+
+
+def decode_frame(frame: bytes) -> JsonObjectType | None:
+    """
+    Return the data message of a compact frame, None if it is not valid.
+
+    The message has the same fields as the device's JSON, so the rest of the
+    pipeline does not tell the formats apart. The serial is in lowercase hex;
+    the manager compares serials regardless of case.
+    """
+    if len(frame) != _DATA_V1.size or frame[0] != FORMAT_V1:
+        return None
+    (
+        _format,
+        serial,
+        flags,
+        version,
+        fw_major,
+        fw_minor,
+        fw_patch,
+        moisture,
+        moisture_raw,
+        humidity,
+        temperature,
+        battery_mv,
+        battery,
+    ) = _DATA_V1.unpack(frame)
+
+    message: JsonObjectType = {
+        "id": serial.hex(),
+        "model": _MODEL,
+        "msg": "data",
+        "v": version,
+        "test": bool(flags & _FLAG_TEST),
+        "fw": f"{fw_major}.{fw_minor}.{fw_patch}",
+        "moi": moisture,
+        "moiRaw": moisture_raw,
+        "hum": humidity / 10,
+        "tempc": temperature / 10,
+        "bat": battery_mv / 1000,
+        "batPct": battery,
+    }
+    if flags & _ALL_PRESENT != _ALL_PRESENT:
+        for bit, field in enumerate(_OPTIONAL_FIELDS, 1):
+            if not flags & (1 << bit):
+                del message[field]
+    return message
+
+
+def encode_data(message: Mapping[str, Any]) -> bytes:
+    """
+    Return the compact frame of a JSON data message, like the firmware sends.
+
+    The frame only has room for a `major.minor.patch` firmware version of
+    numbers up to 255; versions with fewer parts or a suffix such as
+    `1.2.3-beta` cannot be sent compact. Raises ValueError if the version or
+    another value does not fit the frame.
+    """
+    serial = _serial(message["id"])
+    flags = _FLAG_TEST if message.get("test") else 0
+    for bit, field in enumerate(_OPTIONAL_FIELDS, 1):
+        if message.get(field) is not None:
+            flags |= 1 << bit
+    fw = message.get("fw")
+    try:
+        return _DATA_V1.pack(
+            FORMAT_V1,
+            serial,
+            flags,
+            message.get("v", 0),
+            *(_firmware(fw) if fw is not None else (0, 0, 0)),
+            _scaled(message.get("moi"), 1),
+            _scaled(message.get("moiRaw"), 1),
+            _scaled(message.get("hum"), 10),
+            _scaled(message.get("tempc"), 10),
+            _scaled(message.get("bat"), 1000),
+            _scaled(message.get("batPct"), 1),
+        )
+    except (struct.error, TypeError) as err:
+        msg = f"Message does not fit a compact frame: {err}"
+        raise ValueError(msg) from err
+
+
+def encode_set_config(
+    serial: str, changes: Mapping[str, Any], max_frame: int
+) -> list[bytes]:
+    """
+    Return the frames of a `set_config` command with only the given fields.
+
+    Every field is its tag, the length and the value; integers are 16 bit
+    little endian and strings UTF-8. The command is split across as many
+    frames as it takes to keep each within `max_frame` bytes, and the
+    device joins them in the order of their index. Raises ValueError if
+    the fields do not fit.
+    """
+    body = bytearray([_CMD_SET_CONFIG])
+    try:
+        for key, value in changes.items():
+            if isinstance(value, bool):
+                data = bytes([value])
+            elif isinstance(value, int):
+                data = struct.pack("<H", value)
+            else:
+                data = str(value).encode()
+            body += bytes([_CONFIG_TAGS[key], len(data)]) + data
+    except (struct.error, ValueError) as err:
+        msg = f"Config does not fit a compact frame: {err}"
+        raise ValueError(msg) from err
+
+    size = max_frame - _DOWNLINK_HEADER.size
+    chunks = [body[start : start + size] for start in range(0, len(body), size)]
+    if len(chunks) > _MAX_FRAGMENTS:
+        msg = f"Config needs {len(chunks)} frames, at most {_MAX_FRAGMENTS} fit"
+        raise ValueError(msg)
+    header = (DOWNLINK_FORMAT_V1, _serial(serial))
+    return [
+        _DOWNLINK_HEADER.pack(*header, index << 4 | len(chunks)) + chunk
+        for index, chunk in enumerate(chunks)
+    ]
+
+
+def _serial(serial: str) -> bytes:
+    data = bytes.fromhex(serial)
+    if len(data) != _SERIAL_SIZE:
+        msg = f"Serial {serial} is not {_SERIAL_SIZE} bytes"
+        raise ValueError(msg)
+    return data
+
+
+def _firmware(fw: str) -> tuple[int, int, int]:
+    parts = fw.split(".")
+    if len(parts) != _FIRMWARE_PARTS or not all(
+        part.isdigit() and part.isascii() for part in parts
+    ):
+        msg = f"Firmware version {fw} is not major.minor.patch"
+        raise ValueError(msg)
+    major, minor, patch = (int(part) for part in parts)
+    return major, minor, patch
+
+
+def _scaled(value: float | None, scale: int) -> int:
+    return 0 if value is None else round(value * scale)
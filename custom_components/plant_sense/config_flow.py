@@ -15,19 +15,20 @@ from homeassistant.config_entries import (
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 
-from custom_components.plant_sense.helpers import build_unique_id
+from custom_components.plant_sense.helpers import build_unique_id, normalize_serial
 
 from .const import (
     CONF_DEVICE_SERIAL,
     DISCOVERY_NAME,
     DISCOVERY_SERIAL,
     DOMAIN,
+    DOMAIN_SYNC_STATE,
     OPTIONS_AUTO_UPDATE,
     OPTIONS_ENABLE_TEST,
+    OPTIONS_LOCAL_CALIBRATION,
     OPTIONS_MOI_DRY,
     OPTIONS_MOI_WET,
     OPTIONS_SSID,
-    OPTIONS_UPDATE_CONFIG,
     OPTIONS_UPDATE_NAME,
     OPTIONS_UPDATE_TEST_MODE,
     OPTIONS_WIFI_PWD,
@@ -36,6 +37,8 @@ from .const import (
 if TYPE_CHECKING:
     from homeassistant.helpers.typing import DiscoveryInfoType
 
+    from .sync_state import SyncStateStore
+
 _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
@@ -100,6 +103,14 @@ class PlantSenseConfigFlow(ConfigFlow, domain=DOMAIN):
             self._discovery_unique_id, raise_on_progress=False
         )
         self._abort_if_unique_id_configured()
+        # Compact frames report the serial of a device set up from its JSON
+        # in another case.
+        serial = normalize_serial(self._discovery_serial)
+        if any(
+            normalize_serial(entry.data.get(CONF_DEVICE_SERIAL, "")) == serial
+            for entry in self._async_current_entries(include_ignore=False)
+        ):
+            return self.async_abort(reason="already_configured")
 
         return await self.async_step_integration_discovery_confirm()
 
@@ -154,19 +165,17 @@ class OptionsFlowHandler(OptionsFlow):
                 user_input.get(key) != self.entry.options.get(key)
                 for key in config_fields
             )
-            options = {**user_input}
-            options[OPTIONS_UPDATE_CONFIG] = (
-                True
-                if config_changed
-                else self.entry.options.get(OPTIONS_UPDATE_CONFIG, False)
-            )
-            return self.async_create_entry(title="", data=options)
+            if config_changed:
+                sync_state: SyncStateStore = self.hass.data[DOMAIN][DOMAIN_SYNC_STATE]
+                sync_state.async_mark_pending(self.entry.data[CONF_DEVICE_SERIAL])
+            return self.async_create_entry(title="", data=user_input)
 
         enable_test = self.entry.options.get(OPTIONS_ENABLE_TEST, False)
         test_mode = self.entry.options.get(OPTIONS_UPDATE_TEST_MODE, False)
         name = self.entry.options.get(OPTIONS_UPDATE_NAME, "")
         moi_dry = self.entry.options.get(OPTIONS_MOI_DRY, 0)
         moi_wet = self.entry.options.get(OPTIONS_MOI_WET, 0)
+        local_calibration = self.entry.options.get(OPTIONS_LOCAL_CALIBRATION, False)
         ssid = self.entry.options.get(OPTIONS_SSID, "")
         wifi_pwd = self.entry.options.get(OPTIONS_WIFI_PWD, "")
         auto_update = self.entry.options.get(OPTIONS_AUTO_UPDATE, False)
@@ -180,6 +189,9 @@ class OptionsFlowHandler(OptionsFlow):
                     vol.Optional(OPTIONS_UPDATE_TEST_MODE, default=test_mode): bool,
                     vol.Optional(OPTIONS_MOI_DRY, default=moi_dry): int,
                     vol.Optional(OPTIONS_MOI_WET, default=moi_wet): int,
+                    vol.Optional(
+                        OPTIONS_LOCAL_CALIBRATION, default=local_calibration
+                    ): bool,
                     vol.Optional(OPTIONS_SSID, default=ssid): str,
                     vol.Optional(OPTIONS_WIFI_PWD, default=wifi_pwd): str,
                     vol.Optional(OPTIONS_AUTO_UPDATE, default=auto_update): bool,
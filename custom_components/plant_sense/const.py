@@ -2,21 +2,65 @@
 
 DOMAIN = "plant_sense"
 
-CONF_MQTT_ROOT = "MQTT_ROOT_TOPIC"
 CONF_DEVICE_SERIAL = "DEVICE_SERIAL"
 
+CONF_GATEWAYS = "gateways"
+CONF_MQTT_ROOT = "mqtt_root"
+CONF_UPLINK_TOPIC = "uplink_topic"
+CONF_DOWNLINK_TOPIC = "downlink_topic"
+CONF_FRAME_SPACING = "frame_spacing"
+CONF_METRICS = "metrics"
+CONF_RAW_DIAGNOSTIC_SENSORS = "raw_diagnostic_sensors"
+CONF_OTA_ROLLOUT = "ota_rollout"
+CONF_CANARY_PERCENT = "canary_percent"
+CONF_MAX_CONCURRENT = "max_concurrent"
+CONF_UPDATE_TIMEOUT = "update_timeout"
+
+DEFAULT_GATEWAY_NAME = "OMG_LILYGO"
+DEFAULT_MQTT_ROOT = "devices/OMG_LILYGO"
+
 OPTIONS_UPDATE_NAME = "name"
 OPTIONS_UPDATE_CONFIG = "update_config"
 OPTIONS_UPDATE_TEST_MODE = "update_test_mode"
 OPTIONS_ENABLE_TEST = "enable_test"
 OPTIONS_MOI_DRY = "moi_dry"
 OPTIONS_MOI_WET = "moi_wet"
+OPTIONS_LOCAL_CALIBRATION = "local_calibration"
 OPTIONS_SSID = "ssid"
 OPTIONS_WIFI_PWD = "wifi_pwd"  # noqa: S105
 OPTIONS_AUTO_UPDATE = "auto_update"
 
 FIRMWARE_GITHUB_REPO = "mjeanrichard/LoraSensor"
 FIRMWARE_CHECK_INTERVAL_HOURS = 4
+OTA_CANARY_PERCENT = 10
+OTA_MAX_CONCURRENT = 2
+OTA_UPDATE_TIMEOUT_MINUTES = 30
+
+DOWNLINK_FRAME_SPACING_SECONDS = 0.25
+DOWNLINK_MAX_AGE_SECONDS = 5.0
+# Largest payload of a LoRa frame; longer compact downlinks are split.
+LORA_MAX_PAYLOAD_BYTES = 255
+# Oldest firmware that understands compact set_config downlinks.
+COMPACT_DOWNLINK_MIN_FIRMWARE = "2.0.0"
+# Copies of an uplink arriving within this window are dropped.
+DEDUPE_WINDOW_SECONDS = 10.0
+DEDUPE_MAX_ENTRIES = 1024
+# Readings kept in memory per device, a day at one uplink every five minutes.
+HISTORY_SIZE = 288
+SYNC_STATE_SAVE_DELAY_SECONDS = 10
+# The last readings of all devices are written at most once per delay.
+LAST_STATE_SAVE_DELAY_SECONDS = 60
+# A device is stale once it missed this many of its learned uplink intervals.
+STALE_INTERVAL_FACTOR = 3
+STALE_MIN_SECONDS = 5 * 60
+STALE_WHEEL_RESOLUTION_SECONDS = 30
+# Raw uplinks are captured to this directory inside the config directory.
+CAPTURE_DIRECTORY = "plant_sense_captures"
+CAPTURE_FLUSH_INTERVAL_SECONDS = 5
+CAPTURE_MAX_FILE_MB = 10
+CAPTURE_MAX_FILES = 10
+REPLAY_BATCH_SIZE = 500
+BULK_CONFIG_PUSHES_KEPT = 10
 
 DATA_LAST_CONFIG_VERSION = "config_version"
 DATA_CONFIRMED_NAME = "confirmed_name"
@@ -24,7 +68,17 @@ DATA_CONFIRMED_TEST_MODE = "confirmed_test_mode"
 DATA_CONFIRMED_MOI_DRY = "confirmed_moi_dry"
 DATA_CONFIRMED_MOI_WET = "confirmed_moi_wet"
 
+DOMAIN_BULK_CONFIG = "bulk_config"
+DOMAIN_CONFIG = "config"
+DOMAIN_METRICS = "metrics"
+DOMAIN_SETUP_TIMINGS = "setup_timings"
+DOMAIN_SHARED_SETUP = "shared_setup"
+DOMAIN_STALENESS = "staleness"
+DOMAIN_SYNC_STATE = "sync_state"
+DOMAIN_LAST_STATE = "last_state"
 DOMAIN_MQTT_MANAGER = "mqtt_manager"
+DOMAIN_OTA_ROLLOUT = "ota_rollout"
+DOMAIN_FIRMWARE_FETCHER = "firmware_fetcher"
 
 DISCOVERY_SERIAL = "discovery_serial_number"
 DISCOVERY_NAME = "discovery_name"
@@ -1,48 +1,87 @@
 """Coordinator for PlantSense."""
 
-import asyncio
-import json
+import hashlib
 import logging
+import time
 from abc import ABC, abstractmethod
+from dataclasses import replace
+from datetime import datetime
+from enum import StrEnum
+from time import perf_counter_ns
+from typing import Any
 
 import homeassistant.helpers.device_registry as dr
-from homeassistant.components import mqtt
+from awesomeversion import AwesomeVersion, AwesomeVersionCompareException
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import (
     DeviceEntry,
     DeviceInfo,
     DeviceRegistry,
 )
+from homeassistant.util import dt as dt_util
 from homeassistant.util.json import JsonObjectType
 
 from custom_components.plant_sense.data import PlantSenseData
 
+from .calibration import MoistureCalibration
+from .compact import encode_set_config
 from .const import (
+    COMPACT_DOWNLINK_MIN_FIRMWARE,
     CONF_DEVICE_SERIAL,
-    DATA_CONFIRMED_MOI_DRY,
-    DATA_CONFIRMED_MOI_WET,
-    DATA_CONFIRMED_NAME,
-    DATA_CONFIRMED_TEST_MODE,
-    DATA_LAST_CONFIG_VERSION,
+    DEDUPE_WINDOW_SECONDS,
     DOMAIN,
+    HISTORY_SIZE,
+    LORA_MAX_PAYLOAD_BYTES,
     OPTIONS_AUTO_UPDATE,
     OPTIONS_ENABLE_TEST,
     OPTIONS_MOI_DRY,
     OPTIONS_MOI_WET,
     OPTIONS_SSID,
-    OPTIONS_UPDATE_CONFIG,
     OPTIONS_UPDATE_NAME,
     OPTIONS_UPDATE_TEST_MODE,
     OPTIONS_WIFI_PWD,
 )
+from .downlink import DownlinkPriority
+from .gateway import Gateway
+from .history import ReadingHistory
+from .last_state import LastStateStore
+from .messages import ConfigReport, DataReading, WifiReport, decode_message
+from .metrics import PipelineMetrics, Stage
+from .rollout import OtaRollout
+from .staleness import DeadlineWheel, UplinkInterval
+from .statistics import HourlyStatistics
+from .sync_state import DeviceSyncState, PushOutcome, SyncStateStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class ConfigValue(StrEnum):
+    """Config state derived from the entry and the sync state."""
+
+    PENDING = "pending"
+    VERSION = "version"
+    WIFI_CONFIGURED = "wifi_configured"
+
+
 class PlantSenseComponent(ABC):
+    # The config values the component shows; it is notified when they change.
+    config_values: frozenset[ConfigValue] = frozenset()
+    # Whether the component shows the pipeline metrics of the device, which
+    # change after every dispatch.
+    pipeline_metrics: bool = False
+
     @abstractmethod
-    async def update_async(self) -> None: ...
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """
+        Refresh from the coordinator's current state.
+
+        Components only write their state if it changed, unless `force` is set
+        because something outside their value (e.g. the device name) changed.
+        """
+
+    def handle_config_update(self) -> None:  # noqa: B027
+        """Refresh after one of `config_values` changed."""
 
 
 class PlantSenseCoordinator:
@@ -51,77 +90,189 @@ class PlantSenseCoordinator:
     _device_serial: str
     _device_id: str
     _components: list[PlantSenseComponent]
-    _data: JsonObjectType | None
+    _pipeline_components: list[PlantSenseComponent]
+    _config_snapshot: dict[ConfigValue, object]
+    _data: DataReading | None
+    _data_received: datetime | None
+    _history: ReadingHistory
+    _statistics: HourlyStatistics
 
     _entry: ConfigEntry[PlantSenseData]
     _device_registry: DeviceRegistry
+    _sync_state: SyncStateStore
+    _sync: DeviceSyncState
     _display_name: str
+    _device_info: DeviceInfo
     _firmware_version: str | None
     _latest_firmware_version: str | None
     _wifi_configured: bool | None
-
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry[PlantSenseData]) -> None:
+    _gateway: Gateway | None
+    _uplinks: int
+    _last_dispatch_us: float | None
+
+    def __init__(  # noqa: PLR0913
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry[PlantSenseData],
+        sync_state: SyncStateStore,
+        metrics: PipelineMetrics | None = None,
+        staleness: DeadlineWheel | None = None,
+        rollout: OtaRollout | None = None,
+        last_state: LastStateStore | None = None,
+    ) -> None:
         """Initialize PlantSenseCoordinator."""
         self._entry = entry
+        self._metrics = metrics
+        self._staleness = staleness
+        self._rollout = rollout
+        self._last_state = last_state
         self.hass = hass
         self._device_serial = entry.data.get(CONF_DEVICE_SERIAL, "")
         self._device_id = entry.unique_id or ""
+        self._sync_state = sync_state
+        self._sync = sync_state.get(self._device_serial)
         self._data = None
+        # When `_data` was received live; None if it was restored or replayed.
+        self._data_received = None
+        self._history = ReadingHistory(HISTORY_SIZE)
+        self._calibration = MoistureCalibration.from_options(entry.options)
         self._device_registry = dr.async_get(self.hass)
         self._display_name = entry.title
         self._firmware_version = None
         self._latest_firmware_version = None
         self._wifi_configured = None
+        self._interval = UplinkInterval()
+        open_hour = None
+        if last_state is not None:
+            # Shown until the device is heard from again.
+            restored = last_state.get(self._device_serial)
+            self._data = restored.reading
+            self._firmware_version = restored.firmware_version
+            self._wifi_configured = restored.wifi_configured
+            self._interval = UplinkInterval(restored.uplink_interval)
+            open_hour = restored.open_hour
+        self._statistics = HourlyStatistics(
+            hass, self._device_serial, self._display_name, open_hour
+        )
+        self._gateway = None
+        self._uplinks = 0
+        self._last_dispatch_us = None
+        self._available = True
         self._components = []
-
-    async def handle_message(self, json_message: JsonObjectType) -> None:
-        """Handle a message from the PlantSense."""
+        self._pipeline_components = []
+        self._device_info = self._build_device_info()
+        self._config_snapshot = self._config_values()
+        if staleness is not None:
+            # A device that stays silent after startup becomes stale, too.
+            self._schedule_deadline(staleness, time.monotonic())
+
+    async def handle_message(
+        self, gateway: Gateway, json_message: JsonObjectType
+    ) -> None:
+        """Handle a message from the PlantSense received through the gateway."""
+        message = decode_message(json_message)
+        # Downlinks go out through the gateway that heard the device last (or
+        # best, see update_link_quality).
+        self._gateway = gateway
+        self._uplinks += 1
         msg_type = json_message.get("msg")
+        if self._staleness is not None:
+            self._track_contact(self._staleness, learn=msg_type == "data")
         _LOGGER.info("Received message type '%s'.", msg_type)
 
-        if msg_type == "data":
-            await self._update_sensors(json_message)
-            await self._handle_pending_commands(json_message)
-        elif msg_type == "config":
-            await self._update_config(json_message)
-        elif msg_type == "wifi":
-            await self._update_firmware_version(json_message)
+        if isinstance(message, DataReading):
+            await self._update_sensors(message)
+            await self._handle_pending_commands(message)
+        elif isinstance(message, ConfigReport):
+            await self._update_config(message)
+        elif isinstance(message, WifiReport):
+            await self._update_firmware_version(message.firmware)
+
+    @callback
+    def replay_message(
+        self, json_message: JsonObjectType, received: datetime, *, backfill: bool
+    ) -> None:
+        """
+        Handle a message replayed from a capture that was received at the time.
+
+        Its reading goes into the history and statistics, unless they already
+        hold it, and without `backfill` the sensors show it, too. Nothing else
+        about the device changes: config reports are ignored, no commands are
+        queued and the sync state, rollout, last state, availability and the
+        gateway used for downlinks stay as they are.
+        """
+        message = decode_message(json_message)
+        if not isinstance(message, DataReading) or not self._accepts_data(message):
+            return
+        self._record_reading(received, message, replayed=True)
+        if not backfill:
+            self._data = message
+            self._data_received = None
+            # Not timed; the fan-out metrics only cover live uplinks.
+            for component in self._components:
+                component.handle_coordinator_update()
+
+    @callback
+    def _track_contact(self, staleness: DeadlineWheel, *, learn: bool) -> None:
+        """Move the deadline after an uplink and learn from readings' timing."""
+        now = time.monotonic()
+        if learn:
+            self._interval.observe(now)
+        self._schedule_deadline(staleness, now)
+        if not self._available:
+            _LOGGER.info("'%s' is sending again.", self._device_serial)
+            self._available = True
+            self._update_components(force=True)
+
+    @callback
+    def _schedule_deadline(self, staleness: DeadlineWheel, now: float) -> None:
+        deadline = self._interval.deadline(now)
+        if deadline is not None:
+            staleness.schedule(self._device_serial, deadline, self._handle_stale)
+
+    @callback
+    def _handle_stale(self) -> None:
+        _LOGGER.info(
+            "'%s' missed its uplinks (about every %.0f s).",
+            self._device_serial,
+            self._interval.interval,
+        )
+        self._available = False
+        self._update_components(force=True)
+
+    @callback
+    def _enqueue(self, command: dict[str, Any], priority: DownlinkPriority) -> None:
+        if self._gateway is None:
+            _LOGGER.warning("No gateway has heard '%s' yet.", self._device_serial)
+            return
+        self._gateway.downlink.enqueue(self._device_serial, command, priority)
+
+    @callback
+    def _enqueue_frames(
+        self, cmd: str, frames: list[bytes], priority: DownlinkPriority
+    ) -> None:
+        if self._gateway is None:
+            _LOGGER.warning("No gateway has heard '%s' yet.", self._device_serial)
+            return
+        self._gateway.downlink.enqueue_frames(
+            self._device_serial, cmd, frames, priority
+        )
 
-    async def _request_config(self) -> None:
+    @callback
+    def _request_config(self) -> None:
         """Request the current configuration from the PlantSense."""
         _LOGGER.info("Requesting config for %s.", self._device_serial)
-        await asyncio.sleep(0.1)
-        await mqtt.client.async_publish(
-            self.hass,
-            "devices/OMG_LILYGO/commands/MQTTtoLORA",
-            f'{{"message":"{{\\"id\\":\\"{self._device_serial}\\",\\"cmd\\":\\"get_config\\"}}"}}',
-        )
+        self._enqueue({"cmd": "get_config"}, DownlinkPriority.GET_CONFIG)
 
-    async def _update_config(self, json_message: JsonObjectType) -> None:
+    async def _update_config(self, report: ConfigReport) -> None:
         """Update the configuration from the PlantSense."""
-        new_config_version = json_message.get("v", 0)
-        if not isinstance(new_config_version, int):
-            new_config_version = 0
-
-        new_name = str(json_message.get("name", "unknown"))
-
-        test_mode = json_message.get("test", False)
-        if not isinstance(test_mode, bool):
-            test_mode = False
-
-        moi_dry = json_message.get("moiDry")
-        if not isinstance(moi_dry, int):
-            moi_dry = None
-
-        moi_wet = json_message.get("moiWet")
-        if not isinstance(moi_wet, int):
-            moi_wet = None
-
-        try:
-            old_config_version = int(self._entry.data.get(DATA_LAST_CONFIG_VERSION, 0))
-        except (ValueError, TypeError):
-            old_config_version = 0
+        new_config_version = report.version
+        new_name = report.name
+        test_mode = report.test
+        moi_dry = report.moi_dry
+        moi_wet = report.moi_wet
 
+        old_config_version = self._sync.config_version
         if new_config_version != old_config_version:
             _LOGGER.info(
                 "Storing config version %s (replacing %s).",
@@ -130,17 +281,36 @@ class PlantSenseCoordinator:
             )
 
             self._display_name = f"PlantSense {new_name}"
+            self._statistics.device_name = self._display_name
             await self._update_device_name(self._display_name)
-            await self._update_firmware_version(json_message)
-
-            wifi_set = json_message.get("wifiSet")
-            if isinstance(wifi_set, bool):
-                self._wifi_configured = wifi_set
+            await self._update_firmware_version(report.firmware)
+
+            if report.wifi_set is not None:
+                self._wifi_configured = report.wifi_set
+
+            sync = self._sync
+            ssid = self._entry.options.get(OPTIONS_SSID, "")
+            if report.wifi_set is False:
+                sync.confirmed_wifi = None
+            elif sync.config_sent and ssid:
+                # The device applied the push, including the credentials.
+                sync.confirmed_wifi = _wifi_digest(
+                    ssid, self._entry.options.get(OPTIONS_WIFI_PWD, "")
+                )
+            sync.config_version = new_config_version
+            # A config the device reports before it got the push replaces it.
+            sync.end_push(
+                PushOutcome.CONFIRMED if sync.config_sent else PushOutcome.CANCELLED
+            )
+            sync.confirmed_name = new_name
+            sync.confirmed_test_mode = test_mode
+            if moi_dry is not None:
+                sync.confirmed_moi_dry = moi_dry
+            if moi_wet is not None:
+                sync.confirmed_moi_wet = moi_wet
+            self._sync_state.async_schedule_save()
 
             options = {**self._entry.options}
-            data = {**self._entry.data}
-
-            options[OPTIONS_UPDATE_CONFIG] = False
             options[OPTIONS_UPDATE_NAME] = new_name
             options[OPTIONS_UPDATE_TEST_MODE] = test_mode
             if moi_dry is not None:
@@ -148,56 +318,175 @@ class PlantSenseCoordinator:
             if moi_wet is not None:
                 options[OPTIONS_MOI_WET] = moi_wet
 
-            data[DATA_LAST_CONFIG_VERSION] = new_config_version
-            data[DATA_CONFIRMED_NAME] = new_name
-            data[DATA_CONFIRMED_TEST_MODE] = test_mode
-            if moi_dry is not None:
-                data[DATA_CONFIRMED_MOI_DRY] = moi_dry
-            if moi_wet is not None:
-                data[DATA_CONFIRMED_MOI_WET] = moi_wet
-
-            self.hass.config_entries.async_update_entry(
-                self._entry, title=self._display_name, options=options, data=data
-            )
+            # After a push the device confirms what the options already say.
+            if (
+                options != self._entry.options
+                or self._entry.title != self._display_name
+            ):
+                self.hass.config_entries.async_update_entry(
+                    self._entry, title=self._display_name, options=options
+                )
 
-            for component in self._components:
-                await component.update_async()
+            self._save_last_state()
+            self._update_components(force=True)
+            self._async_config_changed()
 
     def register_component(self, component: PlantSenseComponent) -> None:
         self._components.append(component)
+        if component.pipeline_metrics:
+            self._pipeline_components.append(component)
 
     def remove_component(self, component: PlantSenseComponent) -> None:
         self._components.remove(component)
+        if component.pipeline_metrics:
+            self._pipeline_components.remove(component)
 
-    async def _update_sensors(self, json: JsonObjectType) -> None:
-        """Update the Sensors with the new Data."""
-        if json.get("test", False) and not self._entry.options.get(
-            OPTIONS_ENABLE_TEST, False
-        ):
+    def _accepts_data(self, reading: DataReading) -> bool:
+        if reading.test and not self._entry.options.get(OPTIONS_ENABLE_TEST, False):
             _LOGGER.info(
                 "Skipping update for (%s) because it was test data...",
                 self._device_serial,
             )
+            return False
+        return True
+
+    def _record_reading(
+        self, received: datetime, reading: DataReading, *, replayed: bool = False
+    ) -> None:
+        # Also changes the reading the sensors show.
+        if self._calibration is not None:
+            self._calibration.apply(reading)
+        timestamp = received.timestamp()
+        # The capture and the history stamp the same uplink a moment apart.
+        if replayed and self._history.holds(timestamp, DEDUPE_WINDOW_SECONDS):
+            return
+        self._history.append(timestamp, reading)
+        self._statistics.add(received, reading, replayed=replayed)
+
+    async def _update_sensors(self, reading: DataReading) -> None:
+        """Update the Sensors with the new Data."""
+        if not self._accepts_data(reading):
+            return
+
+        self._data = reading
+        self._data_received = dt_util.utcnow()
+        self._record_reading(self._data_received, reading)
+        await self._update_firmware_version(reading.firmware)
+        self._save_last_state(reading)
+        self._update_components()
+
+    @callback
+    def _save_last_state(self, reading: DataReading | None = None) -> None:
+        """Save the metadata and, if given, a reading received live."""
+        if self._last_state is None:
+            return
+        last = self._last_state.get(self._device_serial)
+        if reading is not None:
+            last.reading = reading
+        last.firmware_version = self._firmware_version
+        last.wifi_configured = self._wifi_configured
+        last.uplink_interval = self._interval.interval
+        last.open_hour = self._statistics.open_hour
+        self._last_state.async_schedule_save()
+
+    @callback
+    def _update_components(self, *, force: bool = False) -> None:
+        """Update all components of this device in a single pass."""
+        if self._metrics is None:
+            for component in self._components:
+                component.handle_coordinator_update(force=force)
             return
 
-        self._data = json
-        await self._update_firmware_version(json)
+        started = perf_counter_ns()
+        for component in self._components:
+            component.handle_coordinator_update(force=force)
+        self._metrics.record(Stage.FAN_OUT, started)
+
+    @callback
+    def update_link_quality(
+        self, gateway: Gateway, json_message: JsonObjectType
+    ) -> None:
+        """
+        Take over a duplicate of the last uplink that was heard better.
+
+        The sensors, the history and the hourly statistics get its RSSI and
+        SNR, and later downlinks go out through the gateway that heard it.
+        """
+        self._gateway = gateway
+        reading = self._data
+        if reading is not None and json_message.get("msg") == "data":
+            before = replace(reading)
+            reading.update_link(json_message)
+            if (received := self._data_received) is not None:
+                self._history.update_link(received.timestamp(), reading)
+                self._statistics.update_link(received, before, reading)
+        self._update_components()
+
+    async def async_entry_updated(
+        self, _hass: HomeAssistant, _entry: ConfigEntry[PlantSenseData]
+    ) -> None:
+        """Notify the components of the config values an entry update changed."""
+        calibration = MoistureCalibration.from_options(self._entry.options)
+        if calibration != self._calibration:
+            self._calibration = calibration
+            self.recalibrate()
+        self._async_config_changed()
+
+    @callback
+    def recalibrate(self) -> None:
+        """
+        Recompute the moisture of the history and the last reading.
+
+        Only readings calibrated in Home Assistant can be recomputed; without
+        local calibration the device's values of new readings are used again.
+        """
+        calibration = self._calibration
+        if calibration is None:
+            return
+        _LOGGER.debug("Recalibrating the history of %s.", self._device_serial)
+        self._history.recompute("moi", "moiRaw", calibration.apply_column)
+        if self._data is not None:
+            calibration.apply(self._data)
+            self._update_components()
+
+    @callback
+    def _async_config_changed(self) -> None:
+        config_values = self._config_values()
+        changed = {
+            key
+            for key, value in config_values.items()
+            if value != self._config_snapshot[key]
+        }
+        if not changed:
+            return
 
+        self._config_snapshot = config_values
         for component in self._components:
-            await component.update_async()
+            if not component.config_values.isdisjoint(changed):
+                component.handle_config_update()
+
+    def _config_values(self) -> dict[ConfigValue, object]:
+        return {
+            ConfigValue.PENDING: self.config_pending,
+            ConfigValue.VERSION: self.config_version,
+            ConfigValue.WIFI_CONFIGURED: self._wifi_configured,
+        }
+
+    @callback
+    def record_dispatch(self, duration_ns: int) -> None:
+        """Record how long handling the last message took."""
+        self._last_dispatch_us = round(duration_ns / 1000, 1)
+        for component in self._pipeline_components:
+            component.handle_coordinator_update()
 
-    async def _handle_pending_commands(self, json: JsonObjectType) -> None:
+    async def _handle_pending_commands(self, reading: DataReading) -> None:
         """Send any pending config or OTA commands now that the device is online."""
-        device_config_version = json.get("v", 0)
-        if not isinstance(device_config_version, int):
+        device_config_version = reading.version
+        if device_config_version is None:
             _LOGGER.warning("Device '%s' did not send a version.", self.device_id)
             device_config_version = 0
 
-        try:
-            ha_config_version = int(self._entry.data[DATA_LAST_CONFIG_VERSION])
-        except (KeyError, ValueError):
-            ha_config_version = 0
-
+        ha_config_version = self._sync.config_version
         if ha_config_version != device_config_version:
             _LOGGER.warning(
                 "Config version mismatch (ours: %s, device: %s) — "
@@ -206,36 +495,44 @@ class PlantSenseCoordinator:
                 device_config_version,
             )
             await self.async_abort_config_push()
-            await self._request_config()
-        elif self._entry.options.get(OPTIONS_UPDATE_CONFIG, False):
+            self._request_config()
+        elif self._sync.config_pending:
             _LOGGER.info("Updating configuration for '%s'...", self._device_serial)
-            await self._send_config_to_device()
+            self._send_config_to_device()
         elif (
             self._entry.options.get(OPTIONS_AUTO_UPDATE, False)
             and self._latest_firmware_version is not None
             and self._firmware_version is not None
             and self._latest_firmware_version != self._firmware_version
+            and (
+                self._rollout is None
+                or self._rollout.request_update(self, self._latest_firmware_version)
+            )
         ):
             _LOGGER.info(
                 "Auto-update: sending OTA version '%s' to '%s'.",
                 self._latest_firmware_version,
                 self._device_serial,
             )
-            await self._send_ota_to_device(self._latest_firmware_version)
+            self._send_ota_to_device(self._latest_firmware_version)
 
     async def _update_device_name(self, new_name: str) -> None:
         """Update the name of the device."""
+        self._device_info = self._build_device_info()
         device = self._get_device()
         if device is None:
             return
 
         self._device_registry.async_update_device(device.id, name=new_name)
 
-    async def _update_firmware_version(self, json_message: JsonObjectType) -> None:
-        fw = json_message.get("fw")
-        if not isinstance(fw, str) or fw == self._firmware_version:
+    async def _update_firmware_version(self, fw: str | None) -> None:
+        if fw is None or fw == self._firmware_version:
             return
         self._firmware_version = fw
+        self._device_info = self._build_device_info()
+        if self._rollout is not None:
+            self._rollout.firmware_reported(self._device_serial, fw)
+        self._save_last_state()
         device = self._get_device()
         if device is not None:
             self._device_registry.async_update_device(device.id, sw_version=fw)
@@ -245,84 +542,133 @@ class PlantSenseCoordinator:
             identifiers={(DOMAIN, self._device_id)}
         )
 
-    async def _send_config_to_device(self) -> None:
+    @callback
+    def _send_config_to_device(self) -> None:
         """Update the configuration of the PlantSense."""
-        name = self._entry.options.get(OPTIONS_UPDATE_NAME, "")
-        test_mode = self._entry.options.get(OPTIONS_UPDATE_TEST_MODE, False)
-        moi_dry = self._entry.options.get(OPTIONS_MOI_DRY, 0)
-        moi_wet = self._entry.options.get(OPTIONS_MOI_WET, 0)
-        ssid = self._entry.options.get(OPTIONS_SSID, "")
-        wifi_pwd = self._entry.options.get(OPTIONS_WIFI_PWD, "")
-
-        inner: dict = {
-            "id": self._device_serial,
-            "cmd": "set_config",
-            "test": test_mode,
-            "name": name,
-            "moiDry": moi_dry,
-            "moiWet": moi_wet,
+        options = self._entry.options
+        config = {
+            "test": options.get(OPTIONS_UPDATE_TEST_MODE, False),
+            "name": options.get(OPTIONS_UPDATE_NAME, ""),
+            "moiDry": options.get(OPTIONS_MOI_DRY, 0),
+            "moiWet": options.get(OPTIONS_MOI_WET, 0),
         }
-        if ssid:
-            inner["ssid"] = ssid
-        if wifi_pwd:
-            inner["wifiPwd"] = wifi_pwd
-
-        await asyncio.sleep(0.1)
-        await mqtt.client.async_publish(
-            self.hass,
-            "devices/OMG_LILYGO/commands/MQTTtoLORA",
-            json.dumps({"message": json.dumps(inner)}),
+        ssid = options.get(OPTIONS_SSID, "")
+        wifi_pwd = options.get(OPTIONS_WIFI_PWD, "")
+
+        frames = (
+            self._compact_config_frames(config, ssid, wifi_pwd)
+            if self._supports_compact_downlinks()
+            else None
         )
+        if frames == []:
+            _LOGGER.info("'%s' already has this config.", self._device_serial)
+            self._sync.end_push(PushOutcome.NO_OP)
+            self._sync_state.async_schedule_save()
+            self._async_config_changed()
+            return
+
+        if frames is not None:
+            self._enqueue_frames("set_config", frames, DownlinkPriority.SET_CONFIG)
+        else:
+            command: dict = {"cmd": "set_config", **config}
+            if ssid:
+                command["ssid"] = ssid
+            if wifi_pwd:
+                command["wifiPwd"] = wifi_pwd
+            self._enqueue(command, DownlinkPriority.SET_CONFIG)
+        if not self._sync.config_sent:
+            self._sync.config_sent = True
+            self._sync_state.async_schedule_save()
+
+    def _supports_compact_downlinks(self) -> bool:
+        if self._firmware_version is None:
+            return False
+        try:
+            return AwesomeVersion(self._firmware_version) >= AwesomeVersion(
+                COMPACT_DOWNLINK_MIN_FIRMWARE
+            )
+        except AwesomeVersionCompareException:
+            return False
+
+    def _compact_config_frames(
+        self, config: dict[str, Any], ssid: str, wifi_pwd: str
+    ) -> list[bytes] | None:
+        """
+        Return the frames setting only what differs from the confirmed config.
+
+        Returns no frames if nothing differs, and None if the config does not
+        fit compact frames and has to be sent as JSON.
+        """
+        sync = self._sync
+        confirmed = {
+            "test": sync.confirmed_test_mode,
+            "name": sync.confirmed_name,
+            "moiDry": sync.confirmed_moi_dry,
+            "moiWet": sync.confirmed_moi_wet,
+        }
+        changes = {
+            key: value for key, value in config.items() if value != confirmed[key]
+        }
+        if ssid and _wifi_digest(ssid, wifi_pwd) != sync.confirmed_wifi:
+            changes["ssid"] = ssid
+            if wifi_pwd:
+                changes["wifiPwd"] = wifi_pwd
+        if not changes:
+            return []
+        try:
+            return encode_set_config(
+                self._device_serial, changes, LORA_MAX_PAYLOAD_BYTES
+            )
+        except ValueError as err:
+            _LOGGER.warning("Sending the config as JSON: %s", err)
+            return None
 
     async def async_abort_config_push(self) -> None:
         """Cancel a pending config push and revert options to last confirmed values."""
         if not self.config_pending:
             return
 
-        data = self._entry.data
-        options = {**self._entry.options}
+        sync = self._sync
+        sync.end_push(PushOutcome.CANCELLED)
+        self._sync_state.async_schedule_save()
 
-        options[OPTIONS_UPDATE_CONFIG] = False
-        options[OPTIONS_UPDATE_NAME] = data.get(
-            DATA_CONFIRMED_NAME, options.get(OPTIONS_UPDATE_NAME, "")
-        )
-        options[OPTIONS_UPDATE_TEST_MODE] = data.get(
-            DATA_CONFIRMED_TEST_MODE, options.get(OPTIONS_UPDATE_TEST_MODE, False)
-        )
-        options[OPTIONS_MOI_DRY] = data.get(
-            DATA_CONFIRMED_MOI_DRY, options.get(OPTIONS_MOI_DRY, 0)
-        )
-        options[OPTIONS_MOI_WET] = data.get(
-            DATA_CONFIRMED_MOI_WET, options.get(OPTIONS_MOI_WET, 0)
-        )
+        confirmed = {
+            OPTIONS_UPDATE_NAME: sync.confirmed_name,
+            OPTIONS_UPDATE_TEST_MODE: sync.confirmed_test_mode,
+            OPTIONS_MOI_DRY: sync.confirmed_moi_dry,
+            OPTIONS_MOI_WET: sync.confirmed_moi_wet,
+        }
+        options = {
+            **self._entry.options,
+            **{key: value for key, value in confirmed.items() if value is not None},
+        }
 
-        self.hass.config_entries.async_update_entry(self._entry, options=options)
+        if options != self._entry.options:
+            self.hass.config_entries.async_update_entry(self._entry, options=options)
+        self._async_config_changed()
 
-    async def _send_ota_to_device(self, version: str) -> None:
-        """Publish an OTA update command to the device."""
-        inner = {"id": self._device_serial, "cmd": "ota", "version": version}
-        await asyncio.sleep(0.1)
-        await mqtt.client.async_publish(
-            self.hass,
-            "devices/OMG_LILYGO/commands/MQTTtoLORA",
-            json.dumps({"message": json.dumps(inner)}),
-        )
+    @callback
+    def _send_ota_to_device(self, version: str) -> None:
+        """Queue an OTA update command for the device."""
+        self._enqueue({"cmd": "ota", "version": version}, DownlinkPriority.OTA)
 
     def set_latest_firmware_version(self, version: str | None) -> None:
-        """Store the latest firmware version reported by the update entity."""
+        """Store the latest firmware version reported by the release fetcher."""
+        if version == self._latest_firmware_version:
+            return
         self._latest_firmware_version = version
+        self._update_components()
 
     async def async_schedule_fetch_device_config(self) -> None:
         """Reset stored config version to zero to force get_config on next contact."""
-        data = {**self._entry.data, DATA_LAST_CONFIG_VERSION: 0}
-        options = {**self._entry.options, OPTIONS_UPDATE_CONFIG: False}
-        self.hass.config_entries.async_update_entry(
-            self._entry, data=data, options=options
-        )
+        self._sync.config_version = 0
+        self._sync.end_push(PushOutcome.CANCELLED)
+        self._sync_state.async_schedule_save()
+        self._async_config_changed()
 
     @property
     def config_pending(self) -> bool:
-        return bool(self._entry.options.get(OPTIONS_UPDATE_CONFIG, False))
+        return self._sync.config_pending
 
     @property
     def auto_update(self) -> bool:
@@ -330,15 +676,16 @@ class PlantSenseCoordinator:
 
     @property
     def config_version(self) -> int:
-        try:
-            return int(self._entry.data.get(DATA_LAST_CONFIG_VERSION, 0))
-        except (ValueError, TypeError):
-            return 0
+        return self._sync.config_version
 
     @property
     def firmware_version(self) -> str | None:
         return self._firmware_version
 
+    @property
+    def latest_firmware_version(self) -> str | None:
+        return self._latest_firmware_version
+
     @property
     def wifi_configured(self) -> bool | None:
         return self._wifi_configured
@@ -351,17 +698,62 @@ class PlantSenseCoordinator:
     def device_name(self) -> str:
         return self._display_name
 
+    @property
+    def metrics_enabled(self) -> bool:
+        return self._metrics is not None
+
+    @property
+    def uplinks(self) -> int:
+        return self._uplinks
+
+    @property
+    def last_dispatch_us(self) -> float | None:
+        return self._last_dispatch_us
+
+    @property
+    def gateway(self) -> Gateway | None:
+        return self._gateway
+
+    @property
+    def device_serial(self) -> str:
+        return self._device_serial
+
     @property
     def device_id(self) -> str:
         return self._device_id
 
     @property
-    def last_data(self) -> JsonObjectType | None:
+    def last_data(self) -> DataReading | None:
         return self._data
 
+    @property
+    def available(self) -> bool:
+        """Return False while the device is overdue."""
+        return self._available
+
+    @property
+    def uplink_interval(self) -> float | None:
+        """Return the learned time between readings in seconds, if known yet."""
+        return self._interval.interval
+
+    @property
+    def calibration(self) -> MoistureCalibration | None:
+        return self._calibration
+
+    @property
+    def history(self) -> ReadingHistory:
+        return self._history
+
+    @property
+    def statistics(self) -> HourlyStatistics:
+        return self._statistics
+
     @property
     def device_info(self) -> DeviceInfo:
-        """Return the device information."""
+        """Return the device information, rebuilt when the name or firmware change."""
+        return self._device_info
+
+    def _build_device_info(self) -> DeviceInfo:
         return DeviceInfo(
             name=self.device_name,
             manufacturer="Jean-Richard",
@@ -370,3 +762,7 @@ class PlantSenseCoordinator:
             sw_version=self._firmware_version,
             identifiers={(DOMAIN, self._device_id)},
         )
+
+
+def _wifi_digest(ssid: str, wifi_pwd: str) -> str:
+    return hashlib.sha256(f"{ssid}\0{wifi_pwd}".encode()).hexdigest()
@@ -7,8 +7,10 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .coordinator import PlantSenseCoordinator
+    from .firmware import FirmwareReleaseFetcher
 
 
 @dataclass
 class PlantSenseData:
     coordinator: PlantSenseCoordinator
+    firmware: FirmwareReleaseFetcher
@@ -0,0 +1,121 @@
+"""Suppression of uplinks that arrive more than once."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from .const import DEDUPE_MAX_ENTRIES, DEDUPE_WINDOW_SECONDS
+from .messages import LINK_FIELDS
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from homeassistant.util.json import JsonObjectType
+
+# Added by the gateway that received the frame; they differ between copies.
+_GATEWAY_FIELDS = frozenset({"rssi", "snr", "pferror", "packetSize"})
+
+
+class Verdict(Enum):
+    NEW = "new"
+    DUPLICATE = "duplicate"
+    # A duplicate heard with a better RSSI. Later copies are compared against
+    # its link quality; the caller takes it over into the reading of the uplink
+    # and what was recorded of it.
+    BETTER_DUPLICATE = "better_duplicate"
+
+
+@dataclass(slots=True)
+class _Seen:
+    received: float
+    message: JsonObjectType
+
+
+class UplinkDeduplicator:
+    """
+    Recognizes copies of an uplink heard by several gateways or retransmitted.
+
+    An uplink is identified by the device serial and its `seq` counter, if the
+    firmware sends one, or a hash of its content without the fields the
+    gateway adds. Uplinks are remembered for a short window and at most a
+    fixed number of them, oldest first out.
+    """
+
+    _seen: OrderedDict[tuple[str, Hashable], _Seen]
+
+    def __init__(
+        self,
+        window: float = DEDUPE_WINDOW_SECONDS,
+        max_entries: int = DEDUPE_MAX_ENTRIES,
+    ) -> None:
+        """Initialize UplinkDeduplicator."""
+        self._window = window
+        self._max_entries = max_entries
+        self._seen = OrderedDict()
+        self.duplicates = 0
+
+    def observe(
+        self, serial: str, json_message: JsonObjectType, now: float | None = None
+    ) -> Verdict:
+        """
+        Remember the uplink and return whether it has been seen before.
+
+        `now` defaults to the monotonic clock; replays pass the time the uplink
+        was captured instead.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._evict(now)
+
+        key = (serial, self._fingerprint(json_message))
+        seen = self._seen.get(key)
+        if seen is None:
+            self._seen[key] = _Seen(received=now, message=json_message)
+            return Verdict.NEW
+
+        self.duplicates += 1
+        if _rssi(json_message) <= _rssi(seen.message):
+            return Verdict.DUPLICATE
+        for field in LINK_FIELDS:
+            if field in json_message:
+                seen.message[field] = json_message[field]
+        return Verdict.BETTER_DUPLICATE
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"tracked": len(self._seen), "duplicates": self.duplicates}
+
+    def _evict(self, now: float) -> None:
+        seen = self._seen
+        while seen and (
+            len(seen) >= self._max_entries
+            or now - next(iter(seen.values())).received > self._window
+        ):
+            seen.popitem(last=False)
+
+    @staticmethod
+    def _fingerprint(json_message: JsonObjectType) -> Hashable:
+        sequence = json_message.get("seq")
+        if isinstance(sequence, int):
+            return sequence
+        content = [
+            (key, value)
+            for key, value in json_message.items()
+            if key not in _GATEWAY_FIELDS
+        ]
+        content.sort()
+        try:
+            return hash(tuple(content))
+        except TypeError:
+            # Nested values are not hashable.
+            return json.dumps(content)
+
+
+def _rssi(json_message: JsonObjectType) -> float:
+    rssi = json_message.get("rssi")
+    return rssi if isinstance(rssi, int | float) else float("-inf")
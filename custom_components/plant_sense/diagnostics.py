@@ -0,0 +1,93 @@
+"""Diagnostics support for PlantSense."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import (
+    DOMAIN,
+    DOMAIN_BULK_CONFIG,
+    DOMAIN_METRICS,
+    DOMAIN_MQTT_MANAGER,
+    DOMAIN_OTA_ROLLOUT,
+    DOMAIN_SETUP_TIMINGS,
+    DOMAIN_STALENESS,
+    OPTIONS_SSID,
+    OPTIONS_WIFI_PWD,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+    from .data import PlantSenseData
+
+TO_REDACT = {OPTIONS_SSID, OPTIONS_WIFI_PWD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry[PlantSenseData]
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data[DOMAIN]
+    coordinator = entry.runtime_data.coordinator
+    firmware = entry.runtime_data.firmware
+    metrics = domain_data.get(DOMAIN_METRICS)
+    mqtt_manager = domain_data.get(DOMAIN_MQTT_MANAGER)
+    release = firmware.release if firmware is not None else None
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "device": {
+            "last_data": (
+                asdict(coordinator.last_data)
+                if coordinator.last_data is not None
+                else None
+            ),
+            "firmware_version": coordinator.firmware_version,
+            "latest_firmware_version": coordinator.latest_firmware_version,
+            "gateway": coordinator.gateway.name if coordinator.gateway else None,
+            "uplinks": coordinator.uplinks,
+            "last_dispatch_us": coordinator.last_dispatch_us,
+            "available": coordinator.available,
+            "uplink_interval_s": (
+                round(coordinator.uplink_interval, 1)
+                if coordinator.uplink_interval is not None
+                else None
+            ),
+        },
+        "integration": {
+            "metrics": metrics.as_dict() if metrics is not None else None,
+            "replay_metrics": (
+                mqtt_manager.replay_metrics.as_dict()
+                if mqtt_manager is not None and mqtt_manager.replay_metrics is not None
+                else None
+            ),
+            "discovery": (
+                mqtt_manager.discovery.stats if mqtt_manager is not None else None
+            ),
+            "deduplication": (
+                mqtt_manager.deduplicator.stats if mqtt_manager is not None else None
+            ),
+            "gateways": {
+                gateway.name: gateway.downlink.stats
+                for gateway in (mqtt_manager.gateways if mqtt_manager else [])
+            },
+            "bulk_config_pushes": domain_data[DOMAIN_BULK_CONFIG].stats,
+            "ota_rollout": domain_data[DOMAIN_OTA_ROLLOUT].status,
+            "staleness": domain_data[DOMAIN_STALENESS].stats,
+            "capture": (
+                mqtt_manager.capture.stats
+                if mqtt_manager is not None and mqtt_manager.capture is not None
+                else None
+            ),
+            "firmware_release": asdict(release) if release is not None else None,
+            "setup": domain_data[DOMAIN_SETUP_TIMINGS].as_dict(entry.entry_id),
+        },
+    }
@@ -0,0 +1,162 @@
+"""Discovery tracking for unknown PlantSense serials."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import (
+    SIGNAL_CONFIG_ENTRY_CHANGED,
+    SOURCE_IGNORE,
+    ConfigEntry,
+    ConfigEntryChange,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN
+from .helpers import parse_unique_id
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+_LOGGER = logging.getLogger(__name__)
+
+_INITIAL_BACKOFF_SECONDS = 10 * 60
+_MAX_BACKOFF_SECONDS = 24 * 60 * 60
+# Serials that stay silent this long are forgotten, resetting their backoff.
+_SEEN_TTL_SECONDS = 2 * _MAX_BACKOFF_SECONDS
+_PURGE_INTERVAL_SECONDS = 60
+
+
+@dataclass
+class _DiscoveryAttempt:
+    next_allowed: float
+    backoff: float
+    last_seen: float
+
+
+class DiscoveryTracker:
+    """
+    Decides whether an uplink from an unknown serial should start a flow.
+
+    Each unknown serial starts one discovery flow; further uplinks are
+    suppressed until its backoff expires, and the backoff doubles on every
+    retry. Serials the user chose to ignore are never rediscovered.
+    """
+
+    _attempts: dict[str, _DiscoveryAttempt]
+    _ignored: set[str]
+    _unsubscribe_entries: CALLBACK_TYPE | None
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize DiscoveryTracker."""
+        self._hass = hass
+        self._attempts = {}
+        self._ignored = set()
+        self._unsubscribe_entries = None
+        self._next_purge = 0.0
+        self.started = 0
+        self.suppressed_backoff = 0
+        self.suppressed_ignored = 0
+
+    @callback
+    def start(self) -> None:
+        """Load ignored serials and follow config entry changes."""
+        self._ignored = set(
+            self._serials(
+                entry
+                for entry in self._hass.config_entries.async_entries(DOMAIN)
+                if entry.source == SOURCE_IGNORE
+            )
+        )
+        self._unsubscribe_entries = async_dispatcher_connect(
+            self._hass, SIGNAL_CONFIG_ENTRY_CHANGED, self._config_entry_changed
+        )
+
+    @callback
+    def stop(self) -> None:
+        """Stop following config entry changes."""
+        if self._unsubscribe_entries is not None:
+            self._unsubscribe_entries()
+            self._unsubscribe_entries = None
+
+    @callback
+    def should_start_discovery(self, serial: str) -> bool:
+        """Return True if a discovery flow should be started for the serial."""
+        if serial in self._ignored:
+            self.suppressed_ignored += 1
+            return False
+
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._purge(now)
+
+        attempt = self._attempts.get(serial)
+        if attempt is None:
+            self._attempts[serial] = _DiscoveryAttempt(
+                next_allowed=now + _INITIAL_BACKOFF_SECONDS,
+                backoff=_INITIAL_BACKOFF_SECONDS,
+                last_seen=now,
+            )
+            self.started += 1
+            return True
+
+        attempt.last_seen = now
+        if now < attempt.next_allowed:
+            self.suppressed_backoff += 1
+            return False
+
+        attempt.backoff = min(attempt.backoff * 2, _MAX_BACKOFF_SECONDS)
+        attempt.next_allowed = now + attempt.backoff
+        self.started += 1
+        return True
+
+    @callback
+    def forget(self, serial: str) -> None:
+        """Forget a serial, e.g. because it has been set up."""
+        self._attempts.pop(serial, None)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "started": self.started,
+            "suppressed_backoff": self.suppressed_backoff,
+            "suppressed_ignored": self.suppressed_ignored,
+            "tracked": len(self._attempts),
+            "ignored": len(self._ignored),
+        }
+
+    def _purge(self, now: float) -> None:
+        self._next_purge = now + _PURGE_INTERVAL_SECONDS
+        expired = [
+            serial
+            for serial, attempt in self._attempts.items()
+            if now - attempt.last_seen > _SEEN_TTL_SECONDS
+        ]
+        for serial in expired:
+            del self._attempts[serial]
+
+    @callback
+    def _config_entry_changed(
+        self, change: ConfigEntryChange, entry: ConfigEntry
+    ) -> None:
+        if entry.domain != DOMAIN:
+            return
+
+        for serial in self._serials([entry]):
+            if change is ConfigEntryChange.REMOVED:
+                self._ignored.discard(serial)
+                self._attempts.pop(serial, None)
+            elif entry.source == SOURCE_IGNORE:
+                _LOGGER.debug("Ignoring discovery for '%s'.", serial)
+                self._ignored.add(serial)
+
+    @staticmethod
+    def _serials(entries: Iterable[ConfigEntry]) -> Iterable[str]:
+        for entry in entries:
+            serial = parse_unique_id(entry.unique_id)
+            if serial is not None:
+                yield serial
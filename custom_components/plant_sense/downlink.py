@@ -0,0 +1,231 @@
+"""Downlink scheduling for commands sent to PlantSense devices."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    DOMAIN,
+    DOWNLINK_FRAME_SPACING_SECONDS,
+    DOWNLINK_MAX_AGE_SECONDS,
+)
+from .metrics import PipelineMetrics, Stage
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DownlinkPriority(IntEnum):
+    """Lower values are transmitted first."""
+
+    GET_CONFIG = 0
+    SET_CONFIG = 1
+    OTA = 2
+
+
+@dataclass(order=True)
+class _Downlink:
+    priority: int
+    sequence: int
+    key: tuple[str, str] = field(compare=False)
+    # Frames sent one after the other, `frame_spacing` apart.
+    payloads: tuple[str, ...] = field(compare=False)
+    enqueued: float = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class DownlinkScheduler:
+    """
+    Queues commands for one gateway and transmits them one frame at a time.
+
+    Commands are queued from the receive path and sent by a background task,
+    so handling an uplink never waits for the radio. A newer command of the
+    same kind for the same device replaces the queued one, and commands that
+    waited longer than the device listens after its uplink are dropped (they
+    are queued again on the device's next uplink).
+    """
+
+    _queue: list[_Downlink]
+    _pending: dict[tuple[str, str], _Downlink]
+    _task: asyncio.Task[None] | None
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        topic: str,
+        frame_spacing: float = DOWNLINK_FRAME_SPACING_SECONDS,
+        max_age: float = DOWNLINK_MAX_AGE_SECONDS,
+        metrics: PipelineMetrics | None = None,
+    ) -> None:
+        """Initialize DownlinkScheduler."""
+        self._hass = hass
+        self._metrics = metrics
+        self._topic = topic
+        self._frame_spacing = frame_spacing
+        self._max_age = max_age
+        self._queue = []
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.sent = 0
+        self.frames_sent = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @callback
+    def start(self) -> None:
+        """Start transmitting queued commands."""
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN} downlink {self._topic}"
+            )
+
+    @callback
+    def stop(self) -> None:
+        """Stop transmitting and drop all queued commands."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._queue.clear()
+        self._pending.clear()
+
+    @callback
+    def enqueue(
+        self,
+        serial: str,
+        command: Mapping[str, Any],
+        priority: DownlinkPriority,
+    ) -> None:
+        """Queue a command for the device, replacing a queued one of its kind."""
+        self._push(
+            (serial, str(command["cmd"])),
+            (json.dumps({"message": json.dumps({"id": serial, **command})}),),
+            priority,
+        )
+
+    @callback
+    def enqueue_frames(
+        self,
+        serial: str,
+        cmd: str,
+        frames: Sequence[bytes],
+        priority: DownlinkPriority,
+    ) -> None:
+        """Queue a binary command, replacing a queued one of its kind."""
+        self._push(
+            (serial, cmd),
+            tuple(json.dumps({"hex": frame.hex()}) for frame in frames),
+            priority,
+        )
+
+    def _push(
+        self,
+        key: tuple[str, str],
+        payloads: tuple[str, ...],
+        priority: DownlinkPriority,
+    ) -> None:
+        previous = self._pending.get(key)
+        if previous is not None:
+            previous.cancelled = True
+            self.coalesced += 1
+
+        downlink = _Downlink(
+            priority=priority,
+            sequence=next(self._sequence),
+            key=key,
+            payloads=payloads,
+            enqueued=time.monotonic(),
+        )
+        self._pending[key] = downlink
+        heapq.heappush(self._queue, downlink)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+        self._wakeup.set()
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting to be transmitted."""
+        return len(self._pending)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "topic": self._topic,
+            "queue_depth": len(self._pending),
+            "max_queue_depth": self.max_queue_depth,
+            "sent": self.sent,
+            "frames_sent": self.frames_sent,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "failed": self.failed,
+            "latency_avg_ms": (
+                round(self._latency_total / self.sent * 1000, 1) if self.sent else None
+            ),
+            "latency_max_ms": round(self._latency_max * 1000, 1),
+        }
+
+    async def _async_run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            while self._pending:
+                # The device needs a moment to switch to receive after its
+                # uplink, and the radio needs a gap between two frames.
+                await asyncio.sleep(self._frame_spacing)
+                downlink = self._pop()
+                if downlink is not None:
+                    await self._async_send(downlink)
+            self._wakeup.clear()
+
+    def _pop(self) -> _Downlink | None:
+        while self._queue:
+            downlink = heapq.heappop(self._queue)
+            if not downlink.cancelled:
+                del self._pending[downlink.key]
+                return downlink
+        return None
+
+    async def _async_send(self, downlink: _Downlink) -> None:
+        serial, cmd = downlink.key
+        latency = time.monotonic() - downlink.enqueued
+        if latency > self._max_age:
+            _LOGGER.info("Dropping stale '%s' command for %s.", cmd, serial)
+            self.expired += 1
+            return
+
+        started = time.perf_counter_ns()
+        for index, payload in enumerate(downlink.payloads):
+            if index:
+                await asyncio.sleep(self._frame_spacing)
+            try:
+                await mqtt.client.async_publish(self._hass, self._topic, payload)
+            except HomeAssistantError as err:
+                _LOGGER.warning(
+                    "Failed to publish downlink to %s: %s", self._topic, err
+                )
+                self.failed += 1
+                return
+            self.frames_sent += 1
+
+        if self._metrics is not None:
+            self._metrics.record(Stage.DOWNLINK_PUBLISH, started)
+        self.sent += 1
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
@@ -0,0 +1,196 @@
+"""Shared firmware release lookup for PlantSense."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from aiohttp import hdrs
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, FIRMWARE_CHECK_INTERVAL_HOURS, FIRMWARE_GITHUB_REPO
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from .coordinator import PlantSenseCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+RELEASES_URL = f"https://api.github.com/repos/{FIRMWARE_GITHUB_REPO}/releases/latest"
+CHECK_INTERVAL = timedelta(hours=FIRMWARE_CHECK_INTERVAL_HOURS)
+
+_STORAGE_KEY = f"{DOMAIN}.firmware_release"
+_STORAGE_VERSION = 1
+
+
+@dataclass
+class FirmwareRelease:
+    version: str | None
+    release_url: str | None
+    release_notes: str | None
+
+
+class FirmwareReleaseFetcher:
+    """
+    Fetches the latest firmware release once for all PlantSense devices.
+
+    The last response and its ETag are persisted, so a restart serves the
+    release from disk and later checks are conditional requests that GitHub
+    answers with 304 Not Modified while nothing changed.
+    """
+
+    _release: FirmwareRelease | None
+    _etag: str | None
+    _last_check: datetime | None
+    _coordinators: set[PlantSenseCoordinator]
+    _unsubscribe_refresh: CALLBACK_TYPE | None
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        url: str = RELEASES_URL,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize FirmwareReleaseFetcher."""
+        self._hass = hass
+        self._url = url
+        self._session = session
+        self._store: Store[dict[str, Any]] = Store(hass, _STORAGE_VERSION, _STORAGE_KEY)
+        self._lock = asyncio.Lock()
+        self._release = None
+        self._etag = None
+        self._last_check = None
+        self._coordinators = set()
+        self._unsubscribe_refresh = None
+
+    async def async_start(self) -> None:
+        """Load the cached release and start the periodic check."""
+        await self._async_load()
+        self._unsubscribe_refresh = async_track_time_interval(
+            self._hass, self._async_interval_refresh, CHECK_INTERVAL
+        )
+        if self._last_check is None or dt_util.utcnow() - self._last_check > (
+            CHECK_INTERVAL
+        ):
+            self._hass.async_create_background_task(
+                self.async_refresh(), f"{DOMAIN} firmware release check"
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the periodic check."""
+        if self._unsubscribe_refresh is not None:
+            self._unsubscribe_refresh()
+            self._unsubscribe_refresh = None
+
+    @callback
+    def register_coordinator(self, coordinator: PlantSenseCoordinator) -> CALLBACK_TYPE:
+        """Keep the coordinator's latest firmware version in sync."""
+        self._coordinators.add(coordinator)
+        coordinator.set_latest_firmware_version(self.latest_version)
+
+        @callback
+        def _unregister() -> None:
+            self._coordinators.discard(coordinator)
+
+        return _unregister
+
+    @property
+    def release(self) -> FirmwareRelease | None:
+        return self._release
+
+    @property
+    def latest_version(self) -> str | None:
+        return self._release.version if self._release is not None else None
+
+    async def _async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not stored:
+            return
+
+        self._etag = stored.get("etag")
+        self._release = FirmwareRelease(
+            version=stored.get("version"),
+            release_url=stored.get("release_url"),
+            release_notes=stored.get("release_notes"),
+        )
+        last_check = stored.get("last_check")
+        self._last_check = dt_util.parse_datetime(last_check) if last_check else None
+
+    async def _async_interval_refresh(self, _now: datetime) -> None:
+        await self.async_refresh()
+
+    async def async_refresh(self) -> None:
+        """Check GitHub for a new release and notify all coordinators."""
+        async with self._lock:
+            headers = {hdrs.ACCEPT: "application/vnd.github+json"}
+            if self._etag is not None and self._release is not None:
+                headers[hdrs.IF_NONE_MATCH] = self._etag
+
+            session = self._session or async_get_clientsession(self._hass)
+            try:
+                async with session.get(
+                    self._url,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=10),
+                ) as resp:
+                    if resp.status == HTTPStatus.NOT_MODIFIED:
+                        _LOGGER.debug("Firmware release unchanged (%s).", self._etag)
+                    else:
+                        resp.raise_for_status()
+                        data = await resp.json()
+                        if not isinstance(data, dict):
+                            _LOGGER.warning(
+                                "Unexpected firmware release from GitHub (%s)",
+                                self._url,
+                            )
+                            return
+                        self._etag = resp.headers.get(hdrs.ETAG)
+                        self._release = _release(data)
+            except (aiohttp.ClientError, TimeoutError, ValueError):
+                _LOGGER.warning(
+                    "Failed to fetch latest firmware version from GitHub (%s)",
+                    self._url,
+                )
+                return
+
+            self._last_check = dt_util.utcnow()
+            self._store.async_delay_save(self._data_to_save, 1)
+
+        version = self.latest_version
+        for coordinator in self._coordinators:
+            coordinator.set_latest_firmware_version(version)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        release = self._release or FirmwareRelease(None, None, None)
+        return {
+            "etag": self._etag,
+            "version": release.version,
+            "release_url": release.release_url,
+            "release_notes": release.release_notes,
+            "last_check": self._last_check.isoformat() if self._last_check else None,
+        }
+
+
+def _release(data: dict[str, Any]) -> FirmwareRelease:
+    """Return the release of a GitHub response, ignoring fields of another type."""
+    tag = data.get("tag_name")
+    url = data.get("html_url")
+    notes = data.get("body")
+    version = tag.lstrip("v") if isinstance(tag, str) else ""
+    return FirmwareRelease(
+        version=version or None,
+        release_url=url if isinstance(url, str) else None,
+        release_notes=notes if isinstance(notes, str) else None,
+    )
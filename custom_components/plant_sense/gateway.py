@@ -0,0 +1,50 @@
+"""Gateways bridging PlantSense LoRa traffic to MQTT."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import CONF_NAME
+
+from .const import (
+    CONF_DOWNLINK_TOPIC,
+    CONF_FRAME_SPACING,
+    CONF_MQTT_ROOT,
+    CONF_UPLINK_TOPIC,
+)
+from .downlink import DownlinkScheduler
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .metrics import PipelineMetrics
+
+
+@dataclass
+class Gateway:
+    """An OpenMQTTGateway board with its uplink topic and downlink queue."""
+
+    name: str
+    uplink_topic: str
+    downlink: DownlinkScheduler
+
+    @classmethod
+    def from_config(
+        cls,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        metrics: PipelineMetrics | None = None,
+    ) -> Gateway:
+        """Create a gateway from its YAML configuration."""
+        root = config[CONF_MQTT_ROOT]
+        return cls(
+            name=config[CONF_NAME],
+            uplink_topic=config.get(CONF_UPLINK_TOPIC, f"{root}/LORAtoMQTT/#"),
+            downlink=DownlinkScheduler(
+                hass,
+                config.get(CONF_DOWNLINK_TOPIC, f"{root}/commands/MQTTtoLORA"),
+                frame_spacing=config[CONF_FRAME_SPACING],
+                metrics=metrics,
+            ),
+        )
@@ -1,3 +1,83 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import homeassistant.helpers.device_registry as dr
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import PlantSenseCoordinator
+
+_UNIQUE_ID_PREFIX = "PlantSense-"
+
+
 def build_unique_id(serial: str) -> str:
     """Build unique id for PlantSense device."""
-    return f"PlantSense-{serial}"
+    return f"{_UNIQUE_ID_PREFIX}{serial}"
+
+
+def parse_unique_id(unique_id: str | None) -> str | None:
+    """Extract the serial from a PlantSense unique id."""
+    if unique_id is None or not unique_id.startswith(_UNIQUE_ID_PREFIX):
+        return None
+    return unique_id.removeprefix(_UNIQUE_ID_PREFIX)
+
+
+def normalize_serial(serial: str) -> str:
+    """
+    Return the serial in the case compact frames report it.
+
+    JSON messages carry the serial as the device writes it, compact frames as
+    lowercase hex; messages are routed by the normalized serial so a device
+    is found in either format.
+    """
+    return serial.lower()
+
+
+def local_timestamp(value: datetime | None) -> float | None:
+    """
+    Return the POSIX time of a time given to a service or command, if any.
+
+    `cv.datetime` leaves times without an offset naive; they are in Home
+    Assistant's time zone, not the system's.
+    """
+    return dt_util.as_timestamp(dt_util.as_local(value)) if value is not None else None
+
+
+def build_entity_id(entity_id_format: str, object_id: str) -> str:
+    """
+    Build the entity id suggested for a PlantSense entity.
+
+    Unlike `async_generate_entity_id` this does not look through all existing
+    entity ids; the entity registry resolves the rare collision when the
+    entity is added.
+    """
+    return entity_id_format.format(slugify(object_id))
+
+
+@callback
+def async_get_coordinator(
+    hass: HomeAssistant, device_id: str
+) -> PlantSenseCoordinator | None:
+    """Return the coordinator of a loaded PlantSense device registry entry."""
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None:
+        return None
+    for entry_id in device.config_entries:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if (
+            entry is not None
+            and entry.domain == DOMAIN
+            and entry.state is ConfigEntryState.LOADED
+        ):
+            return entry.runtime_data.coordinator
+    return None
@@ -0,0 +1,143 @@
+"""In-memory history of recent PlantSense readings."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING
+
+from .messages import LINK_FIELDS, READING_FIELDS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .messages import DataReading
+
+# Keys of a data message that are kept, in the order of the columns.
+HISTORY_FIELDS = ("moi", "moiRaw", "hum", "tempc", "bat", "batPct", "rssi", "snr")
+# Hides the float32 representation error when reading values back.
+_DECIMALS = 3
+
+
+class ReadingHistory:
+    """
+    Fixed-size ring buffer of the readings of one device.
+
+    Every field is stored in its own preallocated array column, so a reading
+    costs a few bytes per field instead of a JSON dict, and a window is read
+    by bisecting the timestamps. Values are stored as 32-bit floats, which is
+    plenty for the at most two decimals a device sends, and missing values as
+    NaN.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize ReadingHistory."""
+        self._capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._columns = {
+            field: array("f", bytes(4 * capacity)) for field in HISTORY_FIELDS
+        }
+        # Index of the slot the next reading is written to.
+        self._head = 0
+        self._size = 0
+
+    def append(self, timestamp: float, reading: DataReading) -> None:
+        """Store the fields of a reading, overwriting the oldest reading."""
+        if self._size and timestamp < self._timestamps[self._head - 1]:
+            self._insert(timestamp, reading)
+            return
+
+        head = self._head
+        self._timestamps[head] = timestamp
+        for field, column in self._columns.items():
+            column[head] = _value(reading, field)
+        self._head = (head + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def update_link(self, timestamp: float, reading: DataReading) -> None:
+        """Overwrite the link quality of the newest reading, if it is the given one."""
+        if not self._size:
+            return
+        newest = self._head - 1
+        if self._timestamps[newest] != timestamp:
+            return
+        for field in LINK_FIELDS:
+            self._columns[field][newest] = _value(reading, field)
+
+    def holds(self, timestamp: float, tolerance: float) -> bool:
+        """Return True if a reading within the tolerance of the timestamp is kept."""
+        timestamps = self._ordered(self._timestamps)
+        index = bisect_left(timestamps, timestamp - tolerance)
+        return index < len(timestamps) and timestamps[index] <= timestamp + tolerance
+
+    def window(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        fields: tuple[str, ...] = HISTORY_FIELDS,
+    ) -> dict[str, list[float | None]]:
+        """Return the readings between the timestamps, oldest first."""
+        timestamps = self._ordered(self._timestamps)
+        first = 0 if start is None else bisect_left(timestamps, start)
+        last = len(timestamps) if end is None else bisect_right(timestamps, end)
+
+        result: dict[str, list[float | None]] = {
+            "timestamp": timestamps[first:last].tolist()
+        }
+        for field in fields:
+            values = self._ordered(self._columns[field])[first:last]
+            result[field] = [
+                None if math.isnan(value) else round(value, _DECIMALS)
+                for value in values
+            ]
+        return result
+
+    def recompute(
+        self, field: str, source: str, compute: Callable[[array, array], None]
+    ) -> None:
+        """
+        Overwrite a field of all readings with values derived from another one.
+
+        `compute` gets the source and the target column and fills the target
+        in place; slots that hold no reading yet are computed, too.
+        """
+        compute(self._columns[source], self._columns[field])
+
+    def _insert(self, timestamp: float, reading: DataReading) -> None:
+        """Store a reading older than the newest one, e.g. from a replay."""
+        timestamps = self._ordered(self._timestamps)
+        index = bisect_right(timestamps, timestamp)
+        full = self._size == self._capacity
+        if full and index == 0:
+            # Older than all readings kept.
+            return
+
+        timestamps.insert(index, timestamp)
+        columns = {}
+        for field, column in self._columns.items():
+            values = self._ordered(column)
+            values.insert(index, _value(reading, field))
+            columns[field] = values
+        if full:
+            del timestamps[0]
+            for values in columns.values():
+                del values[0]
+
+        # Rewrite the buffer in order, starting at the first slot.
+        size = len(timestamps)
+        self._timestamps[:size] = timestamps
+        for field, values in columns.items():
+            self._columns[field][:size] = values
+        self._head = size % self._capacity
+        self._size = size
+
+    def _ordered(self, column: array) -> array:
+        if self._size < self._capacity:
+            return column[: self._size]
+        return column[self._head :] + column[: self._head]
+
+
+def _value(reading: DataReading, field: str) -> float:
+    value = getattr(reading, READING_FIELDS[field])
+    return math.nan if value is None else value
@@ -0,0 +1,128 @@
+"""Last known readings and metadata of all PlantSense devices."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, fields
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, LAST_STATE_SAVE_DELAY_SECONDS
+from .messages import DataReading
+from .statistics import OpenHour
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+_LOGGER = logging.getLogger(__name__)
+
+_STORAGE_KEY = f"{DOMAIN}.last_state"
+_STORAGE_VERSION = 1
+
+_READING_FIELDS = frozenset(field.name for field in fields(DataReading))
+
+
+@dataclass(slots=True)
+class DeviceLastState:
+    """What a device last reported, shown until it is heard from again."""
+
+    reading: DataReading | None = None
+    firmware_version: str | None = None
+    wifi_configured: bool | None = None
+    uplink_interval: float | None = None
+    # The statistics of the hour that was not imported yet.
+    open_hour: OpenHour | None = None
+
+
+class LastStateStore:
+    """
+    Keeps the last state of all devices in one storage file.
+
+    It is read once at startup, so the sensors and update entities show the
+    last known values right away instead of waiting for each device's next
+    uplink. The store holds the coordinators' current objects and serializes
+    them when it writes; with readings arriving all the time, a write is
+    scheduled at most once per delay instead of being pushed back by every
+    uplink, and the pending one is written when Home Assistant stops.
+    """
+
+    _devices: dict[str, DeviceLastState]
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize LastStateStore."""
+        self._store: Store[dict[str, Any]] = Store(hass, _STORAGE_VERSION, _STORAGE_KEY)
+        self._devices = {}
+        self._save_scheduled = False
+
+    async def async_load(self) -> None:
+        """Load the last state of all devices."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self._devices = {
+            serial: DeviceLastState(
+                reading=_reading(state.get("reading")),
+                firmware_version=state.get("firmware_version"),
+                wifi_configured=state.get("wifi_configured"),
+                uplink_interval=state.get("uplink_interval"),
+                open_hour=(
+                    OpenHour.from_dict(open_hour)
+                    if (open_hour := state.get("open_hour")) is not None
+                    else None
+                ),
+            )
+            for serial, state in stored.get("devices", {}).items()
+        }
+
+    @callback
+    def get(self, serial: str) -> DeviceLastState:
+        """Return the last state of the device, creating it if needed."""
+        state = self._devices.get(serial)
+        if state is None:
+            state = self._devices[serial] = DeviceLastState()
+        return state
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save all devices within the delay, if no save is scheduled yet."""
+        if self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_save, LAST_STATE_SAVE_DELAY_SECONDS)
+
+    @callback
+    def async_remove(self, serial: str) -> None:
+        """Forget a device that has been removed."""
+        if self._devices.pop(serial, None) is not None:
+            self.async_schedule_save()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_scheduled = False
+        return {
+            "devices": {
+                serial: {
+                    "reading": (
+                        asdict(state.reading) if state.reading is not None else None
+                    ),
+                    "firmware_version": state.firmware_version,
+                    "wifi_configured": state.wifi_configured,
+                    "uplink_interval": state.uplink_interval,
+                    "open_hour": (
+                        state.open_hour.as_dict()
+                        if state.open_hour is not None
+                        else None
+                    ),
+                }
+                for serial, state in self._devices.items()
+            }
+        }
+
+
+def _reading(stored: Mapping[str, Any] | None) -> DataReading | None:
+    if stored is None or stored.keys() != _READING_FIELDS:
+        # Saved by a version with other fields; the next uplink replaces it.
+        return None
+    return DataReading(**stored)
@@ -0,0 +1,130 @@
+"""Typed PlantSense messages decoded from the merged JSON of an uplink."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.util.json import JsonObjectType
+
+# Field of a data message and the DataReading attribute it is decoded into.
+READING_FIELDS = {
+    "moi": "moisture",
+    "moiRaw": "moisture_raw",
+    "hum": "humidity",
+    "tempc": "temperature",
+    "bat": "battery_volt",
+    "batPct": "battery",
+    "rssi": "rssi",
+    "snr": "snr",
+}
+# Fields of a data message that differ between copies heard by other gateways.
+LINK_FIELDS = ("rssi", "snr")
+
+
+@dataclass(slots=True)
+class DataReading:
+    """
+    The readings of a data message.
+
+    Values the device did not send, or sent with the wrong type, are None.
+    The moisture is replaced when it is calibrated in Home Assistant and the
+    link quality when a copy of the uplink is heard better.
+    """
+
+    version: int | None
+    firmware: str | None
+    test: bool
+    moisture: float | None
+    moisture_raw: float | None
+    humidity: float | None
+    temperature: float | None
+    battery_volt: float | None
+    battery: float | None
+    rssi: float | None
+    snr: float | None
+
+    def update_link(self, json_message: JsonObjectType) -> None:
+        """Take over the RSSI and SNR of a copy of the uplink, where it has them."""
+        for field in LINK_FIELDS:
+            value = _number(json_message.get(field))
+            if value is not None:
+                setattr(self, READING_FIELDS[field], value)
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigReport:
+    """The configuration a device reports after a `get_config` or a change."""
+
+    version: int
+    name: str
+    test: bool
+    moi_dry: int | None
+    moi_wet: int | None
+    firmware: str | None
+    wifi_set: bool | None
+
+
+@dataclass(frozen=True, slots=True)
+class WifiReport:
+    """The firmware version a device reports after connecting to WiFi."""
+
+    firmware: str | None
+
+
+def decode_message(
+    json_message: JsonObjectType,
+) -> DataReading | ConfigReport | WifiReport | None:
+    """
+    Validate the fields of a message once and return them typed.
+
+    Returns None for message types this integration does not handle.
+    """
+    get = json_message.get
+    msg_type = get("msg")
+    if msg_type == "data":
+        return DataReading(
+            version=_integer(get("v")),
+            firmware=_string(get("fw")),
+            test=bool(get("test", False)),
+            moisture=_number(get("moi")),
+            moisture_raw=_number(get("moiRaw")),
+            humidity=_number(get("hum")),
+            temperature=_number(get("tempc")),
+            battery_volt=_number(get("bat")),
+            battery=_number(get("batPct")),
+            rssi=_number(get("rssi")),
+            snr=_number(get("snr")),
+        )
+    if msg_type == "config":
+        test = get("test", False)
+        wifi_set = get("wifiSet")
+        return ConfigReport(
+            version=_integer(get("v")) or 0,
+            name=str(get("name", "unknown")),
+            test=test if isinstance(test, bool) else False,
+            moi_dry=_integer(get("moiDry")),
+            moi_wet=_integer(get("moiWet")),
+            firmware=_string(get("fw")),
+            wifi_set=wifi_set if isinstance(wifi_set, bool) else None,
+        )
+    if msg_type == "wifi":
+        return WifiReport(firmware=_string(get("fw")))
+    return None
+
+
+def _number(value: object) -> float | None:
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def _integer(value: object) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def _string(value: object) -> str | None:
+    return value if isinstance(value, str) else None
@@ -0,0 +1,123 @@
+"""Counters and latency histograms for the PlantSense message pipeline."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from enum import StrEnum
+from time import perf_counter_ns
+from typing import Any
+
+# Upper bucket bounds in microseconds; the last bucket catches everything else.
+_BUCKET_BOUNDS_US = (10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 50_000)
+_BUCKET_BOUNDS_NS = tuple(bound * 1000 for bound in _BUCKET_BOUNDS_US)
+
+
+class Stage(StrEnum):
+    JSON_DECODE = "json_decode"
+    HEX_MERGE = "hex_merge"
+    ROUTING = "routing"
+    DISPATCH = "dispatch"
+    FAN_OUT = "fan_out"
+    DOWNLINK_PUBLISH = "downlink_publish"
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    __slots__ = ("buckets", "count", "max_ns", "total_ns")
+
+    def __init__(self) -> None:
+        """Initialize Histogram."""
+        self.buckets = [0] * (len(_BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int) -> None:
+        self.buckets[bisect_left(_BUCKET_BOUNDS_NS, duration_ns)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+
+    def percentile_us(self, percentile: float) -> int | None:
+        """Return the upper bound of the bucket holding the percentile."""
+        if self.count == 0:
+            return None
+        rank = self.count * percentile / 100
+        seen = 0
+        for bound, count in zip(_BUCKET_BOUNDS_US, self.buckets, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return round(self.max_ns / 1000)
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound}us" for bound in _BUCKET_BOUNDS_US]
+        labels.append(f">{_BUCKET_BOUNDS_US[-1]}us")
+        return {
+            "count": self.count,
+            "avg_us": round(self.total_ns / self.count / 1000, 1)
+            if self.count
+            else None,
+            "max_us": round(self.max_ns / 1000, 1),
+            "p50_us": self.percentile_us(50),
+            "p99_us": self.percentile_us(99),
+            "buckets": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class SetupTimings:
+    """How long setting up the shared helpers and each entry took."""
+
+    def __init__(self) -> None:
+        """Initialize SetupTimings."""
+        self.shared_ms: float | None = None
+        self.entries_ms: dict[str, float] = {}
+
+    def record_shared(self, started_ns: int) -> None:
+        self.shared_ms = round((perf_counter_ns() - started_ns) / 1e6, 2)
+
+    def record_entry(self, entry_id: str, started_ns: int) -> None:
+        self.entries_ms[entry_id] = round((perf_counter_ns() - started_ns) / 1e6, 2)
+
+    def as_dict(self, entry_id: str) -> dict[str, Any]:
+        entries = sorted(self.entries_ms.values())
+        return {
+            "entry_ms": self.entries_ms.get(entry_id),
+            "shared_ms": self.shared_ms,
+            "entries": len(entries),
+            "entries_total_ms": round(sum(entries), 2),
+            "entries_median_ms": entries[len(entries) // 2] if entries else None,
+            "entries_max_ms": entries[-1] if entries else None,
+        }
+
+
+class PipelineMetrics:
+    """
+    Per-stage latencies and counters of the message pipeline.
+
+    Instrumentation is only created when enabled in the configuration; the
+    pipeline passes None otherwise, so a disabled pipeline pays no more than a
+    `None` check per stage.
+    """
+
+    def __init__(self) -> None:
+        """Initialize PipelineMetrics."""
+        self.stages = {stage: Histogram() for stage in Stage}
+        self.counters: Counter[str] = Counter()
+
+    def record(self, stage: Stage, started_ns: int) -> int:
+        """Record the time since `started_ns` for the stage and return now."""
+        now = perf_counter_ns()
+        self.stages[stage].record(now - started_ns)
+        return now
+
+    def count(self, counter: str) -> None:
+        self.counters[counter] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "counters": dict(self.counters),
+            "stages": {stage.value: h.as_dict() for stage, h in self.stages.items()},
+        }
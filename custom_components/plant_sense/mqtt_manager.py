@@ -1,86 +1,286 @@
 """MQTT manager for PlantSense."""
 
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Any
+import time
+from datetime import UTC, datetime
+from functools import partial
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any
 
 import homeassistant.helpers.device_registry as dr
 from homeassistant.components import mqtt
-from homeassistant.components.mqtt.models import ReceiveMessage
 from homeassistant.config_entries import SOURCE_INTEGRATION_DISCOVERY, ConfigEntryState
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import discovery_flow
-from homeassistant.util.json import JsonObjectType, json_loads_object
 
-from custom_components.plant_sense.const import DISCOVERY_NAME, DISCOVERY_SERIAL, DOMAIN
+from custom_components.plant_sense.capture import CaptureReader, UplinkCapture
+from custom_components.plant_sense.const import (
+    DISCOVERY_NAME,
+    DISCOVERY_SERIAL,
+    DOMAIN,
+    REPLAY_BATCH_SIZE,
+)
 from custom_components.plant_sense.data import PlantSenseData
-from custom_components.plant_sense.helpers import build_unique_id
+from custom_components.plant_sense.decoder import decode_payload
+from custom_components.plant_sense.dedupe import UplinkDeduplicator, Verdict
+from custom_components.plant_sense.discovery import DiscoveryTracker
+from custom_components.plant_sense.helpers import build_unique_id, normalize_serial
+from custom_components.plant_sense.metrics import PipelineMetrics, Stage
 
-_LOGGER = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from pathlib import Path
 
-_SUBSCRIBE_TOPIC = "devices/OMG_LILYGO/LORAtoMQTT/#"
+    from homeassistant.components.mqtt.models import ReceiveMessage, ReceivePayloadType
+    from homeassistant.util.json import JsonObjectType
+
+    from custom_components.plant_sense.coordinator import PlantSenseCoordinator
+    from custom_components.plant_sense.gateway import Gateway
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class MqttManager:
     """Manages the MQTT connection for PlantSense devices."""
 
     _data: Any
+    _capture: UplinkCapture | None
+    _coordinators: dict[str, PlantSenseCoordinator]
+    _deduplicator: UplinkDeduplicator
+    _discovery: DiscoveryTracker
+    _gateways: list[Gateway]
     _is_connected: bool
-    _unsubscribe_mqtt: CALLBACK_TYPE | None
+    _replay: asyncio.Task[None] | None
+    _replay_metrics: PipelineMetrics | None
+    _unsubscribe_mqtt: list[CALLBACK_TYPE]
     _unsubscribe_status: CALLBACK_TYPE | None
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        gateways: list[Gateway],
+        metrics: PipelineMetrics | None = None,
+    ) -> None:
         """Initialize MqttManager."""
         self._hass = hass
+        self._metrics = metrics
         self._data = None
+        self._capture = None
+        self._coordinators = {}
+        self._deduplicator = UplinkDeduplicator()
+        self._discovery = DiscoveryTracker(hass)
+        self._gateways = gateways
         self._is_connected = False
-        self._unsubscribe_mqtt = None
+        self._replay = None
+        self._replay_metrics = None
+        self._unsubscribe_mqtt = []
         self._unsubscribe_status = None
 
     async def connect(self) -> None:
-        """Subscribe to the PlantSense MQTT topic and watch for reconnections."""
+        """Subscribe to the gateways' MQTT topics and watch for reconnections."""
+        self._discovery.start()
+        for gateway in self._gateways:
+            gateway.downlink.start()
         self._unsubscribe_status = mqtt.async_subscribe_connection_status(
             self._hass, self._connection_status_changed
         )
         await self._subscribe()
 
     async def _subscribe(self) -> None:
-        self._unsubscribe_mqtt = await mqtt.client.async_subscribe(
-            self._hass,
-            _SUBSCRIBE_TOPIC,
-            self._async_mqtt_callback,
-        )
+        for gateway in self._gateways:
+            self._unsubscribe_mqtt.append(
+                await mqtt.client.async_subscribe(
+                    self._hass,
+                    gateway.uplink_topic,
+                    partial(self._async_mqtt_callback, gateway),
+                    encoding=None,
+                )
+            )
+            _LOGGER.debug(
+                "Subscribed to %s for gateway '%s'.", gateway.uplink_topic, gateway.name
+            )
         self._is_connected = True
-        _LOGGER.debug("Subscribed to %s.", _SUBSCRIBE_TOPIC)
+
+    def _unsubscribe(self) -> None:
+        for unsubscribe in self._unsubscribe_mqtt:
+            unsubscribe()
+        self._unsubscribe_mqtt.clear()
 
     @callback
     def _connection_status_changed(self, status: str) -> None:
         if status == mqtt.CONNECTION_SUCCESS:
-            _LOGGER.info("MQTT reconnected — re-subscribing to PlantSense topic.")
+            _LOGGER.info("MQTT reconnected — re-subscribing to PlantSense topics.")
             self._hass.async_create_task(self._resubscribe())
 
     async def _resubscribe(self) -> None:
-        if self._unsubscribe_mqtt is not None:
-            self._unsubscribe_mqtt()
-            self._unsubscribe_mqtt = None
+        self._unsubscribe()
         await self._subscribe()
 
-    def _is_plant_sense_message(self, json_message: JsonObjectType) -> bool:
-        return json_message.get("model") == "PlantSense" and "id" in json_message
+    @callback
+    def register_coordinator(self, coordinator: PlantSenseCoordinator) -> CALLBACK_TYPE:
+        """Route messages for the coordinator's serial directly to it."""
+        serial = normalize_serial(coordinator.device_serial)
+        self._coordinators[serial] = coordinator
+        self._discovery.forget(coordinator.device_serial)
+
+        @callback
+        def _unregister() -> None:
+            if self._coordinators.get(serial) is coordinator:
+                del self._coordinators[serial]
+
+        return _unregister
 
     def is_connected(self) -> bool:
         return self._is_connected
 
     def disconnect(self) -> None:
-        """Unsubscribe from MQTT topic and stop watching connection status."""
-        if self._unsubscribe_mqtt is not None:
-            self._unsubscribe_mqtt()
-            self._unsubscribe_mqtt = None
+        """Unsubscribe from MQTT topics and stop watching connection status."""
+        self._unsubscribe()
         if self._unsubscribe_status is not None:
             self._unsubscribe_status()
             self._unsubscribe_status = None
+        self._discovery.stop()
+        for gateway in self._gateways:
+            gateway.downlink.stop()
+        if self._replay is not None:
+            self._replay.cancel()
+        if self._capture is not None:
+            self._hass.async_create_task(self.async_stop_capture())
         self._is_connected = False
 
+    @property
+    def capture(self) -> UplinkCapture | None:
+        """Return the running capture, if any."""
+        return self._capture
+
+    @property
+    def replaying(self) -> bool:
+        return self._replay is not None and not self._replay.done()
+
+    @property
+    def replay_metrics(self) -> PipelineMetrics | None:
+        """Return the metrics of the last replay, kept apart from live traffic."""
+        return self._replay_metrics
+
+    @callback
+    def start_capture(self, directory: Path, max_bytes: int, max_files: int) -> None:
+        """Start appending all raw uplinks to capture files in the directory."""
+        if self._capture is not None:
+            return
+        self._capture = UplinkCapture(self._hass, directory, max_bytes, max_files)
+        self._capture.start()
+        _LOGGER.info("Capturing raw uplinks to %s.", directory)
+
+    async def async_stop_capture(self) -> None:
+        """Stop capturing and write what has been captured."""
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            await capture.async_stop()
+            _LOGGER.info("Captured %d uplinks.", capture.captured)
+
+    @callback
+    def start_replay(self, paths: list[Path], speed: float, *, backfill: bool) -> None:
+        """
+        Feed the uplinks of capture files, in the given order, through the receive path.
+
+        Uplinks are paced as they were captured, `speed` times faster, or as
+        fast as possible if it is 0. The readings are added to the history
+        and statistics at the time they were captured, and unless it is a
+        backfill the sensors show them as they are replayed. The files are one
+        replay: an hour split across two files by the capture's rotation is
+        only imported once all of them are through. Replayed uplinks change
+        nothing else and cause no downlinks: uplinks of devices that are not
+        set up start no discovery, and the replay's metrics are kept apart
+        from the live ones. Raises ServiceValidationError if a replay is
+        already running.
+        """
+        if self.replaying:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="replay_running"
+            )
+        self._replay = self._hass.async_create_background_task(
+            self._async_replay(paths, speed, backfill=backfill),
+            f"{DOMAIN} replay {paths[0].name}",
+        )
+
+    async def _async_replay(
+        self, paths: list[Path], speed: float, *, backfill: bool
+    ) -> None:
+        # Copies are recognized by when they were captured, not replayed.
+        deduplicator = UplinkDeduplicator()
+        if self._metrics is not None:
+            self._replay_metrics = PipelineMetrics()
+        started = time.monotonic()
+        first_received: float | None = None
+        replayed = 0
+        skipped = 0
+        try:
+            for path in paths:
+                try:
+                    reader = await self._hass.async_add_executor_job(
+                        CaptureReader, path
+                    )
+                except OSError as err:
+                    _LOGGER.warning("Cannot replay %s: %s", path.name, err)
+                    continue
+                _LOGGER.info("Replaying %s.", path.name)
+                try:
+                    while uplinks := await self._hass.async_add_executor_job(
+                        reader.read, REPLAY_BATCH_SIZE
+                    ):
+                        for uplink in uplinks:
+                            if first_received is None:
+                                first_received = uplink.received
+                            if speed > 0:
+                                delay = (uplink.received - first_received) / speed - (
+                                    time.monotonic() - started
+                                )
+                                if delay > 0:
+                                    await asyncio.sleep(delay)
+                            await self._async_receive(
+                                None,
+                                uplink.payload,
+                                deduplicator=deduplicator,
+                                captured=uplink.received,
+                                backfill=backfill,
+                            )
+                            replayed += 1
+                finally:
+                    await self._hass.async_add_executor_job(reader.close)
+                    skipped += reader.skipped
+        finally:
+            for coordinator in self._coordinators.values():
+                coordinator.statistics.flush_completed()
+            _LOGGER.info(
+                "Replayed %d uplinks of %d files in %.1f s (%d lines skipped).",
+                replayed,
+                len(paths),
+                time.monotonic() - started,
+                skipped,
+            )
+
+    @property
+    def discovery(self) -> DiscoveryTracker:
+        return self._discovery
+
+    @property
+    def deduplicator(self) -> UplinkDeduplicator:
+        return self._deduplicator
+
+    @property
+    def gateways(self) -> list[Gateway]:
+        return self._gateways
+
     def _start_discovery(self, device_id: str, name: str) -> None:
+        if self._metrics is not None:
+            self._metrics.count("unknown_device")
+        if not self._discovery.should_start_discovery(device_id):
+            _LOGGER.debug("Discovery for '%s' suppressed.", device_id)
+            return
+
         _LOGGER.info("Starting discovery for '%s' (%s).", name, device_id)
         discovery_flow.async_create_flow(
             self._hass,
@@ -89,56 +289,137 @@ class MqttManager:
             data={DISCOVERY_SERIAL: device_id, DISCOVERY_NAME: name},
         )
 
-    async def _async_mqtt_callback(self, message: ReceiveMessage) -> None:
+    async def _async_mqtt_callback(
+        self, gateway: Gateway, message: ReceiveMessage
+    ) -> None:
         """Parse incoming MQTT payload and route it to the right coordinator."""
-        try:
-            json_message = json_loads_object(message.payload)
-            if not isinstance(json_message, dict):
-                _LOGGER.error("Received invalid JSON from message: %s", message.payload)
-                return
-        except ValueError:
-            _LOGGER.info("Error parsing JSON from message: %s", message)
-            return
+        if self._capture is not None:
+            self._capture.record(gateway.name, message.payload)
+        await self._async_receive(gateway, message.payload)
 
-        if "hex" in json_message:
-            hex_data = json_message.get("hex")
-            if isinstance(hex_data, str):
-                try:
-                    json_data = json_loads_object(bytes.fromhex(hex_data))
-                except ValueError:
-                    _LOGGER.info("Hex data was not a json object: %s", message)
-                    return
-
-                json_message.update(json_data)
-            else:
-                _LOGGER.error("Hex data was not a string.")
+    async def _async_receive(
+        self,
+        gateway: Gateway | None,
+        payload: ReceivePayloadType,
+        *,
+        deduplicator: UplinkDeduplicator | None = None,
+        captured: float | None = None,
+        backfill: bool = False,
+    ) -> None:
+        """
+        Decode a raw payload, received live or replayed from a capture.
 
-        if self._is_plant_sense_message(json_message):
-            await self._handle_message(json_message)
-        else:
-            _LOGGER.info("Message is not from a PlantSense Device.")
+        Replayed payloads come without a gateway and with the time they were
+        captured; their metrics are recorded apart from the live ones.
+        """
+        metrics = self._metrics if captured is None else self._replay_metrics
+        if metrics is not None:
+            metrics.count("received")
+        json_message = decode_payload(payload, metrics)
+        if json_message is not None:
+            await self._handle_message(
+                gateway,
+                json_message,
+                deduplicator=deduplicator,
+                captured=captured,
+                backfill=backfill,
+            )
 
-    async def _handle_message(self, json_message: JsonObjectType) -> None:
+    async def _handle_message(
+        self,
+        gateway: Gateway | None,
+        json_message: JsonObjectType,
+        *,
+        deduplicator: UplinkDeduplicator | None = None,
+        captured: float | None = None,
+        backfill: bool = False,
+    ) -> None:
         """Handle a message from the PlantSense."""
+        metrics = self._metrics if captured is None else self._replay_metrics
+        started = perf_counter_ns() if metrics is not None else 0
         device_serial = json_message.get("id")
-        name = json_message.get("name")
 
         if not isinstance(device_serial, str):
             _LOGGER.error("Invalid device id in message.")
             return
 
-        if not isinstance(name, str):
-            name = "-"
+        verdict = (deduplicator or self._deduplicator).observe(
+            device_serial, json_message, captured
+        )
+        if verdict is not Verdict.NEW:
+            if gateway is not None:
+                self._handle_duplicate(gateway, device_serial, json_message, verdict)
+            return
+
+        coordinator = self._coordinators.get(normalize_serial(device_serial))
+        if coordinator is None:
+            if captured is not None:
+                # Replays only feed devices that are set up, without discovery.
+                if metrics is not None:
+                    metrics.count("unknown_device")
+                return
+            coordinator = self._lookup_coordinator(device_serial, json_message)
+            if coordinator is None:
+                return
+
+        if metrics is None:
+            await self._dispatch(
+                coordinator, gateway, json_message, captured, backfill=backfill
+            )
+            return
+
+        started = metrics.record(Stage.ROUTING, started)
+        await self._dispatch(
+            coordinator, gateway, json_message, captured, backfill=backfill
+        )
+        finished = metrics.record(Stage.DISPATCH, started)
+        if captured is None:
+            coordinator.record_dispatch(finished - started)
+
+    async def _dispatch(
+        self,
+        coordinator: PlantSenseCoordinator,
+        gateway: Gateway | None,
+        json_message: JsonObjectType,
+        captured: float | None,
+        *,
+        backfill: bool,
+    ) -> None:
+        if gateway is not None:
+            await coordinator.handle_message(gateway, json_message)
+        elif captured is not None:
+            coordinator.replay_message(
+                json_message, datetime.fromtimestamp(captured, UTC), backfill=backfill
+            )
 
+    @callback
+    def _handle_duplicate(
+        self,
+        gateway: Gateway,
+        device_serial: str,
+        json_message: JsonObjectType,
+        verdict: Verdict,
+    ) -> None:
+        _LOGGER.debug("Dropping duplicate uplink of '%s'.", device_serial)
+        if self._metrics is not None:
+            self._metrics.count("rejected_duplicate")
+        coordinator = self._coordinators.get(normalize_serial(device_serial))
+        if verdict is Verdict.BETTER_DUPLICATE and coordinator is not None:
+            coordinator.update_link_quality(gateway, json_message)
+
+    def _lookup_coordinator(
+        self, device_serial: str, json_message: JsonObjectType
+    ) -> PlantSenseCoordinator | None:
+        """Find the coordinator of a serial that is not indexed (yet)."""
         device_registry = dr.async_get(self._hass)
         device = device_registry.async_get_device(
             identifiers={(DOMAIN, build_unique_id(device_serial))}
         )
 
         if device is None:
-            _LOGGER.warning("No device found for serial '%s'", device_serial)
-            self._start_discovery(device_serial, name)
-            return
+            name = json_message.get("name")
+            self._start_discovery(device_serial, name if isinstance(name, str) else "-")
+            return None
 
         for entry_id in device.config_entries:
             config_entry = self._hass.config_entries.async_get_entry(entry_id)
@@ -150,4 +431,7 @@ class MqttManager:
                 and isinstance(config_entry.runtime_data, PlantSenseData)
                 and config_entry.runtime_data.coordinator is not None
             ):
-                await config_entry.runtime_data.coordinator.handle_message(json_message)
+                if self._metrics is not None:
+                    self._metrics.count("routed_by_registry")
+                return config_entry.runtime_data.coordinator
+        return None
@@ -0,0 +1,231 @@
+"""Staged rollout of firmware updates to devices with auto-update enabled."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import (
+    CONF_CANARY_PERCENT,
+    CONF_MAX_CONCURRENT,
+    CONF_UPDATE_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import PlantSenseCoordinator
+    from .staleness import DeadlineWheel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RolloutState(StrEnum):
+    IDLE = "idle"
+    CANARY = "canary"
+    ROLLING = "rolling"
+    PAUSED = "paused"
+
+
+class DevicePhase(StrEnum):
+    UPDATING = "updating"
+    UPDATED = "updated"
+    FAILED = "failed"
+
+
+@dataclass(slots=True)
+class _DeviceRollout:
+    phase: DevicePhase
+    canary: bool
+    started: float
+
+
+class OtaRollout:
+    """
+    Decides which devices with auto-update enabled may update now.
+
+    A new release first goes to a share of canary devices, the first ones to
+    check in. Only once all of them reported the new version does it go to
+    the others; a canary that does not report it within the timeout pauses
+    the rollout until it is resumed. At most a fixed number of devices
+    update at the same time, and an update is only started while the
+    gateway that heard the device has no downlinks queued, so OTA commands
+    do not compete with other devices' commands for the same airtime.
+    """
+
+    _coordinators: set[PlantSenseCoordinator]
+    _devices: dict[str, _DeviceRollout]
+
+    def __init__(self, wheel: DeadlineWheel, config: dict[str, Any]) -> None:
+        """Initialize OtaRollout."""
+        self._wheel = wheel
+        self._canary_percent: float = config[CONF_CANARY_PERCENT]
+        self._max_concurrent: int = config[CONF_MAX_CONCURRENT]
+        self._timeout: float = config[CONF_UPDATE_TIMEOUT].total_seconds()
+        self._coordinators = set()
+        self._devices = {}
+        self._version: str | None = None
+        self._state = RolloutState.IDLE
+        self._canary_count = 0
+
+    @callback
+    def register_coordinator(self, coordinator: PlantSenseCoordinator) -> CALLBACK_TYPE:
+        """Count the coordinator's device when sizing the canary group."""
+        self._coordinators.add(coordinator)
+
+        @callback
+        def _unregister() -> None:
+            self._coordinators.discard(coordinator)
+            self._wheel.cancel(self._timeout_key(coordinator.device_serial))
+
+        return _unregister
+
+    @callback
+    def request_update(self, coordinator: PlantSenseCoordinator, version: str) -> bool:
+        """Return whether the device that just uplinked may update to `version`."""
+        if version != self._version:
+            self._start(version)
+        if self._state is RolloutState.PAUSED:
+            return False
+
+        serial = coordinator.device_serial
+        device = self._devices.get(serial)
+        if device is not None:
+            # An update that is in progress, or failed, is not repeated.
+            return False
+
+        canary = self._state is RolloutState.CANARY
+        if canary and self._count(canary=True) >= self._canary_count:
+            return False
+        if self._count(phase=DevicePhase.UPDATING) >= self._max_concurrent:
+            return False
+        gateway = coordinator.gateway
+        if gateway is not None and gateway.downlink.queue_depth > 0:
+            return False
+
+        self._devices[serial] = _DeviceRollout(
+            phase=DevicePhase.UPDATING, canary=canary, started=time.monotonic()
+        )
+        self._wheel.schedule(
+            self._timeout_key(serial),
+            time.monotonic() + self._timeout,
+            lambda: self._handle_timeout(serial),
+        )
+        _LOGGER.info(
+            "Updating '%s' to %s%s.", serial, version, " (canary)" if canary else ""
+        )
+        return True
+
+    @callback
+    def firmware_reported(self, serial: str, version: str) -> None:
+        """Take note of the firmware version a device reported."""
+        device = self._devices.get(serial)
+        if (
+            device is None
+            or device.phase is DevicePhase.UPDATED
+            or version != self._version
+        ):
+            return
+        device.phase = DevicePhase.UPDATED
+        self._wheel.cancel(self._timeout_key(serial))
+        _LOGGER.info(
+            "'%s' updated in %.0f s.", serial, time.monotonic() - device.started
+        )
+        if (
+            self._state is RolloutState.CANARY
+            and self._count(canary=True, phase=DevicePhase.UPDATED)
+            >= self._canary_count
+        ):
+            _LOGGER.info("All canaries run %s; updating the others.", version)
+            self._state = RolloutState.ROLLING
+
+    @callback
+    def pause(self) -> None:
+        """Stop starting updates."""
+        if self._state is not RolloutState.IDLE:
+            self._state = RolloutState.PAUSED
+
+    @callback
+    def resume(self) -> None:
+        """Continue a paused rollout, retrying the devices that failed."""
+        if self._state is not RolloutState.PAUSED:
+            return
+        for serial in [
+            serial
+            for serial, device in self._devices.items()
+            if device.phase is DevicePhase.FAILED
+        ]:
+            del self._devices[serial]
+        self._state = (
+            RolloutState.ROLLING
+            if self._count(canary=True, phase=DevicePhase.UPDATED) >= self._canary_count
+            else RolloutState.CANARY
+        )
+
+    @property
+    def status(self) -> dict[str, Any]:
+        """Return the state of the rollout and the phase of every device."""
+        phases = Counter(device.phase for device in self._devices.values())
+        return {
+            "version": self._version,
+            "state": self._state,
+            "canary_count": self._canary_count,
+            "max_concurrent": self._max_concurrent,
+            **{phase.value: phases[phase] for phase in DevicePhase},
+            "devices": {
+                serial: {"phase": device.phase, "canary": device.canary}
+                for serial, device in self._devices.items()
+            },
+        }
+
+    def _start(self, version: str) -> None:
+        for serial in self._devices:
+            self._wheel.cancel(self._timeout_key(serial))
+        self._devices = {}
+        self._version = version
+        eligible = sum(
+            coordinator.auto_update and coordinator.firmware_version != version
+            for coordinator in self._coordinators
+        )
+        self._canary_count = max(1, math.ceil(eligible * self._canary_percent / 100))
+        self._state = RolloutState.CANARY
+        _LOGGER.info(
+            "Rolling out %s to %d devices, %d canaries first.",
+            version,
+            eligible,
+            self._canary_count,
+        )
+
+    @callback
+    def _handle_timeout(self, serial: str) -> None:
+        device = self._devices.get(serial)
+        if device is None or device.phase is not DevicePhase.UPDATING:
+            return
+        device.phase = DevicePhase.FAILED
+        if device.canary:
+            _LOGGER.warning(
+                "Canary '%s' did not report %s in time; pausing the rollout.",
+                serial,
+                self._version,
+            )
+            self._state = RolloutState.PAUSED
+        else:
+            _LOGGER.warning("'%s' did not report %s in time.", serial, self._version)
+
+    def _count(
+        self, *, canary: bool | None = None, phase: DevicePhase | None = None
+    ) -> int:
+        return sum(
+            (canary is None or device.canary == canary)
+            and (phase is None or device.phase is phase)
+            for device in self._devices.values()
+        )
+
+    @staticmethod
+    def _timeout_key(serial: str) -> str:
+        return f"ota:{serial}"
@@ -1,25 +1,33 @@
 import logging
-from datetime import date, datetime
-from decimal import Decimal
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from homeassistant.components.sensor import (
     ENTITY_ID_FORMAT,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS,
     EntityCategory,
+    UnitOfElectricPotential,
     UnitOfTemperature,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo, async_generate_entity_id
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 
-from .coordinator import PlantSenseComponent, PlantSenseCoordinator
+from .const import CONF_RAW_DIAGNOSTIC_SENSORS, DOMAIN, DOMAIN_CONFIG
+from .coordinator import ConfigValue, PlantSenseComponent, PlantSenseCoordinator
+from .helpers import build_entity_id
+from .messages import DataReading
 
 if TYPE_CHECKING:
     from .data import PlantSenseData
@@ -27,6 +35,84 @@ if TYPE_CHECKING:
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class PlantSenseSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor showing one value of the device's readings."""
+
+    value_fn: Callable[[DataReading], StateType]
+
+
+SENSORS: tuple[PlantSenseSensorEntityDescription, ...] = (
+    PlantSenseSensorEntityDescription(
+        key="battery",
+        name="Battery",
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda reading: reading.battery,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="moisture",
+        name="Moisture",
+        device_class=SensorDeviceClass.MOISTURE,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda reading: reading.moisture,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="humidity",
+        name="Humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda reading: reading.humidity,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="temperature",
+        name="Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda reading: reading.temperature,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="test",
+        name="Test",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda reading: reading.test,
+    ),
+)
+
+# Their hourly aggregates are imported as statistics even if they are not
+# created.
+RAW_DIAGNOSTIC_SENSORS: tuple[PlantSenseSensorEntityDescription, ...] = (
+    PlantSenseSensorEntityDescription(
+        key="rssi",
+        name="RSSI",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda reading: reading.rssi,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="snr",
+        name="SNR",
+        icon="mdi:wifi",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda reading: reading.snr,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="battery_volt",
+        name="Battery Voltage",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda reading: reading.battery_volt,
+    ),
+    PlantSenseSensorEntityDescription(
+        key="moisture_raw",
+        name="Moisture Raw",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda reading: reading.moisture_raw,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -34,150 +120,68 @@ async def async_setup_entry(
 ) -> None:
     """Add sensors for passed config_entry in HA."""
     data: PlantSenseData = config_entry.runtime_data
+    coordinator = data.coordinator
+    descriptions = SENSORS
+    if hass.data[DOMAIN][DOMAIN_CONFIG][CONF_RAW_DIAGNOSTIC_SENSORS]:
+        descriptions += RAW_DIAGNOSTIC_SENSORS
+
     sensor_list: list[SensorEntity] = [
-        ConfigPendingSensor(hass=hass, coordinator=data.coordinator),
-        WifiConfiguredSensor(hass=hass, coordinator=data.coordinator),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=SensorDeviceClass.BATTERY,
-            unit_of_measurement=PERCENTAGE,
-            id_suffix="battery",
-            name="Battery",
-            value_key="batPct",
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=SensorDeviceClass.MOISTURE,
-            unit_of_measurement=PERCENTAGE,
-            id_suffix="moisture",
-            name="Moisture",
-            value_key="moi",
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=SensorDeviceClass.HUMIDITY,
-            unit_of_measurement=PERCENTAGE,
-            id_suffix="humidity",
-            name="Humidity",
-            value_key="hum",
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=SensorDeviceClass.TEMPERATURE,
-            unit_of_measurement=UnitOfTemperature.CELSIUS,
-            id_suffix="temperature",
-            name="Temperature",
-            value_key="tempc",
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=SensorDeviceClass.SIGNAL_STRENGTH,
-            unit_of_measurement=SIGNAL_STRENGTH_DECIBELS,
-            id_suffix="rssi",
-            name="RSSI",
-            value_key="rssi",
-            entity_category=EntityCategory.DIAGNOSTIC,
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=None,
-            unit_of_measurement=None,
-            id_suffix="snr",
-            name="SNR",
-            value_key="snr",
-            icon="mdi:wifi",
-            entity_category=EntityCategory.DIAGNOSTIC,
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=None,
-            unit_of_measurement=None,
-            id_suffix="test",
-            name="Test",
-            value_key="test",
-            entity_category=EntityCategory.DIAGNOSTIC,
-        ),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=None,
-            unit_of_measurement="V",
-            id_suffix="battery_volt",
-            name="Battery Voltage",
-            value_key="bat",
-            entity_category=EntityCategory.DIAGNOSTIC,
-        ),
-        ConfigVersionSensor(hass=hass, coordinator=data.coordinator),
-        GenericPlantSenseSensor(
-            hass=hass,
-            coordinator=data.coordinator,
-            device_class=None,
-            unit_of_measurement=None,
-            id_suffix="moisture_raw",
-            name="Moisture Raw",
-            value_key="moiRaw",
-            entity_category=EntityCategory.DIAGNOSTIC,
-        ),
+        ConfigPendingSensor(coordinator=coordinator),
+        WifiConfiguredSensor(coordinator=coordinator),
+        ConfigVersionSensor(coordinator=coordinator),
     ]
+    sensor_list += [
+        GenericPlantSenseSensor(coordinator, description)
+        for description in descriptions
+    ]
+    if coordinator.metrics_enabled:
+        sensor_list += [
+            UplinkCountSensor(coordinator=coordinator),
+            UplinkProcessingTimeSensor(coordinator=coordinator),
+        ]
     async_add_entities(sensor_list)
 
 
 class GenericPlantSenseSensor(SensorEntity, PlantSenseComponent):
     """Representation of a Sensor."""
 
-    _name: str
-    _value_key: str
+    entity_description: PlantSenseSensorEntityDescription
     _coordinator: PlantSenseCoordinator
 
-    def __init__(  # noqa: PLR0913
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
         self,
-        hass: HomeAssistant,
         coordinator: PlantSenseCoordinator,
-        device_class: SensorDeviceClass | None,
-        unit_of_measurement: str | None,
-        name: str,
-        id_suffix: str,
-        value_key: str,
-        icon: str | None = None,
-        entity_category: EntityCategory | None = None,
+        description: PlantSenseSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
+        self.entity_description = description
         self._coordinator = coordinator
-        self._attr_should_poll = False
-        self._attr_device_class = device_class
-        self._attr_native_unit_of_measurement = unit_of_measurement
-        self._attr_unique_id = f"{coordinator.device_id}_{id_suffix}"
-        self._attr_icon = icon
-        self._attr_entity_category = entity_category
-
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_{id_suffix}", hass=hass
+        self._value_fn = description.value_fn
+        if coordinator.last_data is not None:
+            # Restored from before the restart.
+            self._attr_native_value = self._value_fn(coordinator.last_data)
+        self._attr_unique_id = f"{coordinator.device_id}_{description.key}"
+
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_{description.key}"
         )
 
-        self._name = name
-        self._value_key = value_key
-
-    async def update_async(self) -> None:
-        if self._coordinator.last_data is None:
-            return
-
-        value = self._coordinator.last_data.get(self._value_key)
-        if isinstance(value, (str | int | float | date | datetime | Decimal)):
-            self._attr_native_value = value
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        changed = False
+        reading = self._coordinator.last_data
+        if reading is not None:
+            value = self._value_fn(reading)
+            if value is not None and value != self._attr_native_value:
+                self._attr_native_value = value
+                changed = True
+
+        if changed or force:
             self.async_write_ha_state()
 
-    @property
-    def name(self) -> str:
-        """Return the name of the sensor."""
-        return f"{self._coordinator.device_name} {self._name}"
-
     @property
     def device_info(self) -> DeviceInfo:
         """Return the device information."""
@@ -185,8 +189,8 @@ class GenericPlantSenseSensor(SensorEntity, PlantSenseComponent):
 
     @property
     def available(self) -> bool:
-        """Return True if roller and hub is available."""
-        return True
+        """Return False while the device is overdue."""
+        return self._coordinator.available
 
     async def async_added_to_hass(self) -> None:
         """Run when this Entity has been added to HA."""
@@ -197,25 +201,25 @@ class GenericPlantSenseSensor(SensorEntity, PlantSenseComponent):
         self._coordinator.remove_component(self)
 
 
-class ConfigPendingSensor(SensorEntity):
+class ConfigPendingSensor(SensorEntity, PlantSenseComponent):
     """Sensor that reflects whether a config push to the device is pending."""
 
     _coordinator: PlantSenseCoordinator
 
-    def __init__(self, hass: HomeAssistant, coordinator: PlantSenseCoordinator) -> None:
+    _attr_has_entity_name = True
+    config_values = frozenset({ConfigValue.PENDING})
+    _attr_name = "Config Status"
+
+    def __init__(self, coordinator: PlantSenseCoordinator) -> None:
         """Initialize the config pending sensor."""
         self._coordinator = coordinator
         self._attr_should_poll = False
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_unique_id = f"{coordinator.device_id}_config_pending"
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_config_pending", hass=hass
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_config_pending"
         )
 
-    @property
-    def name(self) -> str:
-        return f"{self._coordinator.device_name} Config Status"
-
     @property
     def native_value(self) -> str:
         return "pending" if self._coordinator.config_pending else "synced"
@@ -228,37 +232,41 @@ class ConfigPendingSensor(SensorEntity):
     def available(self) -> bool:
         return True
 
-    async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            self._coordinator.entry.add_update_listener(self._handle_entry_update)
-        )
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """Uplinks do not change the config state."""
 
-    async def _handle_entry_update(
-        self, _hass: HomeAssistant, _entry: ConfigEntry
-    ) -> None:
+    @callback
+    def handle_config_update(self) -> None:
         self.async_write_ha_state()
 
+    async def async_added_to_hass(self) -> None:
+        self._coordinator.register_component(self)
 
-class WifiConfiguredSensor(SensorEntity):
+    async def async_will_remove_from_hass(self) -> None:
+        self._coordinator.remove_component(self)
+
+
+class WifiConfiguredSensor(SensorEntity, PlantSenseComponent):
     """Sensor indicating whether WiFi credentials are configured on the device."""
 
     _coordinator: PlantSenseCoordinator
 
-    def __init__(self, hass: HomeAssistant, coordinator: PlantSenseCoordinator) -> None:
+    _attr_has_entity_name = True
+    config_values = frozenset({ConfigValue.WIFI_CONFIGURED})
+    _attr_name = "WiFi Configured"
+
+    def __init__(self, coordinator: PlantSenseCoordinator) -> None:
         """Initialize the wifi configured sensor."""
         self._coordinator = coordinator
         self._attr_should_poll = False
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_icon = "mdi:wifi-settings"
         self._attr_unique_id = f"{coordinator.device_id}_wifi_configured"
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_wifi_configured", hass=hass
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_wifi_configured"
         )
 
-    @property
-    def name(self) -> str:
-        return f"{self._coordinator.device_name} WiFi Configured"
-
     @property
     def native_value(self) -> str | None:
         if self._coordinator.wifi_configured is None:
@@ -273,36 +281,40 @@ class WifiConfiguredSensor(SensorEntity):
     def available(self) -> bool:
         return True
 
-    async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            self._coordinator.entry.add_update_listener(self._handle_entry_update)
-        )
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """Uplinks do not change the config state."""
 
-    async def _handle_entry_update(
-        self, _hass: HomeAssistant, _entry: ConfigEntry
-    ) -> None:
+    @callback
+    def handle_config_update(self) -> None:
         self.async_write_ha_state()
 
+    async def async_added_to_hass(self) -> None:
+        self._coordinator.register_component(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._coordinator.remove_component(self)
+
 
-class ConfigVersionSensor(SensorEntity):
+class ConfigVersionSensor(SensorEntity, PlantSenseComponent):
     """Sensor reporting the config version from HA-stored entry data."""
 
     _coordinator: PlantSenseCoordinator
 
-    def __init__(self, hass: HomeAssistant, coordinator: PlantSenseCoordinator) -> None:
+    _attr_has_entity_name = True
+    config_values = frozenset({ConfigValue.VERSION})
+    _attr_name = "Config Version"
+
+    def __init__(self, coordinator: PlantSenseCoordinator) -> None:
         """Initialize the config version sensor."""
         self._coordinator = coordinator
         self._attr_should_poll = False
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_unique_id = f"{coordinator.device_id}_config_version"
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_config_version", hass=hass
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_config_version"
         )
 
-    @property
-    def name(self) -> str:
-        return f"{self._coordinator.device_name} Config Version"
-
     @property
     def native_value(self) -> int:
         return self._coordinator.config_version
@@ -315,12 +327,84 @@ class ConfigVersionSensor(SensorEntity):
     def available(self) -> bool:
         return True
 
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """Uplinks do not change the config state."""
+
+    @callback
+    def handle_config_update(self) -> None:
+        self.async_write_ha_state()
+
     async def async_added_to_hass(self) -> None:
-        self.async_on_remove(
-            self._coordinator.entry.add_update_listener(self._handle_entry_update)
+        self._coordinator.register_component(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._coordinator.remove_component(self)
+
+
+class _PipelineSensor(SensorEntity, PlantSenseComponent):
+    """Base for the disabled-by-default sensors of the pipeline metrics."""
+
+    _coordinator: PlantSenseCoordinator
+    _id_suffix: str
+
+    _attr_has_entity_name = True
+    pipeline_metrics = True
+
+    def __init__(self, coordinator: PlantSenseCoordinator) -> None:
+        """Initialize the pipeline sensor."""
+        self._coordinator = coordinator
+        self._attr_should_poll = False
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._attr_unique_id = f"{coordinator.device_id}_{self._id_suffix}"
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_{self._id_suffix}"
         )
 
-    async def _handle_entry_update(
-        self, _hass: HomeAssistant, _entry: ConfigEntry
-    ) -> None:
-        self.async_write_ha_state()
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        if force or self.native_value != self._attr_native_value:
+            self._attr_native_value = self.native_value
+            self.async_write_ha_state()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return self._coordinator.device_info
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        self._coordinator.register_component(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._coordinator.remove_component(self)
+
+
+class UplinkCountSensor(_PipelineSensor):
+    """Sensor counting the uplinks received from the device since startup."""
+
+    _attr_name = "Uplinks"
+    _id_suffix = "uplinks"
+    _attr_icon = "mdi:counter"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self) -> int:
+        return self._coordinator.uplinks
+
+
+class UplinkProcessingTimeSensor(_PipelineSensor):
+    """Sensor reporting how long the last uplink took to dispatch."""
+
+    _attr_name = "Uplink Processing Time"
+    _id_suffix = "uplink_processing_time"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MICROSECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> float | None:
+        return self._coordinator.last_dispatch_us
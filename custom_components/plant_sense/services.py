@@ -0,0 +1,305 @@
+"""Services for PlantSense."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+
+from .capture import capture_files
+from .const import (
+    CAPTURE_DIRECTORY,
+    CAPTURE_MAX_FILE_MB,
+    CAPTURE_MAX_FILES,
+    DOMAIN,
+    DOMAIN_BULK_CONFIG,
+    DOMAIN_MQTT_MANAGER,
+    DOMAIN_OTA_ROLLOUT,
+    OPTIONS_MOI_DRY,
+    OPTIONS_MOI_WET,
+    OPTIONS_SSID,
+    OPTIONS_UPDATE_TEST_MODE,
+    OPTIONS_WIFI_PWD,
+)
+from .helpers import async_get_coordinator, local_timestamp
+from .history import HISTORY_FIELDS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+
+    from .bulk_config import BulkConfigPushes
+    from .coordinator import PlantSenseCoordinator
+    from .mqtt_manager import MqttManager
+    from .rollout import OtaRollout
+
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_RECALIBRATE_HISTORY = "recalibrate_history"
+SERVICE_BULK_SET_CONFIG = "bulk_set_config"
+SERVICE_GET_BULK_CONFIG_STATUS = "get_bulk_config_status"
+SERVICE_GET_ROLLOUT_STATUS = "get_rollout_status"
+SERVICE_PAUSE_ROLLOUT = "pause_rollout"
+SERVICE_RESUME_ROLLOUT = "resume_rollout"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FIELDS = "fields"
+ATTR_MAX_FILE_SIZE = "max_file_size"
+ATTR_MAX_FILES = "max_files"
+ATTR_FILE = "file"
+ATTR_SPEED = "speed"
+ATTR_BACKFILL = "backfill"
+ATTR_PUSH_ID = "push_id"
+
+# Fields of bulk_set_config and the options they set.
+BULK_CONFIG_OPTIONS = {
+    "moi_dry": OPTIONS_MOI_DRY,
+    "moi_wet": OPTIONS_MOI_WET,
+    "test_mode": OPTIONS_UPDATE_TEST_MODE,
+    "ssid": OPTIONS_SSID,
+    "wifi_password": OPTIONS_WIFI_PWD,
+}
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FIELDS, default=list(HISTORY_FIELDS)): vol.All(
+            cv.ensure_list, [vol.In(HISTORY_FIELDS)]
+        ),
+    }
+)
+
+RECALIBRATE_HISTORY_SCHEMA = vol.Schema({vol.Required(ATTR_DEVICE_ID): cv.string})
+
+BULK_SET_CONFIG_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("moi_dry"): vol.Coerce(int),
+            vol.Optional("moi_wet"): vol.Coerce(int),
+            vol.Optional("test_mode"): cv.boolean,
+            vol.Optional("ssid"): cv.string,
+            vol.Optional("wifi_password"): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(*BULK_CONFIG_OPTIONS),
+)
+
+GET_BULK_CONFIG_STATUS_SCHEMA = vol.Schema(
+    {vol.Optional(ATTR_PUSH_ID): vol.Coerce(int)}
+)
+
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_MAX_FILE_SIZE, default=CAPTURE_MAX_FILE_MB): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1)
+        ),
+        vol.Optional(ATTR_MAX_FILES, default=CAPTURE_MAX_FILES): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+    }
+)
+
+REPLAY_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_FILE): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SPEED, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_BACKFILL, default=False): cv.boolean,
+    }
+)
+
+
+@callback
+def _async_get_loaded_coordinator(
+    hass: HomeAssistant, device_id: str
+) -> PlantSenseCoordinator:
+    coordinator = async_get_coordinator(hass, device_id)
+    if coordinator is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="device_not_loaded",
+            translation_placeholders={"device_id": device_id},
+        )
+    return coordinator
+
+
+@callback
+def _async_get_mqtt_manager(hass: HomeAssistant) -> MqttManager:
+    mqtt_manager: MqttManager | None = hass.data[DOMAIN].get(DOMAIN_MQTT_MANAGER)
+    if mqtt_manager is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN, translation_key="not_connected"
+        )
+    return mqtt_manager
+
+
+async def _async_capture_paths(
+    hass: HomeAssistant, directory: Path, names: list[str] | None
+) -> list[Path]:
+    """Return the capture files to replay, all of them if no names are given."""
+    if names is None:
+        paths = await hass.async_add_executor_job(capture_files, directory)
+        if not paths:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="no_captures"
+            )
+        return paths
+
+    # Capture files are named by when they were started.
+    names = sorted(set(names))
+    paths = [directory / name for name in names]
+    for name, path in zip(names, paths, strict=True):
+        # Only files in the capture directory can be replayed.
+        if path.name != name or not await hass.async_add_executor_job(path.is_file):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="capture_not_found",
+                translation_placeholders={"file": name},
+            )
+    return paths
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the PlantSense services."""
+
+    @callback
+    def _get_history(call: ServiceCall) -> ServiceResponse:
+        coordinator = _async_get_loaded_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        return coordinator.history.window(
+            local_timestamp(call.data.get(ATTR_START)),
+            local_timestamp(call.data.get(ATTR_END)),
+            tuple(call.data[ATTR_FIELDS]),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    @callback
+    def _recalibrate_history(call: ServiceCall) -> None:
+        coordinator = _async_get_loaded_coordinator(hass, call.data[ATTR_DEVICE_ID])
+        if coordinator.calibration is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="calibration_disabled",
+                translation_placeholders={"device_id": call.data[ATTR_DEVICE_ID]},
+            )
+        coordinator.recalibrate()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECALIBRATE_HISTORY,
+        _recalibrate_history,
+        schema=RECALIBRATE_HISTORY_SCHEMA,
+    )
+
+    @callback
+    def _bulk_set_config(call: ServiceCall) -> ServiceResponse:
+        coordinators = [
+            _async_get_loaded_coordinator(hass, device_id)
+            for device_id in call.data[ATTR_DEVICE_ID]
+        ]
+        bulk_config: BulkConfigPushes = hass.data[DOMAIN][DOMAIN_BULK_CONFIG]
+        push = bulk_config.async_push(
+            coordinators,
+            {
+                option: call.data[field]
+                for field, option in BULK_CONFIG_OPTIONS.items()
+                if field in call.data
+            },
+        )
+        return bulk_config.progress(push.push_id)
+
+    @callback
+    def _get_bulk_config_status(call: ServiceCall) -> ServiceResponse:
+        bulk_config: BulkConfigPushes = hass.data[DOMAIN][DOMAIN_BULK_CONFIG]
+        progress = bulk_config.progress(call.data.get(ATTR_PUSH_ID))
+        if progress is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="bulk_config_not_found"
+            )
+        return progress
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET_CONFIG,
+        _bulk_set_config,
+        schema=BULK_SET_CONFIG_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_BULK_CONFIG_STATUS,
+        _get_bulk_config_status,
+        schema=GET_BULK_CONFIG_STATUS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    rollout: OtaRollout = hass.data[DOMAIN][DOMAIN_OTA_ROLLOUT]
+
+    @callback
+    def _get_rollout_status(_call: ServiceCall) -> ServiceResponse:
+        return rollout.status
+
+    @callback
+    def _pause_rollout(_call: ServiceCall) -> None:
+        rollout.pause()
+
+    @callback
+    def _resume_rollout(_call: ServiceCall) -> None:
+        rollout.resume()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_ROLLOUT_STATUS,
+        _get_rollout_status,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_PAUSE_ROLLOUT, _pause_rollout)
+    hass.services.async_register(DOMAIN, SERVICE_RESUME_ROLLOUT, _resume_rollout)
+
+    capture_directory = Path(hass.config.path(CAPTURE_DIRECTORY))
+
+    @callback
+    def _start_capture(call: ServiceCall) -> None:
+        _async_get_mqtt_manager(hass).start_capture(
+            capture_directory,
+            int(call.data[ATTR_MAX_FILE_SIZE] * 1024 * 1024),
+            call.data[ATTR_MAX_FILES],
+        )
+
+    async def _stop_capture(_call: ServiceCall) -> None:
+        await _async_get_mqtt_manager(hass).async_stop_capture()
+
+    async def _replay_capture(call: ServiceCall) -> None:
+        mqtt_manager = _async_get_mqtt_manager(hass)
+        paths = await _async_capture_paths(
+            hass, capture_directory, call.data.get(ATTR_FILE)
+        )
+        mqtt_manager.start_replay(
+            paths, call.data[ATTR_SPEED], backfill=call.data[ATTR_BACKFILL]
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_CAPTURE, _start_capture, schema=START_CAPTURE_SCHEMA
+    )
+    hass.services.async_register(DOMAIN, SERVICE_STOP_CAPTURE, _stop_capture)
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPLAY_CAPTURE, _replay_capture, schema=REPLAY_CAPTURE_SCHEMA
+    )
@@ -0,0 +1,165 @@
+"""Detection of devices that stopped sending uplinks."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    STALE_INTERVAL_FACTOR,
+    STALE_MIN_SECONDS,
+    STALE_WHEEL_RESOLUTION_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weight of the latest interval in the learned one.
+_SMOOTHING = 0.25
+
+
+class UplinkInterval:
+    """
+    Learns how often a device sends its readings.
+
+    The interval is a moving average of the time between uplinks, so a
+    device that is configured to send less often is not reported stale. It
+    is unknown until two uplinks have been seen, unless it was learned before
+    a restart, and a device with an unknown interval never becomes stale. A
+    gap long enough to make the device stale is an outage, not the device's
+    interval, and is not learned from.
+    """
+
+    __slots__ = ("_last", "interval")
+
+    def __init__(self, learned: float | None = None) -> None:
+        """Initialize UplinkInterval."""
+        self.interval = learned
+        self._last: float | None = None
+
+    def observe(self, now: float) -> None:
+        """Learn from an uplink received at the monotonic time."""
+        if self._last is not None:
+            elapsed = now - self._last
+            if self.interval is None:
+                self.interval = elapsed
+            elif elapsed <= self._stale_after(self.interval):
+                self.interval += _SMOOTHING * (elapsed - self.interval)
+        self._last = now
+
+    def deadline(self, now: float) -> float | None:
+        """Return when the device is stale if nothing arrives after `now`."""
+        if self.interval is None:
+            return None
+        return now + self._stale_after(self.interval)
+
+    @staticmethod
+    def _stale_after(interval: float) -> float:
+        return max(STALE_MIN_SECONDS, STALE_INTERVAL_FACTOR * interval)
+
+
+class DeadlineWheel:
+    """
+    Runs the deadline actions of all devices from one timer.
+
+    Deadlines are rounded up into slots of a fixed resolution. Scheduling or
+    moving a deadline only moves the key between two slot sets, and every
+    tick runs all actions of the slots that have passed in one batch. The
+    timer only runs while deadlines are scheduled.
+    """
+
+    _slots: dict[int, dict[str, Callable[[], None]]]
+    _slot_of: dict[str, int]
+    _unsubscribe_tick: CALLBACK_TYPE | None
+
+    def __init__(
+        self, hass: HomeAssistant, resolution: float = STALE_WHEEL_RESOLUTION_SECONDS
+    ) -> None:
+        """Initialize DeadlineWheel."""
+        self._hass = hass
+        self._resolution = resolution
+        self._slots = {}
+        self._slot_of = {}
+        self._next_slot = 0
+        self._unsubscribe_tick = None
+        self.expired = 0
+
+    @callback
+    def schedule(self, key: str, deadline: float, action: Callable[[], None]) -> None:
+        """Run the action at the monotonic deadline, replacing the key's one."""
+        self._remove(key)
+        slot = math.ceil(deadline / self._resolution)
+        if not self._slot_of:
+            self._start()
+        # Slots that have passed are only run on the next tick.
+        slot = max(slot, self._next_slot)
+        self._slots.setdefault(slot, {})[key] = action
+        self._slot_of[key] = slot
+
+    @callback
+    def cancel(self, key: str) -> None:
+        """Drop the deadline of the key, if any."""
+        self._remove(key)
+        if not self._slot_of:
+            self._stop()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "scheduled": len(self._slot_of),
+            "slots": len(self._slots),
+            "expired": self.expired,
+        }
+
+    def _remove(self, key: str) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return
+        actions = self._slots[slot]
+        del actions[key]
+        if not actions:
+            del self._slots[slot]
+
+    def _start(self) -> None:
+        if self._unsubscribe_tick is not None:
+            return
+        self._next_slot = math.ceil(time.monotonic() / self._resolution)
+        self._unsubscribe_tick = async_track_time_interval(
+            self._hass, self._tick, timedelta(seconds=self._resolution)
+        )
+
+    def _stop(self) -> None:
+        if self._unsubscribe_tick is not None:
+            self._unsubscribe_tick()
+            self._unsubscribe_tick = None
+
+    @callback
+    def _tick(self, _now: datetime) -> None:
+        current = math.floor(time.monotonic() / self._resolution)
+        due: list[Callable[[], None]] = []
+        while self._next_slot <= current:
+            actions = self._slots.pop(self._next_slot, None)
+            self._next_slot += 1
+            if actions is None:
+                continue
+            for key in actions:
+                del self._slot_of[key]
+            due.extend(actions.values())
+
+        if not due:
+            return
+        _LOGGER.debug("%d deadlines expired.", len(due))
+        self.expired += len(due)
+        for action in due:
+            action()
+        if not self._slot_of:
+            self._stop()
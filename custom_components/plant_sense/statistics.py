@@ -0,0 +1,323 @@
+"""Hourly long-term statistics computed from PlantSense readings."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import (
+    PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS,
+    UnitOfElectricPotential,
+    UnitOfTemperature,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.util.unit_conversion import (
+    ElectricPotentialConverter,
+    TemperatureConverter,
+)
+
+from .const import DOMAIN
+from .messages import LINK_FIELDS, READING_FIELDS
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from .messages import DataReading
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class _StatisticField:
+    id_suffix: str
+    name: str
+    unit: str | None
+    unit_class: str | None = None
+
+
+# Keyed by the field of the data message; the suffixes match the sensors'.
+STATISTIC_FIELDS = {
+    "moi": _StatisticField("moisture", "Moisture", PERCENTAGE),
+    "hum": _StatisticField("humidity", "Humidity", PERCENTAGE),
+    "tempc": _StatisticField(
+        "temperature",
+        "Temperature",
+        UnitOfTemperature.CELSIUS,
+        TemperatureConverter.UNIT_CLASS,
+    ),
+    "batPct": _StatisticField("battery", "Battery", PERCENTAGE),
+    "bat": _StatisticField(
+        "battery_volt",
+        "Battery Voltage",
+        UnitOfElectricPotential.VOLT,
+        ElectricPotentialConverter.UNIT_CLASS,
+    ),
+    "moiRaw": _StatisticField("moisture_raw", "Moisture Raw", None),
+    "rssi": _StatisticField("rssi", "RSSI", SIGNAL_STRENGTH_DECIBELS),
+    "snr": _StatisticField("snr", "SNR", None),
+}
+
+
+class _Aggregate:
+    __slots__ = ("_before", "count", "last", "maximum", "minimum", "total")
+
+    def __init__(self, value: float) -> None:
+        self.count = 1
+        self.total = value
+        self.minimum = value
+        self.maximum = value
+        self.last = value
+        # Minimum and maximum without the last value, None if it is the only one.
+        self._before: tuple[float, float] | None = None
+
+    def add(self, value: float) -> None:
+        self._before = (self.minimum, self.maximum)
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.last = value
+
+    def replace_last(self, value: float) -> None:
+        self.total += value - self.last
+        self.last = value
+        if self._before is None:
+            self.minimum = self.maximum = value
+        else:
+            minimum, maximum = self._before
+            self.minimum = min(minimum, value)
+            self.maximum = max(maximum, value)
+
+    def as_list(self) -> list[float]:
+        return [self.count, self.total, self.minimum, self.maximum, self.last]
+
+    @classmethod
+    def from_list(cls, stored: list[float]) -> _Aggregate:
+        count, total, minimum, maximum, last = stored
+        aggregate = cls(last)
+        aggregate.count = int(count)
+        aggregate.total = total
+        aggregate.minimum = minimum
+        aggregate.maximum = maximum
+        if aggregate.count > 1:
+            # Not stored; the range may still include a last value replaced
+            # after the restore.
+            aggregate._before = (minimum, maximum)
+        return aggregate
+
+
+@dataclass(slots=True)
+class OpenHour:
+    """The aggregates of the hour readings are still being added to."""
+
+    start: datetime
+    aggregates: dict[str, _Aggregate]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the hour as stored."""
+        return {
+            "start": self.start.isoformat(),
+            "aggregates": {
+                field: aggregate.as_list()
+                for field, aggregate in self.aggregates.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict[str, Any]) -> OpenHour | None:
+        """Return the stored hour, None if it is not valid."""
+        try:
+            start = dt_util.parse_datetime(stored["start"])
+            aggregates = {
+                field: _Aggregate.from_list(aggregate)
+                for field, aggregate in stored["aggregates"].items()
+                if field in STATISTIC_FIELDS
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        if start is None:
+            return None
+        return cls(start, aggregates)
+
+
+class HourlyStatistics:
+    """
+    Aggregates the readings of one device per hour.
+
+    Mean, min, max and last value of every field are updated as readings
+    arrive and the hour is imported as external statistics once the first
+    reading of the next hour comes in, so the recorder does not have to
+    compile them from the states table. Readings of earlier hours, replayed
+    from a capture, are aggregated per hour and imported along with the next
+    completed hour; hours that already have readings received live are left
+    as they are, since importing them again would replace the live aggregate.
+    The aggregates of the unfinished hour are kept with the device's last
+    state and continued after a reload or restart, so the hour is imported
+    with all of its readings. Statistics never get in the way of handling the
+    reading: hours the recorder rejects are logged and dropped.
+    """
+
+    _hour: datetime | None
+    _first_live_hour: datetime | None
+    _hours: dict[datetime, dict[str, _Aggregate]]
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        serial: str,
+        device_name: str,
+        open_hour: OpenHour | None = None,
+    ) -> None:
+        """Initialize HourlyStatistics, continuing the hour saved last."""
+        self._hass = hass
+        self._serial = serial
+        # Statistic IDs only allow lowercase letters, digits and single
+        # underscores, while the serial is whatever was entered in the flow.
+        self._object_id = slugify(serial)
+        self.device_name = device_name
+        # The latest hour readings were added for.
+        self._hour = None
+        self._first_live_hour = None
+        self._hours = {}
+        if open_hour is not None:
+            self._hour = self._first_live_hour = open_hour.start
+            self._hours[open_hour.start] = open_hour.aggregates
+
+    @property
+    def open_hour(self) -> OpenHour | None:
+        """The hour live readings are being added to, which is not imported yet."""
+        hour = self._hour
+        if (
+            hour is None
+            # Only replayed readings so far.
+            or self._first_live_hour is None
+            or hour < self._first_live_hour
+            or (aggregates := self._hours.get(hour)) is None
+        ):
+            return None
+        return OpenHour(hour, aggregates)
+
+    @callback
+    def add(
+        self, timestamp: datetime, reading: DataReading, *, replayed: bool = False
+    ) -> None:
+        """Add the fields of a reading received, or replayed, at the timestamp."""
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        if not replayed:
+            if self._first_live_hour is None:
+                self._first_live_hour = hour
+        elif self._first_live_hour is not None and hour >= self._first_live_hour:
+            return
+
+        if self._hour is None or hour > self._hour:
+            self.flush(before=hour)
+            self._hour = hour
+
+        aggregates = self._hours.get(hour)
+        if aggregates is None:
+            aggregates = self._hours[hour] = {}
+        for field in STATISTIC_FIELDS:
+            value = getattr(reading, READING_FIELDS[field])
+            if value is None:
+                continue
+            aggregate = aggregates.get(field)
+            if aggregate is None:
+                aggregates[field] = _Aggregate(value)
+            else:
+                aggregate.add(value)
+
+    @callback
+    def update_link(
+        self, timestamp: datetime, before: DataReading, reading: DataReading
+    ) -> None:
+        """
+        Replace the link quality of the reading added last at the timestamp.
+
+        `before` holds the values it was added with; the hour is left alone
+        once it was imported.
+        """
+        hour = timestamp.replace(minute=0, second=0, microsecond=0)
+        aggregates = self._hours.get(hour)
+        if aggregates is None:
+            return
+        for field in LINK_FIELDS:
+            attribute = READING_FIELDS[field]
+            value = getattr(reading, attribute)
+            previous = getattr(before, attribute)
+            if value is None or value == previous:
+                continue
+            aggregate = aggregates.get(field)
+            if aggregate is None:
+                aggregates[field] = _Aggregate(value)
+            elif previous is None:
+                aggregate.add(value)
+            else:
+                aggregate.replace_last(value)
+
+    @callback
+    def flush_completed(self) -> None:
+        """Import the hours before the latest one, e.g. after a replay."""
+        if self._hour is not None:
+            self.flush(before=self._hour)
+
+    @callback
+    def flush(self, before: datetime | None = None) -> None:
+        """Import the aggregated hours, or only those before the given hour."""
+        hours = {
+            hour: self._hours.pop(hour)
+            for hour in list(self._hours)
+            if before is None or hour < before
+        }
+        if not hours or "recorder" not in self._hass.config.components:
+            return
+
+        # Importing the recorder pulls in SQLAlchemy; only pay for it once
+        # there is something to import.
+        from homeassistant.components.recorder.models import (  # noqa: PLC0415
+            StatisticData,
+            StatisticMeanType,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (  # noqa: PLC0415
+            async_add_external_statistics,
+        )
+
+        for field, statistic in STATISTIC_FIELDS.items():
+            rows = [
+                StatisticData(
+                    start=hour,
+                    mean=aggregate.total / aggregate.count,
+                    min=aggregate.minimum,
+                    max=aggregate.maximum,
+                    state=aggregate.last,
+                )
+                for hour, aggregates in sorted(hours.items())
+                if (aggregate := aggregates.get(field)) is not None
+            ]
+            if not rows:
+                continue
+            statistic_id = f"{DOMAIN}:{self._object_id}_{statistic.id_suffix}"
+            try:
+                async_add_external_statistics(
+                    self._hass,
+                    StatisticMetaData(
+                        has_sum=False,
+                        mean_type=StatisticMeanType.ARITHMETIC,
+                        name=f"{self.device_name} {statistic.name}",
+                        source=DOMAIN,
+                        statistic_id=statistic_id,
+                        unit_class=statistic.unit_class,
+                        unit_of_measurement=statistic.unit,
+                    ),
+                    rows,
+                )
+            except HomeAssistantError as err:
+                _LOGGER.warning("Failed to import statistics %s: %s", statistic_id, err)
+        _LOGGER.debug(
+            "Imported %d hours of statistics of %s.", len(hours), self._serial
+        )
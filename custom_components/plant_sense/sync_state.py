@@ -0,0 +1,179 @@
+"""Persisted config sync state of all PlantSense devices."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, fields
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONF_DEVICE_SERIAL,
+    DATA_CONFIRMED_MOI_DRY,
+    DATA_CONFIRMED_MOI_WET,
+    DATA_CONFIRMED_NAME,
+    DATA_CONFIRMED_TEST_MODE,
+    DATA_LAST_CONFIG_VERSION,
+    DOMAIN,
+    OPTIONS_UPDATE_CONFIG,
+    SYNC_STATE_SAVE_DELAY_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+_STORAGE_KEY = f"{DOMAIN}.sync_state"
+_STORAGE_VERSION = 1
+
+# Where the sync state used to live in the config entry.
+_LEGACY_DATA_KEYS = {
+    DATA_LAST_CONFIG_VERSION: "config_version",
+    DATA_CONFIRMED_NAME: "confirmed_name",
+    DATA_CONFIRMED_TEST_MODE: "confirmed_test_mode",
+    DATA_CONFIRMED_MOI_DRY: "confirmed_moi_dry",
+    DATA_CONFIRMED_MOI_WET: "confirmed_moi_wet",
+}
+
+
+class PushOutcome(StrEnum):
+    """How the last config push to a device ended."""
+
+    # The device reported the config after it was sent.
+    CONFIRMED = "confirmed"
+    # Cancelled, or dropped because the device's config changed meanwhile.
+    CANCELLED = "cancelled"
+    # The device already had the config, so nothing was sent.
+    NO_OP = "no_op"
+
+
+@dataclass(slots=True)
+class DeviceSyncState:
+    """The config last confirmed by a device and whether a push is pending."""
+
+    config_version: int = 0
+    config_pending: bool = False
+    # Whether the pending config has been queued for the device.
+    config_sent: bool = False
+    confirmed_name: str | None = None
+    confirmed_test_mode: bool | None = None
+    confirmed_moi_dry: int | None = None
+    confirmed_moi_wet: int | None = None
+    # Digest of the WiFi credentials the device confirmed, not the secret.
+    confirmed_wifi: str | None = None
+    # Set when a push stops being pending; None while it is.
+    push_outcome: PushOutcome | None = None
+
+    def __post_init__(self) -> None:
+        """Restore the outcome, which is stored as its value."""
+        if self.push_outcome is not None:
+            self.push_outcome = PushOutcome(self.push_outcome)
+
+    def end_push(self, outcome: PushOutcome) -> None:
+        """Record how the pending push ended, if one is pending."""
+        if self.config_pending:
+            self.push_outcome = outcome
+        self.config_pending = False
+        self.config_sent = False
+
+
+_FIELDS = frozenset(field.name for field in fields(DeviceSyncState))
+
+
+class SyncStateStore:
+    """
+    Keeps the config sync state of all devices in one storage file.
+
+    The sync state changes on the receive path and is of no interest to the
+    user, so it is not kept in the config entries: updating an entry rewrites
+    `core.config_entries` and runs all of its update listeners. Changes are
+    saved together after a short delay instead.
+    """
+
+    _devices: dict[str, DeviceSyncState]
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize SyncStateStore."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, _STORAGE_VERSION, _STORAGE_KEY)
+        self._devices = {}
+
+    async def async_load(self) -> None:
+        """Load the sync state of all devices."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self._devices = {
+            serial: DeviceSyncState(
+                **{key: value for key, value in state.items() if key in _FIELDS}
+            )
+            for serial, state in stored.get("devices", {}).items()
+        }
+
+    @callback
+    def get(self, serial: str) -> DeviceSyncState:
+        """Return the sync state of the device, creating it if needed."""
+        state = self._devices.get(serial)
+        if state is None:
+            state = self._devices[serial] = DeviceSyncState()
+        return state
+
+    @callback
+    def async_mark_pending(self, *serials: str) -> None:
+        """Push the config from the options on the devices' next uplinks."""
+        for serial in serials:
+            state = self.get(serial)
+            state.config_pending = True
+            state.config_sent = False
+            state.push_outcome = None
+        self.async_schedule_save()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save all devices once changes stop coming in."""
+        self._store.async_delay_save(self._data_to_save, SYNC_STATE_SAVE_DELAY_SECONDS)
+
+    @callback
+    def async_remove(self, serial: str) -> None:
+        """Forget a device that has been removed."""
+        if self._devices.pop(serial, None) is not None:
+            self.async_schedule_save()
+
+    @callback
+    def async_migrate_entry(self, entry: ConfigEntry) -> None:
+        """Move sync state that older versions kept in the entry to the store."""
+        data = dict(entry.data)
+        options = dict(entry.options)
+        legacy = {
+            field: data.pop(key)
+            for key, field in _LEGACY_DATA_KEYS.items()
+            if key in data
+        }
+        pending = options.pop(OPTIONS_UPDATE_CONFIG, None)
+        if not legacy and pending is None:
+            return
+
+        serial = entry.data[CONF_DEVICE_SERIAL]
+        if serial not in self._devices:
+            _LOGGER.debug("Migrating sync state of '%s' from its entry.", serial)
+            try:
+                legacy["config_version"] = int(legacy.get("config_version", 0))
+            except (ValueError, TypeError):
+                legacy["config_version"] = 0
+            self._devices[serial] = DeviceSyncState(
+                config_pending=bool(pending), **legacy
+            )
+            self.async_schedule_save()
+        self._hass.config_entries.async_update_entry(entry, data=data, options=options)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "devices": {
+                serial: asdict(state) for serial, state in self._devices.items()
+            }
+        }
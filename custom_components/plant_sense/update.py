@@ -1,10 +1,8 @@
 """Firmware update platform for PlantSense."""
 
 import logging
-from datetime import timedelta
 from typing import TYPE_CHECKING
 
-import aiohttp
 from homeassistant.components.update import (
     ENTITY_ID_FORMAT,
     UpdateDeviceClass,
@@ -13,35 +11,29 @@ from homeassistant.components.update import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.entity import DeviceInfo, async_generate_entity_id
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import FIRMWARE_CHECK_INTERVAL_HOURS, FIRMWARE_GITHUB_REPO
 from .coordinator import PlantSenseComponent, PlantSenseCoordinator
+from .firmware import FirmwareReleaseFetcher
+from .helpers import build_entity_id
 
 if TYPE_CHECKING:
     from .data import PlantSenseData
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(hours=FIRMWARE_CHECK_INTERVAL_HOURS)
-PARALLEL_UPDATES = 1
-
-_RELEASES_URL = f"https://api.github.com/repos/{FIRMWARE_GITHUB_REPO}/releases/latest"
-
 
 async def async_setup_entry(
-    hass: HomeAssistant,
+    _hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Add update entity for passed config_entry in HA."""
     data: PlantSenseData = config_entry.runtime_data
     async_add_entities(
-        [PlantSenseFirmwareUpdate(hass=hass, coordinator=data.coordinator)],
-        update_before_add=True,
+        [PlantSenseFirmwareUpdate(coordinator=data.coordinator, firmware=data.firmware)]
     )
 
 
@@ -51,62 +43,53 @@ class PlantSenseFirmwareUpdate(UpdateEntity, PlantSenseComponent):
     _attr_device_class = UpdateDeviceClass.FIRMWARE
     _attr_supported_features = UpdateEntityFeature.RELEASE_NOTES
     _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_should_poll = True
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_name = "Firmware"
 
-    _release_notes_cache: str | None = None
+    _written_versions: tuple[str | None, str | None] | None = None
 
-    def __init__(self, hass: HomeAssistant, coordinator: PlantSenseCoordinator) -> None:
+    def __init__(
+        self,
+        coordinator: PlantSenseCoordinator,
+        firmware: FirmwareReleaseFetcher,
+    ) -> None:
         """Initialize the firmware update entity."""
         self._coordinator = coordinator
+        self._firmware = firmware
         self._attr_unique_id = f"{coordinator.device_id}_firmware_update"
-        self.entity_id = async_generate_entity_id(
-            ENTITY_ID_FORMAT, f"{coordinator.device_id}_firmware_update", hass=hass
+        self.entity_id = build_entity_id(
+            ENTITY_ID_FORMAT, f"{coordinator.device_id}_firmware_update"
         )
 
-    @property
-    def name(self) -> str:
-        return f"{self._coordinator.device_name} Firmware"
-
     @property
     def installed_version(self) -> str | None:
         return self._coordinator.firmware_version
 
+    @property
+    def latest_version(self) -> str | None:
+        return self._coordinator.latest_firmware_version
+
+    @property
+    def release_url(self) -> str | None:
+        release = self._firmware.release
+        return release.release_url if release is not None else None
+
     @property
     def device_info(self) -> DeviceInfo:
         return self._coordinator.device_info
 
-    async def update_async(self) -> None:
-        """Refresh state when coordinator receives new MQTT data."""
-        self.async_write_ha_state()
-
-    async def async_update(self) -> None:
-        """Fetch the latest firmware release from GitHub."""
-        session = async_get_clientsession(self.hass)
-        try:
-            async with session.get(
-                _RELEASES_URL,
-                headers={"Accept": "application/vnd.github+json"},
-                timeout=aiohttp.ClientTimeout(total=10),
-            ) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-        except (aiohttp.ClientError, TimeoutError):
-            _LOGGER.warning(
-                "Failed to fetch latest firmware version from GitHub (%s)",
-                _RELEASES_URL,
-            )
-            self._attr_latest_version = None
-            self._release_notes_cache = None
-            return
-
-        tag = data.get("tag_name", "")
-        self._attr_latest_version = tag.lstrip("v") if tag else None
-        self._attr_release_url = data.get("html_url")
-        self._release_notes_cache = data.get("body")
-        self._coordinator.set_latest_firmware_version(self._attr_latest_version)
+    @callback
+    def handle_coordinator_update(self, *, force: bool = False) -> None:
+        """Refresh state when the installed or latest version changed."""
+        versions = (self.installed_version, self.latest_version)
+        if force or versions != self._written_versions:
+            self._written_versions = versions
+            self.async_write_ha_state()
 
     async def async_release_notes(self) -> str | None:
-        return self._release_notes_cache
+        release = self._firmware.release
+        return release.release_notes if release is not None else None
 
     async def async_added_to_hass(self) -> None:
         self._coordinator.register_component(self)
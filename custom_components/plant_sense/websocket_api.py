@@ -0,0 +1,55 @@
+"""Websocket commands for PlantSense."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import callback
+
+from .helpers import async_get_coordinator, local_timestamp
+from .history import HISTORY_FIELDS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the PlantSense websocket commands."""
+    websocket_api.async_register_command(hass, ws_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "plant_sense/history",
+        vol.Required("device_id"): cv.string,
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("fields", default=list(HISTORY_FIELDS)): [vol.In(HISTORY_FIELDS)],
+    }
+)
+@callback
+def ws_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return a window of the in-memory reading history of a device."""
+    coordinator = async_get_coordinator(hass, msg["device_id"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Device not found"
+        )
+        return
+
+    connection.send_result(
+        msg["id"],
+        coordinator.history.window(
+            local_timestamp(msg.get("start")),
+            local_timestamp(msg.get("end")),
+            tuple(msg["fields"]),
+        ),
+    )
@@ -0,0 +1,22 @@
+"""Tests of the moisture calibration's scalar and column paths."""
+
+from __future__ import annotations
+
+from array import array
+
+import pytest
+
+from custom_components.plant_sense.calibration import MoistureCalibration
+
+
+@pytest.mark.parametrize(("dry", "wet"), [(3000, 1200), (4082, 2522), (1000, 3000)])
+def test_column_matches_scalar(dry: int, wet: int) -> None:
+    """Every raw value of the range gets the same percentage on both paths."""
+    pytest.importorskip("numpy")
+    calibration = MoistureCalibration(dry=dry, wet=wet)
+    raw = array("f", range(4096))
+    moisture = array("f", bytes(4 * len(raw)))
+
+    calibration.apply_column(raw, moisture)
+
+    assert list(moisture) == [calibration.percent(value) for value in raw]
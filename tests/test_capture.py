@@ -0,0 +1,69 @@
+"""Tests of reading capture files back for replays."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from typing import TYPE_CHECKING
+
+from custom_components.plant_sense.capture import CaptureReader
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+_UPLINKS = 2000
+
+
+def _capture(path: Path) -> bytes:
+    lines = "".join(
+        json.dumps({"t": 1_700_000_000 + index, "gw": "lora", "p": f"{index:08d}"})
+        + "\n"
+        for index in range(_UPLINKS)
+    )
+    data = gzip.compress(lines.encode())
+    path.write_bytes(data)
+    return data
+
+
+def _read_all(reader: CaptureReader) -> list[str]:
+    payloads = []
+    while uplinks := reader.read(100):
+        payloads.extend(uplink.payload.decode() for uplink in uplinks)
+    reader.close()
+    return payloads
+
+
+def test_capture_is_read_in_order(tmp_path: Path) -> None:
+    """All uplinks come back in the order they were captured."""
+    path = tmp_path / "uplinks-1.jsonl.gz"
+    _capture(path)
+
+    payloads = _read_all(CaptureReader(path))
+
+    assert payloads == [f"{index:08d}" for index in range(_UPLINKS)]
+
+
+def test_damaged_capture_ends_the_read(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Garbage after a complete member ends the file after its uplinks."""
+    path = tmp_path / "uplinks-1.jsonl.gz"
+    path.write_bytes(_capture(path) + b"not gzip at all")
+
+    payloads = _read_all(CaptureReader(path))
+
+    assert payloads == [f"{index:08d}" for index in range(_UPLINKS)]
+    assert f"uplinks-1.jsonl.gz after {_UPLINKS} uplinks" in caplog.text
+
+
+def test_file_that_is_no_capture_is_empty(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A file that is not gzip compressed has no uplinks."""
+    path = tmp_path / "uplinks-1.jsonl.gz"
+    path.write_text('{"t": 1, "gw": "lora", "p": "{}"}\n')
+
+    assert _read_all(CaptureReader(path)) == []
+    assert "damaged" in caplog.text
@@ -0,0 +1,144 @@
+"""Round trips of the compact frames through their encoders and decoders."""
+
+from __future__ import annotations
+
+import struct
+
+import pytest
+
+from custom_components.plant_sense.compact import (
+    DOWNLINK_FORMAT_V1,
+    decode_frame,
+    encode_data,
+    encode_set_config,
+)
+from custom_components.plant_sense.decoder import decode_payload
+from custom_components.plant_sense.helpers import normalize_serial
+
+_SERIAL = "a1b2c3d4e5f6"
+_READING = {
+    "id": _SERIAL,
+    "model": "PlantSense",
+    "msg": "data",
+    "v": 7,
+    "test": False,
+    "fw": "2.0.1",
+    "moi": 42,
+    "moiRaw": 2300,
+    "hum": 55.3,
+    "tempc": -4.5,
+    "bat": 3.912,
+    "batPct": 87,
+}
+_TAGS = {
+    0x01: "name",
+    0x02: "test",
+    0x03: "moiDry",
+    0x04: "moiWet",
+    0x05: "ssid",
+    0x06: "wifiPwd",
+}
+_HEADER_SIZE = 8
+_DATA_SIZE = 23
+_MAX_FRAME = 24
+
+
+def _join(frames: list[bytes], serial: str) -> dict[str, bytes]:
+    """Check the headers, join the frames like the device and split the fields."""
+    body = b""
+    for index, frame in enumerate(frames):
+        assert frame[0] == DOWNLINK_FORMAT_V1
+        assert frame[1:7] == bytes.fromhex(serial)
+        assert frame[7] == index << 4 | len(frames)
+        body += frame[_HEADER_SIZE:]
+
+    assert body[0] == 0x01
+    fields = {}
+    position = 1
+    while position < len(body):
+        tag, length = body[position], body[position + 1]
+        fields[_TAGS[tag]] = body[position + 2 : position + 2 + length]
+        position += 2 + length
+    return fields
+
+
+def test_reading_round_trips() -> None:
+    """A data message decodes to what was encoded."""
+    frame = encode_data(_READING)
+
+    assert len(frame) == _DATA_SIZE
+    assert decode_frame(frame) == _READING
+
+
+def test_unmeasured_fields_round_trip() -> None:
+    """Fields the device did not measure stay missing, and the test flag is kept."""
+    reading = {**_READING, "test": True}
+    del reading["hum"]
+    del reading["fw"]
+
+    assert decode_frame(encode_data(reading)) == reading
+
+
+def test_serial_decodes_lowercase() -> None:
+    """A serial in uppercase comes back normalized."""
+    decoded = decode_frame(encode_data({**_READING, "id": _SERIAL.upper()}))
+
+    assert decoded is not None
+    assert decoded["id"] == _SERIAL == normalize_serial(_SERIAL.upper())
+
+
+def test_gateway_payload_round_trips() -> None:
+    """A frame in the gateway's `hex` field decodes like the device's JSON."""
+    payload = f'{{"rssi":-87,"snr":9.25,"hex":"{encode_data(_READING).hex()}"}}'
+
+    assert decode_payload(payload) == {"rssi": -87, "snr": 9.25, **_READING}
+
+
+@pytest.mark.parametrize("fw", ["1.2.3-beta", "1.2", "1.2.3.4", "1.256.0", "v1.2.3"])
+def test_firmware_that_does_not_fit_is_rejected(fw: str) -> None:
+    """Versions other than three numbers up to 255 cannot be sent compact."""
+    with pytest.raises(ValueError, match=r"compact frame|major\.minor\.patch"):
+        encode_data({**_READING, "fw": fw})
+
+
+def test_truncated_frame_is_rejected() -> None:
+    """A frame of the wrong size is not a data message."""
+    assert decode_frame(encode_data(_READING)[:-1]) is None
+
+
+def test_config_fits_one_frame() -> None:
+    """A small config is a single frame with only the given fields."""
+    frames = encode_set_config(_SERIAL, {"test": True, "moiDry": 3000}, 51)
+
+    assert len(frames) == 1
+    assert _join(frames, _SERIAL) == {
+        "test": b"\x01",
+        "moiDry": struct.pack("<H", 3000),
+    }
+
+
+def test_fragmented_config_round_trips() -> None:
+    """A config too large for one frame is split and joins back in order."""
+    changes = {
+        "name": "Monstera deliciosa by the window",
+        "moiWet": 1200,
+        "ssid": "Greenhouse",
+        "wifiPwd": "correct horse battery staple",
+    }
+
+    frames = encode_set_config(_SERIAL.upper(), changes, _MAX_FRAME)
+
+    assert len(frames) > 1
+    assert all(len(frame) <= _MAX_FRAME for frame in frames)
+    assert _join(frames, _SERIAL) == {
+        "name": changes["name"].encode(),
+        "moiWet": struct.pack("<H", 1200),
+        "ssid": b"Greenhouse",
+        "wifiPwd": changes["wifiPwd"].encode(),
+    }
+
+
+def test_config_needing_too_many_frames_is_rejected() -> None:
+    """At most 15 fragments fit the header's count."""
+    with pytest.raises(ValueError, match="at most 15"):
+        encode_set_config(_SERIAL, {"name": "x" * 200}, 16)
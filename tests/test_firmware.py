@@ -0,0 +1,160 @@
+"""Tests of the firmware release fetcher against a local stand-in for GitHub."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import hdrs, web
+from aiohttp.test_utils import TestServer
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.plant_sense.firmware import FirmwareReleaseFetcher
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from homeassistant.core import HomeAssistant
+
+pytestmark = pytest.mark.asyncio
+
+_ETAG = '"release-1"'
+_RELEASE = {
+    "tag_name": "v1.2.3",
+    "html_url": "https://github.com/example/releases/v1.2.3",
+    "body": "Notes",
+}
+
+
+@dataclass
+class _GitHub:
+    """What the stand-in server answers and the requests it received."""
+
+    url: str = ""
+    payload: Any = field(default_factory=lambda: _RELEASE)
+    requests: list[web.Request] = field(default_factory=list)
+
+
+class _Coordinator:
+    def __init__(self) -> None:
+        self.versions: list[str | None] = []
+
+    def set_latest_firmware_version(self, version: str | None) -> None:
+        self.versions.append(version)
+
+
+@pytest_asyncio.fixture
+async def github() -> AsyncGenerator[_GitHub]:
+    """Serve the latest release like the GitHub API, with ETags."""
+    state = _GitHub()
+
+    async def _latest(request: web.Request) -> web.StreamResponse:
+        state.requests.append(request)
+        etag = _ETAG if state.payload == _RELEASE else '"changed"'
+        if request.headers.get(hdrs.IF_NONE_MATCH) == etag:
+            return web.Response(status=304)
+        return web.json_response(state.payload, headers={hdrs.ETAG: etag})
+
+    app = web.Application()
+    app.router.add_get("/releases/latest", _latest)
+    server = TestServer(app)
+    await server.start_server()
+    state.url = str(server.make_url("/releases/latest"))
+    yield state
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def session() -> AsyncGenerator[aiohttp.ClientSession]:
+    """Return a client session for the stand-in server."""
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+async def test_refresh_notifies_coordinators(
+    hass: HomeAssistant, github: _GitHub, session: aiohttp.ClientSession
+) -> None:
+    """A fetched release is passed to every registered coordinator."""
+    fetcher = FirmwareReleaseFetcher(hass, github.url, session)
+    coordinator = _Coordinator()
+    fetcher.register_coordinator(coordinator)
+
+    await fetcher.async_refresh()
+
+    assert fetcher.latest_version == "1.2.3"
+    assert fetcher.release is not None
+    assert fetcher.release.release_notes == "Notes"
+    assert coordinator.versions == [None, "1.2.3"]
+
+
+async def test_refresh_is_conditional(
+    hass: HomeAssistant, github: _GitHub, session: aiohttp.ClientSession
+) -> None:
+    """Later checks send the ETag and keep the release on 304."""
+    fetcher = FirmwareReleaseFetcher(hass, github.url, session)
+    await fetcher.async_refresh()
+    await fetcher.async_refresh()
+
+    assert [request.headers.get(hdrs.IF_NONE_MATCH) for request in github.requests] == [
+        None,
+        _ETAG,
+    ]
+    assert fetcher.latest_version == "1.2.3"
+
+
+@pytest.mark.parametrize("payload", [["v2.0.0"], "v2.0.0", None])
+async def test_unexpected_payload_keeps_release(
+    hass: HomeAssistant,
+    github: _GitHub,
+    session: aiohttp.ClientSession,
+    payload: Any,
+) -> None:
+    """A response that is not a release object changes nothing."""
+    fetcher = FirmwareReleaseFetcher(hass, github.url, session)
+    await fetcher.async_refresh()
+    github.payload = payload
+
+    await fetcher.async_refresh()
+
+    assert fetcher.latest_version == "1.2.3"
+
+
+async def test_fields_of_another_type_are_ignored(
+    hass: HomeAssistant, github: _GitHub, session: aiohttp.ClientSession
+) -> None:
+    """A release object with unexpected field types has no version."""
+    github.payload = {"tag_name": 2, "html_url": None, "body": ["Notes"]}
+    fetcher = FirmwareReleaseFetcher(hass, github.url, session)
+
+    await fetcher.async_refresh()
+
+    assert fetcher.release is not None
+    assert fetcher.latest_version is None
+    assert fetcher.release.release_notes is None
+
+
+async def test_start_serves_cached_release(
+    hass: HomeAssistant, github: _GitHub, session: aiohttp.ClientSession
+) -> None:
+    """A recent release on disk is used without asking GitHub."""
+    await Store(hass, 1, "plant_sense.firmware_release").async_save(
+        {
+            "etag": _ETAG,
+            "version": "1.0.0",
+            "release_url": None,
+            "release_notes": None,
+            "last_check": dt_util.utcnow().isoformat(),
+        }
+    )
+    fetcher = FirmwareReleaseFetcher(hass, github.url, session)
+
+    await fetcher.async_start()
+    await hass.async_block_till_done()
+    fetcher.async_stop()
+
+    assert fetcher.latest_version == "1.0.0"
+    assert github.requests == []
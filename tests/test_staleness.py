@@ -0,0 +1,33 @@
+"""Tests of learning the uplink interval of a device."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.plant_sense.staleness import UplinkInterval
+
+_MINUTE = 60
+
+
+def test_interval_is_learned_from_uplinks() -> None:
+    """The interval follows the time between uplinks."""
+    interval = UplinkInterval()
+    interval.observe(0)
+    assert interval.interval is None
+
+    interval.observe(10 * _MINUTE)
+    interval.observe(22 * _MINUTE)
+
+    assert interval.interval == pytest.approx(10.5 * _MINUTE)
+
+
+def test_outage_is_not_learned() -> None:
+    """The uplink ending an outage leaves the interval, and the next one counts."""
+    interval = UplinkInterval(10 * _MINUTE)
+    interval.observe(0)
+
+    interval.observe(5 * 60 * _MINUTE)
+    assert interval.interval == 10 * _MINUTE
+
+    interval.observe(5 * 60 * _MINUTE + 14 * _MINUTE)
+    assert interval.interval == pytest.approx(11 * _MINUTE)
@@ -0,0 +1,100 @@
+"""Tests of the hourly statistics kept across reloads and restarts."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.plant_sense.messages import DataReading
+from custom_components.plant_sense.statistics import HourlyStatistics, OpenHour
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+pytestmark = pytest.mark.asyncio
+
+_HOUR = datetime(2026, 5, 1, 10, tzinfo=UTC)
+
+
+def _reading(moisture: float, rssi: float = -80) -> DataReading:
+    return DataReading(
+        version=1,
+        firmware="2.0.0",
+        test=False,
+        moisture=moisture,
+        moisture_raw=None,
+        humidity=None,
+        temperature=None,
+        battery_volt=None,
+        battery=None,
+        rssi=rssi,
+        snr=None,
+    )
+
+
+async def test_open_hour_continues_after_restart(hass: HomeAssistant) -> None:
+    """The readings before a restart count towards the hour after it."""
+    statistics = HourlyStatistics(hass, "A1B2", "PlantSense Fern")
+    statistics.add(_HOUR.replace(minute=5), _reading(40))
+    statistics.add(_HOUR.replace(minute=20), _reading(30))
+    open_hour = statistics.open_hour
+    assert open_hour is not None
+
+    stored = json.loads(json.dumps(open_hour.as_dict()))
+    restored = OpenHour.from_dict(stored)
+    assert restored is not None
+    statistics = HourlyStatistics(hass, "A1B2", "PlantSense Fern", restored)
+    statistics.add(_HOUR.replace(minute=40), _reading(80))
+
+    open_hour = statistics.open_hour
+    assert open_hour is not None
+    assert open_hour.start == _HOUR
+    moisture = open_hour.aggregates["moi"]
+    assert (moisture.count, moisture.total / moisture.count) == (3, 50)
+    assert (moisture.minimum, moisture.maximum, moisture.last) == (30, 80, 80)
+    assert open_hour.aggregates["rssi"].count == 3  # noqa: PLR2004
+
+
+async def test_replayed_hours_are_not_open(hass: HomeAssistant) -> None:
+    """Only an hour with live readings is kept for the next start."""
+    statistics = HourlyStatistics(hass, "A1B2", "PlantSense Fern")
+    statistics.add(_HOUR, _reading(40), replayed=True)
+
+    assert statistics.open_hour is None
+
+
+async def test_better_copy_replaces_link_quality(hass: HomeAssistant) -> None:
+    """A copy heard better replaces the RSSI the reading was added with."""
+    statistics = HourlyStatistics(hass, "A1B2", "PlantSense Fern")
+    statistics.add(_HOUR.replace(minute=5), _reading(40, rssi=-70))
+    received = _HOUR.replace(minute=20)
+    reading = _reading(30, rssi=-110)
+    statistics.add(received, reading)
+    before = replace(reading)
+
+    reading.update_link({"rssi": -60})
+    statistics.update_link(received, before, reading)
+
+    open_hour = statistics.open_hour
+    assert open_hour is not None
+    rssi = open_hour.aggregates["rssi"]
+    assert (rssi.count, rssi.total) == (2, -130)
+    assert (rssi.minimum, rssi.maximum, rssi.last) == (-70, -60, -60)
+    assert "snr" not in open_hour.aggregates
+
+
+@pytest.mark.parametrize(
+    "stored",
+    [
+        {},
+        {"start": "yesterday", "aggregates": {}},
+        {"start": _HOUR.isoformat(), "aggregates": {"moi": [1, 2]}},
+    ],
+)
+async def test_invalid_open_hour_is_dropped(stored: dict) -> None:
+    """A stored hour that cannot be read is not restored."""
+    assert OpenHour.from_dict(stored) is None